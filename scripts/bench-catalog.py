@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+カタログ規模に対する検証スクリプトのスケーリングベンチマーク
+
+100 / 1k / 10k 件のスキルとエージェントを持つ合成リポジトリを生成し、
+以下のツールごとに実行時間 (wall)・ピーク RSS・files/sec を計測する。
+
+- verify-best-practices.py: リポジトリ全体 (agents/*.md + skills/*/SKILL.md)
+- validate-structure.py: 全スキルディレクトリ (1プロセスで順に検証)
+- check-similarity.py: 新規スキル1件と全既存スキルの比較
+
+各ツールは子プロセスで実行し、ピーク RSS は os.wait4 の rusage から取得する。
+
+Usage:
+    bench-catalog.py [--sizes 100,1000,10000] [--tools verify,structure,similarity]
+                     [--jobs 1] [--output result.json]
+                     [--baseline result.json] [--max-regression 0.2]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+REPO_ROOT = SCRIPT_DIR.parent
+IMPORTING_SCRIPTS_DIR = REPO_ROOT / "skills" / "proc-importing-skill" / "scripts"
+
+DEFAULT_SIZES = [100, 1000, 10000]
+TOOLS = ["verify", "structure", "similarity"]
+
+# 名前は命名規則 ([a-z-]+) に合わせ、単語の組み合わせと英字の連番で一意にする
+TOPICS = [
+    ("api", "API 設計", "API design"),
+    ("database", "データベース", "database"),
+    ("security", "セキュリティ", "security"),
+    ("frontend", "フロントエンド", "frontend"),
+    ("infra", "インフラ", "infrastructure"),
+    ("testing", "テスト", "testing"),
+    ("docs", "ドキュメント", "documentation"),
+    ("release", "リリース", "release"),
+    ("perf", "パフォーマンス", "performance"),
+    ("intl", "国際化", "internationalization"),
+]
+ACTIONS = [
+    ("review", "レビュー", "review"),
+    ("audit", "監査", "audit"),
+    ("refactor", "リファクタリング", "refactoring"),
+    ("migrate", "移行", "migration"),
+    ("generate", "生成", "generation"),
+    ("analyze", "分析", "analysis"),
+]
+
+JA_PARAGRAPHS = [
+    "このスキルは変更差分を読み込み、観点ごとに問題点を洗い出します。",
+    "結果は重要度順に並べ、修正案と根拠となるガイドラインを併記します。",
+    "判断に迷う箇所はユーザーに確認し、推測で変更を加えないでください。",
+    "既存の命名規則とディレクトリ構造に従い、差分は最小限に保ちます。",
+    "大きなファイルは分割して読み込み、必要な範囲だけを確認します。",
+]
+EN_PARAGRAPHS = [
+    "This skill reads the diff and lists issues for each review aspect.",
+    "Findings are ordered by severity and include a suggested fix and the guideline they rely on.",
+    "When a decision is unclear, ask the user instead of guessing.",
+    "Follow the existing naming conventions and keep the change set minimal.",
+    "Large files are read in chunks so that only the relevant range is inspected.",
+]
+
+
+def letters(index):
+    """0 → 'a', 25 → 'z', 26 → 'ba' のように英小文字のみで連番を表す"""
+    text = ""
+    while True:
+        index, rest = divmod(index, 26)
+        text = chr(ord("a") + rest) + text
+        if index == 0:
+            return text
+
+
+def resource_words(index):
+    topic = TOPICS[index % len(TOPICS)]
+    action = ACTIONS[(index // len(TOPICS)) % len(ACTIONS)]
+    return topic[0], action[0], topic, action
+
+
+def body_paragraphs(rng, japanese, count):
+    paragraphs = JA_PARAGRAPHS if japanese else EN_PARAGRAPHS
+    return "\n\n".join(rng.choice(paragraphs) for _ in range(count))
+
+
+def skill_markdown(rng, name, topic, action, japanese):
+    """実際の SKILL.md に近い構成 (フロントマター・Purpose/Scope・手順・コード例) の本文"""
+    paragraphs = rng.randint(2, 12)
+    steps = rng.randint(3, 8)
+    if japanese:
+        description = f"{topic[1]}の{action[1]}を行うスキル。"
+        header = (
+            f"# {topic[2].title()} {action[2].title()} Skill\n\n"
+            f"- Purpose: {topic[1]}の{action[1]}を行う\n"
+            f"- Scope: リポジトリ内の{topic[1]}関連ファイル\n\n"
+            f"## 概要\n\n{body_paragraphs(rng, True, paragraphs)}\n\n"
+            f"## ワークフロー\n\n"
+        )
+        step = "{n}. **手順{n}**: 対象ファイルを確認し、結果を記録する"
+    else:
+        # 英語の定義でも description は日本語で書く (リポジトリの規約どおり)
+        description = f"{topic[1]}の{action[1]}を行うスキル。"
+        header = (
+            f"# {topic[2].title()} {action[2].title()} Skill\n\n"
+            f"- Purpose: {action[2]} of {topic[2]} changes\n"
+            f"- Scope: {topic[2]} related files in the repository\n\n"
+            f"## Overview\n\n{body_paragraphs(rng, False, paragraphs)}\n\n"
+            f"## Workflow\n\n"
+        )
+        step = "{n}. **Step {n}**: inspect the target files and record the result"
+    steps_text = "\n".join(step.format(n=n) for n in range(1, steps + 1))
+    code = (
+        "```bash\n"
+        f"python3 scripts/{action[0]}.py --target src/ --format json\n"
+        "```\n"
+    )
+    return (
+        f"---\nname: {name}\ndescription: {description}\n---\n\n"
+        f"{header}{steps_text}\n\n{code}"
+    )
+
+
+def agent_markdown(rng, name, topic, action, skill_name, japanese):
+    if japanese:
+        return (
+            f"---\nname: {name}\ndescription: {topic[1]}観点でコードを{action[1]}する専門家。\n"
+            f"tools: Read, Grep, Glob\nskills:\n  - {skill_name}\n---\n\n"
+            f"# {name}\n\n- Purpose: {topic[1]}観点で{action[1]}\n- Scope: {topic[1]}関連の変更\n\n"
+            f"## 実行手順\n\n{body_paragraphs(rng, True, rng.randint(2, 6))}\n"
+        )
+    return (
+        f"---\nname: {name}\ndescription: {topic[1]}観点でコードを{action[1]}する専門家。\n"
+        f"tools: Read, Grep, Glob\nskills:\n  - {skill_name}\n---\n\n"
+        f"# {name}\n\n- Purpose: {topic[2]} {action[2]}\n- Scope: {topic[2]} changes\n\n"
+        f"## Procedure\n\n{body_paragraphs(rng, False, rng.randint(2, 6))}\n"
+    )
+
+
+def generate_catalog(root, count, seed=0):
+    """count 件ずつのスキルとエージェントを持つ合成リポジトリを root に生成する"""
+    rng = random.Random(seed)
+    agents_dir = root / "agents"
+    skills_dir = root / "skills"
+    agents_dir.mkdir(parents=True)
+    skills_dir.mkdir(parents=True)
+
+    for index in range(count):
+        topic_word, action_word, topic, action = resource_words(index)
+        suffix = letters(index)
+        # 日本語 7 : 英語 3 程度の比率にする (既存カタログに近い)
+        japanese = rng.random() < 0.7
+
+        prefix = "proc" if rng.random() < 0.5 else "action"
+        skill_name = f"{prefix}-{topic_word}-{action_word}-{suffix}-skill"
+        skill_dir = skills_dir / skill_name
+        skill_dir.mkdir()
+        (skill_dir / "SKILL.md").write_text(
+            skill_markdown(rng, skill_name, topic, action, japanese), encoding="utf-8"
+        )
+        if rng.random() < 0.2:
+            (skill_dir / "scripts").mkdir()
+            (skill_dir / "scripts" / f"{action_word}.py").write_text(
+                "#!/usr/bin/env python3\nprint('ok')\n", encoding="utf-8"
+            )
+
+        agent_name = f"{'shihan' if rng.random() < 0.2 else 'deshi'}-{topic_word}-{action_word}-{suffix}"
+        (agents_dir / f"{agent_name}.md").write_text(
+            agent_markdown(rng, agent_name, topic, action, skill_name, japanese), encoding="utf-8"
+        )
+
+    # check-similarity の比較元となるカタログ外の新規スキル
+    new_skill = root / "incoming" / "proc-api-review-incoming-skill"
+    new_skill.mkdir(parents=True)
+    (new_skill / "SKILL.md").write_text(
+        skill_markdown(rng, new_skill.name, TOPICS[0], ACTIONS[0], True), encoding="utf-8"
+    )
+    return new_skill
+
+
+# validate-structure.py は1リソースずつ検証する CLI のため、
+# 子プロセス内でモジュールを読み込んで全スキルを順に検証する
+STRUCTURE_DRIVER = """
+import contextlib, importlib.util, os, sys
+from pathlib import Path
+script, skills_dir = sys.argv[1], Path(sys.argv[2])
+sys.path.insert(0, str(Path(script).parent))
+spec = importlib.util.spec_from_file_location('validate_structure', script)
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+    for skill in sorted(skills_dir.iterdir()):
+        module.StructureValidator(str(skill), 'skill').validate()
+"""
+
+
+def tool_command(tool, root, new_skill, jobs):
+    """(コマンド, 作業ディレクトリ) を返す"""
+    if tool == "verify":
+        command = [sys.executable, str(SCRIPT_DIR / "verify-best-practices.py"),
+                   "--no-cache", "--jobs", str(jobs)]
+        return command, root
+    if tool == "structure":
+        command = [sys.executable, "-c", STRUCTURE_DRIVER,
+                   str(IMPORTING_SCRIPTS_DIR / "validate-structure.py"), str(root / "skills")]
+        return command, root
+    if tool == "similarity":
+        command = [sys.executable, str(IMPORTING_SCRIPTS_DIR / "check-similarity.py"),
+                   "--new", str(new_skill), "--existing", str(root / "skills")]
+        return command, root
+    raise ValueError(f"Unknown tool: {tool}")
+
+
+def files_processed(tool, count):
+    if tool == "verify":
+        return count * 2
+    if tool == "similarity":
+        return count + 1
+    return count
+
+
+def run_tool(command, cwd):
+    """子プロセスを実行し、(終了コード, 経過秒, ピーク RSS (バイト), stderr) を返す"""
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    stderr = process.stderr.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - started
+    process.stderr.close()
+    # Linux の ru_maxrss は KB 単位 (macOS はバイト単位)
+    peak_rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return os.waitstatus_to_exitcode(status), elapsed, peak_rss, stderr.decode("utf-8", errors="replace")
+
+
+def compare(results, baseline, max_regression):
+    """ベースラインより max_regression 以上遅くなった計測を返す"""
+    previous = {(entry["tool"], entry["size"]): entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in results:
+        before = previous.get((entry["tool"], entry["size"]))
+        if not before or not before["wall_seconds"]:
+            continue
+        ratio = entry["wall_seconds"] / before["wall_seconds"] - 1
+        if ratio > max_regression:
+            regressions.append((entry, before, ratio))
+    return regressions
+
+
+def parse_sizes(value):
+    try:
+        sizes = [int(size) for size in value.split(",") if size]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size list: {value}")
+    if not sizes or any(size <= 0 for size in sizes):
+        raise argparse.ArgumentTypeError(f"invalid size list: {value}")
+    return sizes
+
+
+def parse_tools(value):
+    tools = [tool for tool in value.split(",") if tool]
+    unknown = [tool for tool in tools if tool not in TOOLS]
+    if not tools or unknown:
+        raise argparse.ArgumentTypeError(f"unknown tool(s): {', '.join(unknown) or value}")
+    return tools
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark validation scripts against synthetic catalogs')
+    parser.add_argument('--sizes', type=parse_sizes, default=DEFAULT_SIZES,
+                        help='Comma-separated numbers of skills/agents (default: 100,1000,10000)')
+    parser.add_argument('--tools', type=parse_tools, default=TOOLS,
+                        help=f"Comma-separated tools to run (default: {','.join(TOOLS)})")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='--jobs passed to verify-best-practices.py (default: 1)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the catalog (default: 0)')
+    parser.add_argument('--workdir', help='Directory for generated catalogs (default: temporary)')
+    parser.add_argument('--keep', action='store_true', help='Keep generated catalogs')
+    parser.add_argument('--output', help='Write results as JSON')
+    parser.add_argument('--baseline', help='Previous --output JSON to compare wall times against')
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help='Allowed slowdown against --baseline (default: 0.2 = 20%%)')
+    args = parser.parse_args()
+
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix="bench-catalog-"))
+    results = []
+    failed = False
+    try:
+        print(f"{'tool':<11} {'size':>6} {'files':>7} {'wall (s)':>9} {'peak RSS (MB)':>14} {'files/s':>9}")
+        for size in args.sizes:
+            root = workdir / f"catalog-{size}"
+            if root.exists():
+                shutil.rmtree(root)
+            new_skill = generate_catalog(root, size, args.seed)
+            for tool in args.tools:
+                command, cwd = tool_command(tool, root, new_skill, args.jobs)
+                returncode, elapsed, peak_rss, stderr = run_tool(command, cwd)
+                # verify / similarity は指摘ありで 1 を返すため、2 以上を失敗とみなす
+                if returncode not in (0, 1):
+                    print(f"[ERROR] {tool} failed on {size} (exit {returncode}):\n{stderr}", file=sys.stderr)
+                    failed = True
+                    continue
+                files = files_processed(tool, size)
+                entry = {
+                    "tool": tool,
+                    "size": size,
+                    "files": files,
+                    "wall_seconds": round(elapsed, 4),
+                    "peak_rss_bytes": peak_rss,
+                    "files_per_second": round(files / elapsed, 1),
+                }
+                results.append(entry)
+                print(f"{tool:<11} {size:>6} {files:>7} {elapsed:>9.3f} "
+                      f"{peak_rss / 1024 / 1024:>14.1f} {files / elapsed:>9.0f}")
+                sys.stdout.flush()
+            if not args.keep:
+                shutil.rmtree(root)
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        report = {"python": sys.version.split()[0], "jobs": args.jobs, "seed": args.seed, "results": results}
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"\n[INFO] Result saved to: {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.max_regression)
+        for entry, before, ratio in regressions:
+            print(f"[REGRESSION] {entry['tool']} @ {entry['size']}: "
+                  f"{before['wall_seconds']:.3f}s → {entry['wall_seconds']:.3f}s (+{ratio:.0%})",
+                  file=sys.stderr)
+        failed = failed or bool(regressions)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+verify-best-practices.py の本文ルール判定のマイクロベンチマーク
+
+従来の正規表現カスケード (ルールごとに re.search で全文走査) と、
+単一パスの結合スキャナ (scan_content) を大きな文書で比較する。
+
+Usage:
+    bench-rule-scanner.py [--size-mb 4] [--repeat 5]
+"""
+
+import argparse
+import importlib.util
+import re
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+
+
+def load_verifier():
+    """ハイフン入りのファイル名のため importlib で読み込む"""
+    spec = importlib.util.spec_from_file_location(
+        "verify_best_practices", SCRIPT_DIR / "verify-best-practices.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_validate_common(content, errors):
+    """変更前の validate_common (比較用ベースライン)"""
+    if not re.search(r'(Purpose|目的)', content, re.IGNORECASE):
+        errors.append("目的 (Purpose) の記述が見つかりません。")
+    if not re.search(r'(Scope|範囲)', content, re.IGNORECASE):
+        errors.append("範囲 (Scope) の記述が見つかりません。")
+
+    workflow_patterns = [
+        r'##\s+(?:\d+\.\s*)?ワークフロー',
+        r'##\s+(?:\d+\.\s*)?実行手順',
+        r'##\s+(?:\d+\.\s*)?手順',
+        r'##\s+(?:\d+\.\s*)?手順策定',
+        r'##\s+(?:\d+\.\s*)?レビュー観点',
+        r'##\s+(?:\d+\.\s*)?レビュー手順',
+        r'##\s+(?:\d+\.\s*)?ライフサイクル',
+        r'##\s+(?:\d+\.\s*)?Workflow',
+        r'##\s+(?:\d+\.\s*)?Procedure',
+        r'##\s+(?:\d+\.\s*)?Lifecycle'
+    ]
+    if not any(re.search(pattern, content, re.IGNORECASE) for pattern in workflow_patterns):
+        errors.append("ワークフローまたは手順のセクション (## ワークフロー 等) が見つかりません。")
+
+    if not re.search(r'[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF]', content):
+        errors.append("日本語が含まれていません。")
+
+
+def build_documents(size_bytes):
+    """計測用の文書を生成する"""
+    filler_en = "This paragraph describes the behaviour of the tool in detail.\n"
+    filler_ja = "このスキルは入力を検証し、結果を報告します。\n"
+
+    def pad(unit):
+        return unit * (size_bytes // len(unit.encode('utf-8')) + 1)
+
+    return {
+        # 典型的な SKILL.md: 冒頭に Purpose/Scope、直後にワークフロー見出し
+        "typical": (
+            "---\nname: proc-sample-skill\ndescription: サンプル\n---\n\n"
+            "# Sample\n\n- Purpose: 検証\n- Scope: 全体\n\n## ワークフロー\n\n"
+            + pad(filler_ja)
+        ),
+        # 日本語の本文の末尾にワークフロー見出しがある文書
+        "late-heading": (
+            "# サンプル\n\n- Purpose: 検証\n- Scope: 全体\n\n"
+            + pad(filler_ja)
+            + "\n## 手順\n"
+        ),
+        # 英語のみの文書 (日本語ルールは ASCII 判定で確定する)
+        "english": (
+            "# Sample\n\n- Purpose: check\n- Scope: all\n\n"
+            + pad(filler_en)
+            + "\n## Workflow\n"
+        ),
+        # 最悪ケース: どのルールにも一致せず、全ルールが全文走査になる
+        "no-match": "# Sample\n\n" + pad(filler_en.replace("tool", "script")),
+    }
+
+
+def measure(func, repeat):
+    """最良値 (秒) を返す"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the content rule scanner')
+    parser.add_argument('--size-mb', type=float, default=4, help='Document size in MB (default: 4)')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetitions per case (default: 5)')
+    args = parser.parse_args()
+
+    verifier = load_verifier()
+    documents = build_documents(int(args.size_mb * 1024 * 1024))
+
+    print(f"{'case':<14} {'legacy (ms)':>12} {'scanner (ms)':>13} {'speed-up':>9}")
+    for case, content in documents.items():
+        legacy_errors, scanner_errors = [], []
+        legacy_validate_common(content, legacy_errors)
+        verifier.validate_common(content, scanner_errors)
+        if legacy_errors != scanner_errors:
+            print(f"[ERROR] verdict mismatch in '{case}': {legacy_errors} != {scanner_errors}",
+                  file=sys.stderr)
+            sys.exit(1)
+
+        legacy = measure(lambda content=content: legacy_validate_common(content, []), args.repeat)
+        scanner = measure(lambda content=content: verifier.validate_common(content, []),
+                          args.repeat)
+        print(f"{case:<14} {legacy * 1000:>12.3f} {scanner * 1000:>13.3f} {legacy / scanner:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
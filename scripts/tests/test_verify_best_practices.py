@@ -0,0 +1,251 @@
+"""verify-best-practices.py の結合スキャナと検証結果キャッシュのテスト
+
+結合スキャナ (rule_scanner / scan_content) の判定が従来のルールごとの re.search と
+一致すること、既知のエラーを持つフィクスチャのツリーでキャッシュのヒット時と
+キャッシュなしの実行の結果が一致することを確かめる。
+
+Usage:
+    python3 -m pytest scripts/tests
+"""
+
+import importlib.util
+import json
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent.parent / "verify-best-practices.py"
+
+FRONTMATTER = "---\nname: {name}\ndescription: テスト用の定義\n---\n\n"
+
+COMPLETE_BODY = """\
+# タイトル
+
+- 目的: 動作を確かめる
+- 範囲 (Scope): テストのみ
+
+## ワークフロー
+
+1. 実行する
+"""
+
+# (相対パス, 内容, 期待するエラーのルール ID)。None はドラフト
+FIXTURES = [
+    ("agents/deshi-good.md", FRONTMATTER.format(name="good") + COMPLETE_BODY, []),
+    (
+        "agents/deshi-english.md",
+        FRONTMATTER.format(name="english").replace("テスト用の定義", "test")
+        + "# Title\n\nPurpose: check\nScope: tests\n\n## 2. Workflow\n\n1. run\n",
+        ["japanese"],
+    ),
+    (
+        "agents/Bad_Name.md",
+        "# タイトル\n\n目的と範囲を書く\n\n##手順 (空白がない見出しは認めない)\n",
+        ["naming", "frontmatter", "workflow"],
+    ),
+    (
+        "agents/deshi-no-scope.md",
+        "---\nname: partial\n---\n\n# タイトル\n\n目的: 確かめる\n\n## 3.手順\n",
+        ["frontmatter", "scope"],
+    ),
+    (
+        "agents/shihan-draft.md",
+        "---\nname: draft\ndraft: true\n---\n\n# 下書き\n",
+        None,
+    ),
+    ("skills/proc-good-skill/SKILL.md", FRONTMATTER.format(name="good") + COMPLETE_BODY, []),
+    (
+        "skills/proc-lifecycle-skill/SKILL.md",
+        FRONTMATTER.format(name="lifecycle") + "# タイトル\n\nSCOPE と PURPOSE\n\n## LIFECYCLE\n",
+        [],
+    ),
+    (
+        "skills/badskill/SKILL.md",
+        FRONTMATTER.format(name="bad") + "# Title\n\nnothing here\n",
+        ["naming", "purpose", "scope", "workflow"],
+    ),
+    ("skills/proc-missing-skill/README.md", "# SKILL.md がない\n", ["skill-md"]),
+]
+
+
+def _load_verifier():
+    """ハイフン入りのファイル名のため importlib で読み込む"""
+    spec = importlib.util.spec_from_file_location("verify_best_practices", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_validate_common(content):
+    """結合スキャナ導入前の validate_common (ルールごとに re.search で全文を走査する)"""
+    errors = []
+    if not re.search(r'(Purpose|目的)', content, re.IGNORECASE):
+        errors.append("目的 (Purpose) の記述が見つかりません。")
+    if not re.search(r'(Scope|範囲)', content, re.IGNORECASE):
+        errors.append("範囲 (Scope) の記述が見つかりません。")
+    workflow_patterns = [
+        r'##\s+(?:\d+\.\s*)?ワークフロー',
+        r'##\s+(?:\d+\.\s*)?実行手順',
+        r'##\s+(?:\d+\.\s*)?手順',
+        r'##\s+(?:\d+\.\s*)?手順策定',
+        r'##\s+(?:\d+\.\s*)?レビュー観点',
+        r'##\s+(?:\d+\.\s*)?レビュー手順',
+        r'##\s+(?:\d+\.\s*)?ライフサイクル',
+        r'##\s+(?:\d+\.\s*)?Workflow',
+        r'##\s+(?:\d+\.\s*)?Procedure',
+        r'##\s+(?:\d+\.\s*)?Lifecycle'
+    ]
+    if not any(re.search(pattern, content, re.IGNORECASE) for pattern in workflow_patterns):
+        errors.append("ワークフローまたは手順のセクション (## ワークフロー 等) が見つかりません。")
+    if not re.search(r'[぀-ゟ゠-ヿ一-鿿]', content):
+        errors.append("日本語が含まれていません。")
+    return errors
+
+
+class RuleScannerTest(unittest.TestCase):
+    """結合スキャナの判定が従来のルールごとの判定と一致する"""
+
+    SAMPLES = [
+        "",
+        "plain ascii text",
+        "Purpose Scope\n## Workflow\n",
+        "purpose scope\n##   procedure\n",
+        "## 1. Lifecycle\nSCOPE\nPURPOSE\n",
+        "##Workflow\nPurpose\n",
+        "Scope が先、Purpose は後\n## 12.  レビュー手順\n",
+        "目的\n## 手順策定\n",
+        "範囲のみ\n## 実行手順\n",
+        "# 見出し\n## レビュー観点\nひらがな\n",
+        "カタカナだけ\n## ライフサイクル\n",
+        "漢字\n## ワーク フロー\n",
+        "Purp ose Sco pe PPPPP SSSSS ####\n## \n",
+        "# ##  Workflow はインラインでも一致する\n",
+        "\n" * 100 + "目的\n" + "x" * 1000 + "\n## Procedure\n範囲\n",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.verifier = _load_verifier()
+
+    def assert_same_verdict(self, content):
+        errors = []
+        self.verifier.validate_common(content, errors)
+        self.assertEqual(errors, legacy_validate_common(content), repr(content[:80]))
+
+    def test_samples(self):
+        for content in self.SAMPLES:
+            with self.subTest(content=content[:40]):
+                self.assert_same_verdict(content)
+
+    def test_fixtures(self):
+        for path, content, _ in FIXTURES:
+            with self.subTest(path=path):
+                self.assert_same_verdict(content)
+
+    def test_repository_definitions(self):
+        root = SCRIPT.parent.parent
+        sources = sorted(root.glob("agents/*.md")) + sorted(root.glob("skills/*/SKILL.md"))
+        for source in sources:
+            with self.subTest(source=source.relative_to(root).as_posix()):
+                self.assert_same_verdict(source.read_text(encoding="utf-8"))
+
+    def test_scan_content_reports_first_matching_line(self):
+        verdicts = self.verifier.scan_content("first\n目的\nScope\n\n## Workflow\n")
+
+        self.assertEqual(verdicts, {"purpose": 2, "scope": 3, "workflow": 5, "japanese": 2})
+
+
+class ResultCacheTest(unittest.TestCase):
+    """既知のエラーを持つツリーで、キャッシュのヒット時とキャッシュなしの結果が一致する"""
+
+    maxDiff = None
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name) / "tree"
+        self.cache_dir = Path(self._tmp.name) / "cache"
+        for path, content, _ in FIXTURES:
+            target = self.root / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(content, encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def run_verifier(self, *args):
+        result = subprocess.run(
+            [sys.executable, str(SCRIPT), "--format", "ndjson", *args],
+            cwd=self.root, capture_output=True, text=True, timeout=60,
+        )
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        results = {
+            record["path"]: (record["status"], [issue["rule"] for issue in record["issues"]])
+            for record in records if record["type"] == "result"
+        }
+        return result.returncode, results
+
+    def run_cached(self, *args):
+        return self.run_verifier("--cache-dir", str(self.cache_dir), *args)
+
+    def expected(self):
+        results = {}
+        for path, _, rules in FIXTURES:
+            if path.startswith("skills/") and not path.endswith("/SKILL.md"):
+                path = str(Path(path).parent / "SKILL.md")
+            if rules is None:
+                results[path] = ("skipped", [])
+            else:
+                results[path] = ("fail" if rules else "pass", rules)
+        return results
+
+    def test_fresh_run_reports_known_errors(self):
+        returncode, results = self.run_verifier("--no-cache")
+
+        self.assertEqual(returncode, 1)
+        self.assertEqual(results, self.expected())
+
+    def test_cache_hit_matches_fresh_run(self):
+        fresh = self.run_verifier("--no-cache")
+        cold = self.run_cached()
+        self.assertTrue((self.cache_dir / "results.json").exists())
+        warm = self.run_cached()
+        parallel = self.run_cached("--jobs", "2")
+
+        self.assertEqual(cold, fresh)
+        self.assertEqual(warm, fresh)
+        self.assertEqual(parallel, fresh)
+
+    def test_cache_hit_after_touch_and_miss_after_edit(self):
+        self.run_cached()
+        english = self.root / "agents/deshi-english.md"
+        good = self.root / "agents/deshi-good.md"
+        # 内容が同じなら mtime が変わってもヒットし、内容が変わればミスになる
+        english.write_text(english.read_text(encoding="utf-8"), encoding="utf-8")
+        good.write_text(good.read_text(encoding="utf-8") + "\n## 範囲外の追記\nno scope here?\n",
+                        encoding="utf-8")
+        shutil.rmtree(self.root / "skills/proc-missing-skill")
+
+        _, results = self.run_cached()
+        _, fresh = self.run_verifier("--no-cache")
+
+        self.assertEqual(results, fresh)
+        self.assertEqual(results["agents/deshi-english.md"], ("fail", ["japanese"]))
+        self.assertNotIn("skills/proc-missing-skill/SKILL.md", results)
+
+    def test_cached_errors_follow_edits(self):
+        self.run_cached()
+        english = self.root / "agents/deshi-english.md"
+        english.write_text(english.read_text(encoding="utf-8") + "\n日本語を追記\n",
+                           encoding="utf-8")
+
+        _, results = self.run_cached()
+
+        self.assertEqual(results["agents/deshi-english.md"], ("pass", []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,40 +1,137 @@
 #!/usr/bin/env python3
+import argparse
+import functools
+import hashlib
+import json
+import os
 import re
+import subprocess
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-def is_draft(content):
+# 共有モジュール (markdown_document.py 等) を skills/proc-importing-skill/scripts から読む
+sys.path.insert(
+    0, str(Path(__file__).resolve().parent.parent / "skills" / "proc-importing-skill" / "scripts")
+)
+
+import markdown_document
+from markdown_document import MarkdownDocument
+
+# 読み込んだ共有モジュールの場所
+SHARED_SCRIPTS_DIR = Path(markdown_document.__file__).resolve().parent
+
+# 検証結果を左右するファイル（このスクリプトと、定義ファイルを読む共有モジュール）
+RULESET_FILES = [
+    Path(__file__).resolve(),
+    SHARED_SCRIPTS_DIR / "markdown_document.py",
+    SHARED_SCRIPTS_DIR / "document_reader.py",
+]
+
+DRAFT_RE = re.compile(r'^draft:\s*true\s*$', re.MULTILINE)
+DRAFT_STATUS = "> **Status**: Draft"
+AGENT_NAME_RE = re.compile(r'^(shihan|deshi)-[a-z-]+\.md$')
+SKILL_NAME_RE = re.compile(r'^(proc|action)-[a-z-]+-skill$')
+
+JAPANESE_CHARS = '\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF'
+JAPANESE_RE = re.compile(f'[{JAPANESE_CHARS}]')
+
+# ワークフロー/手順セクションとして認める見出し
+WORKFLOW_HEADINGS = [
+    'ワークフロー', '実行手順', '手順', '手順策定', 'レビュー観点',
+    'レビュー手順', 'ライフサイクル', 'Workflow', 'Procedure', 'Lifecycle',
+]
+
+# 本文ルール: (ルール名, 先頭文字, パターン, 未検出時のエラー) を報告順に並べる
+# 先頭文字は結合スキャナの先読みに使い、一致し得ない位置を C レベルで読み飛ばす
+CONTENT_RULES = [
+    ("purpose", 'P目', r'Purpose|目的', "目的 (Purpose) の記述が見つかりません。"),
+    ("scope", 'S範', r'Scope|範囲', "範囲 (Scope) の記述が見つかりません。"),
+    (
+        "workflow",
+        '#',
+        r'##\s+(?:\d+\.\s*)?(?:' + '|'.join(map(re.escape, WORKFLOW_HEADINGS)) + ')',
+        "ワークフローまたは手順のセクション (## ワークフロー 等) が見つかりません。",
+    ),
+    ("japanese", JAPANESE_CHARS, f'[{JAPANESE_CHARS}]', "日本語が含まれていません。"),
+]
+
+@functools.cache
+def rule_scanner(rule_names):
+    """指定したルールを名前付きグループの選択として1つに結合した正規表現"""
+    rules = {name: (first, pattern) for name, first, pattern, _ in CONTENT_RULES}
+    alternatives = '|'.join(f'(?P<{name}>{rules[name][1]})' for name in rule_names)
+    if len(rule_names) == 1:
+        # 単独のパターンは re 自身のリテラル接頭辞探索に任せた方が速い
+        return re.compile(alternatives, re.IGNORECASE)
+    first_chars = ''.join(rules[name][0] for name in rule_names)
+    return re.compile(f'(?=[{first_chars}])(?:{alternatives})', re.IGNORECASE)
+
+# --profile-rules で、最後まで一致しなかったルールの探索と正規表現の組み立てに計上する名前
+UNMATCHED = "(unmatched)"
+COMPILE = "(compile)"
+
+def scan_content(content):
+    """本文を先頭から一度だけ走査し、各ルールが最初に一致した行番号を返す
+
+    一致したルールは以降の走査パターンから外すため、各ルールの探索は
+    最初の一致で打ち切られ、走査位置は後戻りしない。未検出のルールは None。
+    """
+    verdicts = {name: None for name, _, _, _ in CONTENT_RULES}
+    pending = tuple(verdicts)
+    if content.isascii():
+        # ASCII のみの文書に日本語は現れないため、日本語の判定は走査せずに確定する
+        pending = tuple(name for name in pending if name != "japanese")
+    pos = 0
+    line = 1
+    while pending:
+        if PROFILER is None:
+            match = rule_scanner(pending).search(content, pos)
+        else:
+            # 結合した正規表現の1回の探索をルール単位には分けられないため、
+            # 探索1回分の時間を一致したルール (未一致なら残りのルール) に計上する
+            # (正規表現の組み立ては初回のみのため別に計上する)
+            started = time.perf_counter()
+            scanner = rule_scanner(pending)
+            PROFILER.record(f"scan:{COMPILE}", time.perf_counter() - started)
+            started = time.perf_counter()
+            match = scanner.search(content, pos)
+            PROFILER.record(
+                f"scan:{match.lastgroup if match else UNMATCHED}", time.perf_counter() - started
+            )
+        if not match:
+            break
+        line += content.count('\n', pos, match.start())
+        pos = match.start()
+        found = {match.lastgroup}
+        # 日本語の見出し語 (目的, ## 手順 等) は日本語ルールも同時に満たす
+        if "japanese" in pending and JAPANESE_RE.search(match.group()):
+            found.add("japanese")
+        for name in found:
+            verdicts[name] = line
+        pending = tuple(name for name in pending if name not in found)
+    return verdicts
+
+def is_draft(document):
     # Check for draft status in frontmatter or body
-    frontmatter_match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
-    if frontmatter_match:
-        frontmatter = frontmatter_match.group(1)
-        if re.search(r'^draft:\s*true\s*$', frontmatter, re.MULTILINE):
-            return True
-    
-    if "> **Status**: Draft" in content:
+    frontmatter = document.frontmatter_text
+    if frontmatter is not None and DRAFT_RE.search(frontmatter):
         return True
-    return False
+    
+    # 本文はデコードせず、ステータス表記の有無だけを調べる
+    return document.contains(DRAFT_STATUS)
 
 def has_japanese(text):
     # Check if string contains Japanese characters
-    return bool(re.search(r'[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF]', text))
+    return bool(JAPANESE_RE.search(text))
 
-def validate_frontmatter(content, file_path):
-    frontmatter_match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
-    if not frontmatter_match:
+def validate_frontmatter(document):
+    if document.frontmatter_text is None:
         return False, "フロントマターが見つかりません。"
     
-    frontmatter_text = frontmatter_match.group(1)
-    
-    # Simple regex-based YAML parser for key-value pairs
-    data = {}
-    for line in frontmatter_text.splitlines():
-        line = line.strip()
-        if not line or line.startswith('#'):
-            continue
-        if ':' in line:
-            key, value = line.split(':', 1)
-            data[key.strip()] = value.strip()
+    # key: value のみを解釈する簡易パーサーの結果
+    data = document.frontmatter
     
     if not data:
         return False, "フロントマターが空、または解析可能なキーが見つかりません。"
@@ -47,126 +144,677 @@ def validate_frontmatter(content, file_path):
     return True, data
 
 def validate_common(content, errors):
-    # Check for Purpose and Scope (often as bullet points or headers)
-    if not re.search(r'(Purpose|目的)', content, re.IGNORECASE):
-        errors.append("目的 (Purpose) の記述が見つかりません。")
-    if not re.search(r'(Scope|範囲)', content, re.IGNORECASE):
-        errors.append("範囲 (Scope) の記述が見つかりません。")
-    
-    # Check for Workflow/Procedure sections (flexible matching)
-    workflow_patterns = [
-        r'##\s+(?:\d+\.\s*)?ワークフロー',
-        r'##\s+(?:\d+\.\s*)?実行手順',
-        r'##\s+(?:\d+\.\s*)?手順',
-        r'##\s+(?:\d+\.\s*)?手順策定',
-        r'##\s+(?:\d+\.\s*)?レビュー観点',
-        r'##\s+(?:\d+\.\s*)?レビュー手順',
-        r'##\s+(?:\d+\.\s*)?ライフサイクル',
-        r'##\s+(?:\d+\.\s*)?Workflow',
-        r'##\s+(?:\d+\.\s*)?Procedure',
-        r'##\s+(?:\d+\.\s*)?Lifecycle'
-    ]
-    if not any(re.search(pattern, content, re.IGNORECASE) for pattern in workflow_patterns):
-        errors.append("ワークフローまたは手順のセクション (## ワークフロー 等) が見つかりません。")
-
-    # Check for Japanese content
-    if not has_japanese(content):
-        errors.append("日本語が含まれていません。")
-
-def validate_agent(file_path):
-    errors = []
-    name = file_path.name
-    
-    # 1. Naming convention
-    if not re.match(r'^(shihan|deshi)-[a-z-]+\.md$', name):
-        errors.append("命名規則違反: (shihan|deshi)-[a-z-]+.md に一致させる必要があります。")
-    
-    content = file_path.read_text(encoding='utf-8')
-    
-    if is_draft(content):
-        print(f"⚠️  {file_path} is a draft, skipping validation.")
-        return []
-
-    # 2. Frontmatter
-    success, result = validate_frontmatter(content, file_path)
-    if not success:
-        errors.append(result)
-    
-    # 3. Common content checks
-    validate_common(content, errors)
-        
+    # Purpose / Scope / ワークフロー見出し / 日本語 を単一パスで判定する
+    verdicts = scan_content(content)
+    for name, _, _, message in CONTENT_RULES:
+        if verdicts[name] is None:
+            errors.append(message)
+    return verdicts
+
+class RuleProfiler:
+    """ルール・文書パートごとの呼び出し回数と累積時間を集計する (--profile-rules)"""
+
+    def __init__(self):
+        self.stats = {}
+
+    def record(self, name, seconds):
+        entry = self.stats.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def merge(self, stats):
+        for name, (calls, seconds) in stats.items():
+            entry = self.stats.setdefault(name, [0, 0.0])
+            entry[0] += calls
+            entry[1] += seconds
+
+    def drain(self):
+        """ワーカーから親プロセスへ渡すため、集計を取り出してリセットする"""
+        stats, self.stats = self.stats, {}
+        return stats
+
+    def report(self, out):
+        # scan:* は part:scan の内訳のため、割合の分母に含めない
+        total = sum(
+            seconds for name, (_, seconds) in self.stats.items() if not name.startswith("scan:")
+        ) or 1.0
+        print("\n--- ルール別プロファイル ---", file=out)
+        print(
+            "(本文ルールの判定は part:scan の単一パス走査で行う。scan:<rule> はその内訳で、"
+            "結合した正規表現の探索1回ごとの時間を一致したルールに計上したもの。"
+            "ルール単独の照合コストではない。scan:(compile) は正規表現の組み立て、"
+            "scan:(unmatched) は最後まで一致しなかったルールの探索)",
+            file=out
+        )
+        print(f"{'rule':<20} {'calls':>7} {'total (ms)':>11} {'avg (us)':>9} {'share':>6}", file=out)
+        for name, (calls, seconds) in sorted(self.stats.items(), key=lambda item: -item[1][1]):
+            print(
+                f"{name:<20} {calls:>7} {seconds * 1000:>11.2f} "
+                f"{seconds / calls * 1e6:>9.1f} {seconds / total:>6.1%}",
+                file=out
+            )
+
+# 有効時のみ計測する (無効時は計測のオーバーヘッドを掛けない)
+PROFILER = None
+
+def enable_profiling():
+    global PROFILER
+    PROFILER = RuleProfiler()
+
+class Document:
+    """検証対象1件分。各パートは初回アクセス時に1度だけ計算して保持する
+
+    パート:
+    - name: ファイル名 (エージェント) またはディレクトリ名 (スキル)
+    - body: 定義ファイルの本文
+    - draft: ドラフトかどうか
+    - frontmatter: フロントマターの検証結果 (validate_frontmatter の戻り値)
+    - scan: 本文ルールの単一パス走査結果 (scan_content の戻り値)
+
+    定義ファイルは共有パーサー (MarkdownDocument) で開き、draft と frontmatter は
+    先頭部分のみから求める。本文全体は body を必要とするルールが実行されるまで
+    読み込まない。
+    """
+
+    def __init__(self, kind, path, content=None):
+        self.kind = kind
+        self.path = path
+        self.source = source_file(kind, path)
+        self._parts = {"name": path.name}
+        self._markdown = MarkdownDocument(text=content) if content is not None else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._markdown is not None:
+            self._markdown.close()
+
+    @property
+    def markdown(self):
+        if self._markdown is None:
+            self._markdown = MarkdownDocument.open(self.source)
+        return self._markdown
+
+    def part(self, name):
+        if name not in self._parts:
+            compute = getattr(self, f"_compute_{name}")
+            if PROFILER is None:
+                self._parts[name] = compute()
+            else:
+                started = time.perf_counter()
+                self._parts[name] = compute()
+                PROFILER.record(f"part:{name}", time.perf_counter() - started)
+        return self._parts[name]
+
+    def _compute_body(self):
+        return self.markdown.text
+
+    def _compute_draft(self):
+        return is_draft(self.markdown)
+
+    def _compute_frontmatter(self):
+        return validate_frontmatter(self.markdown)
+
+    def _compute_scan(self):
+        return scan_content(self.part("body"))
+
+class Rule:
+    """登録済みの検証ルール
+
+    needs に必要な文書パートを宣言し、check(doc) はエラーメッセージのリストを返す。
+    パターン類はモジュール読み込み時にコンパイル済みのものを使う。
+    """
+
+    def __init__(self, rule_id, description, needs, kinds, check):
+        self.rule_id = rule_id
+        self.description = description
+        self.needs = needs
+        self.kinds = kinds
+        self.check = check
+
+    def run(self, doc):
+        for part in self.needs:
+            doc.part(part)
+        if PROFILER is None:
+            messages = self.check(doc)
+        else:
+            started = time.perf_counter()
+            messages = self.check(doc)
+            PROFILER.record(self.rule_id, time.perf_counter() - started)
+        return [(self.rule_id, message) for message in messages]
+
+# 登録順がエラーの報告順になる
+RULES = []
+
+def register_rule(rule_id, description, needs, kinds=("agent", "skill")):
+    def decorator(check):
+        RULES.append(Rule(rule_id, description, tuple(needs), kinds, check))
+        return check
+    return decorator
+
+@register_rule("naming", "命名規則 ((shihan|deshi)-*.md / (proc|action)-*-skill)", needs=["name"])
+def check_naming(doc):
+    name = doc.part("name")
+    if doc.kind == "agent" and not AGENT_NAME_RE.match(name):
+        return ["命名規則違反: (shihan|deshi)-[a-z-]+.md に一致させる必要があります。"]
+    if doc.kind == "skill" and not SKILL_NAME_RE.match(name):
+        return ["命名規則違反: (proc|action)-[a-z-]+-skill に一致させる必要があります。"]
+    return []
+
+@register_rule("frontmatter", "フロントマターに name と description がある", needs=["frontmatter"])
+def check_frontmatter(doc):
+    success, result = doc.part("frontmatter")
+    return [] if success else [result]
+
+def register_content_rule(rule_id, description, message):
+    @register_rule(rule_id, description, needs=["scan"])
+    def check(doc):
+        return [message] if doc.part("scan")[rule_id] is None else []
+
+CONTENT_RULE_DESCRIPTIONS = {
+    "purpose": "目的 (Purpose) の記述がある",
+    "scope": "範囲 (Scope) の記述がある",
+    "workflow": "ワークフローまたは手順のセクションがある",
+    "japanese": "日本語で記述されている",
+}
+for _rule_id, _, _, _message in CONTENT_RULES:
+    register_content_rule(_rule_id, CONTENT_RULE_DESCRIPTIONS[_rule_id], _message)
+
+# 定義ファイルを読まずに判定できるルールと、本文を必要とするルール
+NAME_RULES = [rule for rule in RULES if rule.needs == ("name",)]
+BODY_RULES = [rule for rule in RULES if rule.needs != ("name",)]
+
+def apply_rules(doc, rules):
+    return [error for rule in rules if doc.kind in rule.kinds for error in rule.run(doc)]
+
+def validate_document(doc):
+    """文書を検証し、(ルール ID, メッセージ) のリストを返す (ドラフトは None)"""
+    errors = apply_rules(doc, NAME_RULES)
+    
+    if doc.kind == "skill" and not doc.source.exists():
+        errors.append(("skill-md", "SKILL.md が見つかりません。"))
+        return errors
+    
+    if doc.part("draft"):
+        return None
+    
+    errors += apply_rules(doc, BODY_RULES)
     return errors
 
-def validate_skill(dir_path):
-    errors = []
-    name = dir_path.name
+def validate_agent(file_path, content=None):
+    """エージェントを検証し、(ルール ID, メッセージ) のリストを返す (ドラフトは None)"""
+    with Document("agent", file_path, content) as doc:
+        return validate_document(doc)
+
+def validate_skill(dir_path, content=None):
+    """スキルを検証し、(ルール ID, メッセージ) のリストを返す (ドラフトは None)"""
+    with Document("skill", dir_path, content) as doc:
+        return validate_document(doc)
+
+DEFAULT_CACHE_DIR = ".cache/verify-best-practices"
+STREAM_FORMATS = ["ndjson", "sarif"]
+
+# (種別, 見出し, ディレクトリ) の表示順
+SECTIONS = [
+    ("agent", "Agents", "agents"),
+    ("skill", "Skills", "skills"),
+]
+
+def collect_targets(root):
+    """検証対象を (種別, パス) のリストとして決定的な順序で収集する"""
+    targets = []
+    for kind, _, section_dir in SECTIONS:
+        base = root / section_dir
+        if not base.exists():
+            continue
+        if kind == "agent":
+            targets.extend((kind, path) for path in sorted(base.glob("*.md")))
+        else:
+            targets.extend((kind, path) for path in sorted(base.iterdir()) if path.is_dir())
+    return targets
+
+def git_changed_paths(root, since=None, staged=False):
+    """git から変更されたパス (root からの相対) を取得する"""
+    if staged:
+        commands = [["git", "diff", "--cached", "--name-only", "--relative", "-z"]]
+    else:
+        commands = [
+            ["git", "diff", "--name-only", "--relative", "-z", since, "--"],
+            # 新規に追加されたがまだ git 管理下にないファイル
+            ["git", "ls-files", "--others", "--exclude-standard", "-z"],
+        ]
     
-    # 1. Naming convention
-    if not re.match(r'^(proc|action)-[a-z-]+-skill$', name):
-        errors.append("命名規則違反: (proc|action)-[a-z-]+-skill に一致させる必要があります。")
+    paths = []
+    for command in commands:
+        result = subprocess.run(command, cwd=root, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"{' '.join(command)} が失敗しました。")
+        paths.extend(path for path in result.stdout.split("\0") if path)
+    return paths
+
+def owning_target(root, changed):
+    """変更パスが属する (種別, パス) を返す。検証対象外のパスは None"""
+    parts = Path(changed).parts
+    if len(parts) == 2 and parts[0] == "agents" and parts[1].endswith(".md"):
+        return ("agent", root / parts[0] / parts[1])
+    if len(parts) >= 2 and parts[0] == "skills":
+        return ("skill", root / parts[0] / parts[1])
+    return None
+
+def targets_for_paths(root, paths):
+    """変更パスを所属するエージェントファイル/スキルディレクトリに対応付ける
+
+    ルールセット (このスクリプトと共有モジュール: RULESET_FILES) が変更された場合は
+    全対象を返す。削除済みの対象は含めない。
+    """
+    ruleset = set(RULESET_FILES)
+    found = set()
+    for changed in paths:
+        if (root / changed).resolve() in ruleset:
+            return collect_targets(root)
+        target = owning_target(root, changed)
+        if target is None:
+            continue
+        kind, path = target
+        if path.is_dir() if kind == "skill" else path.exists():
+            found.add(target)
     
-    skill_md = dir_path / "SKILL.md"
-    if not skill_md.exists():
-        errors.append("SKILL.md が見つかりません。")
-        return errors
+    # collect_targets と同じ順序 (エージェント → スキル、名前順) に並べる
+    order = {kind: index for index, (kind, _, _) in enumerate(SECTIONS)}
+    return sorted(found, key=lambda target: (order[target[0]], target[1]))
+
+def source_file(kind, path):
+    """検証結果を左右する定義ファイルのパスを返す"""
+    return path if kind == "agent" else path / "SKILL.md"
+
+def check_target(target):
+    # ワーカープロセスから呼ばれるため、出力はせず結果のみを返す
+    # 戻り値: (エラーのリスト（ドラフトの場合は None）, キャッシュ用の指紋, プロファイル)
+    errors, fingerprint = _check_target(target)
+    return errors, fingerprint, PROFILER.drain() if PROFILER is not None else None
+
+def _check_target(target):
+    kind, path = target
+    source = source_file(kind, path)
+    if not source.exists():
+        # SKILL.md 欠落はファイル読み込みを伴わないためキャッシュしない
+        return validate_skill(path), None
     
-    content = skill_md.read_text(encoding='utf-8')
+    stat = source.stat()
+    with Document(kind, path) as doc:
+        fingerprint = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": doc.markdown.reader.sha256(),
+        }
+        return validate_document(doc), fingerprint
+
+def run_checks(targets, jobs):
+    """検証を実行し、targets と同じ順序で (エラー, 指紋) を逐次返す"""
+    if jobs <= 1 or len(targets) <= 1:
+        yield from merge_profiles(map(check_target, targets))
+        return
     
-    if is_draft(content):
-        print(f"⚠️  {dir_path.name} is a draft, skipping validation.")
-        return []
+    workers = min(jobs, len(targets))
+    # IPC のオーバーヘッドを抑えるため、ワーカーあたり数チャンクに分けて渡す
+    chunksize = max(1, len(targets) // (workers * 4))
+    initializer = enable_profiling if PROFILER is not None else None
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer) as executor:
+        yield from merge_profiles(executor.map(check_target, targets, chunksize=chunksize))
+
+def merge_profiles(outcomes):
+    """check_target の結果から計測結果を取り除き、親プロセスの集計に合算する"""
+    for errors, fingerprint, stats in outcomes:
+        if stats:
+            PROFILER.merge(stats)
+        yield errors, fingerprint
+
+def ruleset_hash():
+    """ルールセット（RULESET_FILES）のハッシュ。ルールやパーサーが変われば全エントリが無効になる"""
+    digest = hashlib.sha256()
+    for path in RULESET_FILES:
+        digest.update(path.name.encode("utf-8") + b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+class ResultCache:
+    """定義ファイルの内容ハッシュをキーに検証結果を保持する永続キャッシュ
+
+    stat 情報 (mtime, size) が一致すればファイルを読まずにヒットとし、
+    stat が変わっていても内容ハッシュが一致すればヒットとして stat を更新する。
+    """
+
+    FILENAME = "results.json"
+
+    def __init__(self, cache_dir):
+        self.path = Path(cache_dir) / self.FILENAME
+        self.ruleset = ruleset_hash()
+        self.entries = {}
+        self.dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("ruleset") == self.ruleset:
+            self.entries = data.get("entries", {})
 
-    # 2. Frontmatter
-    success, result = validate_frontmatter(content, skill_md)
-    if not success:
-        errors.append(result)
+    def lookup(self, kind, path):
+        """キャッシュヒット時は (True, エラー) を、ミス時は (False, None) を返す"""
+        entry = self.entries.get(str(path))
+        if not entry or entry.get("kind") != kind:
+            return False, None
+        source = source_file(kind, path)
+        try:
+            stat = source.stat()
+        except OSError:
+            return False, None
+        if stat.st_size != entry["size"]:
+            return False, None
+        if stat.st_mtime_ns != entry["mtime_ns"]:
+            digest = hashlib.sha256(source.read_bytes()).hexdigest()
+            if digest != entry["sha256"]:
+                return False, None
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self.dirty = True
+        return True, entry["errors"]
+
+    def store(self, kind, path, errors, fingerprint):
+        if fingerprint is None:
+            return
+        self.entries[str(path)] = dict(fingerprint, kind=kind, errors=errors)
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        # 削除済みのファイルのエントリは捨てる
+        self.entries = {
+            key: entry for key, entry in self.entries.items()
+            if source_file(entry["kind"], Path(key)).exists()
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(
+            json.dumps({"ruleset": self.ruleset, "entries": self.entries}, ensure_ascii=False),
+            encoding='utf-8'
+        )
+        os.replace(tmp_path, self.path)
+
+def iter_results(targets, jobs, cache):
+    """キャッシュにない対象のみを検証し、targets と同じ順序で (対象, エラー) を逐次返す"""
+    if cache is None:
+        for target, (errors, _) in zip(targets, run_checks(targets, jobs)):
+            yield target, errors
+        return
     
-    # 3. Common content checks
-    validate_common(content, errors)
-        
-    return errors
+    hits = {}
+    misses = []
+    for index, (kind, path) in enumerate(targets):
+        hit, errors = cache.lookup(kind, path)
+        if hit:
+            hits[index] = errors
+        else:
+            misses.append(targets[index])
+    
+    checked = run_checks(misses, jobs)
+    for index, target in enumerate(targets):
+        if index in hits:
+            yield target, hits[index]
+            continue
+        errors, fingerprint = next(checked)
+        cache.store(target[0], target[1], errors, fingerprint)
+        yield target, errors
+    cache.save()
+
+# SARIF の rules 等で使うルール一覧 (SKILL.md の有無はルール適用前のゲートで判定する)
+RULE_DESCRIPTIONS = dict(
+    [(RULES[0].rule_id, RULES[0].description), ("skill-md", "スキルディレクトリに SKILL.md が存在する")]
+    + [(rule.rule_id, rule.description) for rule in RULES[1:]]
+)
 
-def main():
+class TextReporter:
+    """従来どおりの人間向け出力"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def start(self):
+        print("--- 構成検証開始 (Claude Code Best Practices) ---")
+
+    def notice(self, message):
+        print(f"\n{message}")
+
+    def section(self, section, section_dir):
+        print(f"\n[{section}] {self.root / section_dir}")
+
+    def result(self, kind, path, errors):
+        return report(kind, path, errors)
+
+    def finish(self, total_errors, total_targets):
+        print("\n--- 検証結果 ---")
+        if total_errors > 0:
+            print(f"合計 {total_errors} 個のエラーが見つかりました。")
+        else:
+            print("すべての構成がベストプラクティスに準拠しています。")
+
+class StreamReporter:
+    """NDJSON / SARIF で1対象ごとにレコードを出力する"""
+
+    def __init__(self, fmt):
+        from result_stream import open_stream
+        self.stream = open_stream(fmt, tool="verify-best-practices", rules=RULE_DESCRIPTIONS)
+
+    def start(self):
+        self.stream.start()
+
+    def notice(self, message):
+        print(message, file=sys.stderr)
+
+    def section(self, section, section_dir):
+        pass
+
+    def result(self, kind, path, errors):
+        source = source_file(kind, path)
+        if errors is None:
+            status, issues = "skipped", []
+        else:
+            status = "fail" if errors else "pass"
+            issues = [
+                {
+                    "rule": rule_id,
+                    "level": "error",
+                    "message": message,
+                    "line": 1 if rule_id == "frontmatter" else None,
+                }
+                for rule_id, message in errors
+            ]
+        self.stream.file_result(source.as_posix(), status, issues)
+        return len(errors or [])
+
+    def finish(self, total_errors, total_targets):
+        self.stream.finish({"targets": total_targets, "errors": total_errors})
+
+def report(kind, path, errors):
+    """1件分の検証結果を表示し、エラー数を返す"""
+    label = str(path) if kind == "agent" else path.name
+    if errors is None:
+        print(f"⚠️  {label} is a draft, skipping validation.")
+        errors = []
+    if errors:
+        print(f"❌ {label}")
+        for _, message in errors:
+            print(f"  - {message}")
+    else:
+        print(f"✅ {label}")
+    return len(errors)
+
+def watch(root, state, cache, reporter, poll_interval, force_polling):
+    """agents/ と skills/ を監視し、変更されたエージェント/スキルのみを再検証する
+
+    state は (種別, パス) -> エラー の対応で、全件の検証結果をメモリに保持する。
+    """
+    from file_watcher import FileWatcher
+
+    roots = [root / section_dir for _, _, section_dir in SECTIONS if (root / section_dir).exists()]
+    watcher = FileWatcher(roots, poll_interval=poll_interval, force_polling=force_polling)
+    reporter.notice(f"👀 変更を監視しています ({watcher.mode})。Ctrl+C で終了します。")
+    sys.stdout.flush()
+
+    try:
+        for changed in watcher.changes():
+            started = time.perf_counter()
+            paths = [os.path.relpath(path, root) for path in changed]
+            affected = targets_for_paths(root, paths)
+            # 削除・リネームされた対象は状態から取り除く
+            for path in paths:
+                target = owning_target(root, path)
+                if target in state and target not in affected:
+                    del state[target]
+                    kind, target_path = target
+                    label = target_path if kind == "agent" else target_path.name
+                    reporter.notice(f"🗑️  {label} が削除されました。")
+            for target in affected:
+                errors, fingerprint, _ = check_target(target)
+                state[target] = errors
+                if cache is not None:
+                    cache.store(target[0], target[1], errors, fingerprint)
+                if isinstance(reporter, TextReporter):
+                    print(f"[{time.strftime('%H:%M:%S')}] ", end="")
+                reporter.result(target[0], target[1], errors)
+            if cache is not None:
+                cache.save()
+            if affected and isinstance(reporter, TextReporter):
+                total = sum(len(errors or []) for errors in state.values())
+                elapsed = (time.perf_counter() - started) * 1000
+                print(f"  → 合計 {total} 個のエラー ({len(state)} 件中, {elapsed:.1f} ms)")
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        reporter.notice("監視を終了しました。")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="agents/ と skills/ の構成がベストプラクティスに準拠しているか検証する"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="並列に検証するプロセス数 (0 で CPU コア数、既定: 1)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"検証結果キャッシュの保存先 (既定: {DEFAULT_CACHE_DIR})"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="キャッシュを使わずにすべての対象を検証する"
+    )
+    scope = parser.add_mutually_exclusive_group()
+    scope.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help="REF から変更されたファイルが属するエージェント/スキルのみを検証する"
+    )
+    scope.add_argument(
+        "--staged",
+        action="store_true",
+        help="ステージされたファイルが属するエージェント/スキルのみを検証する (pre-commit 向け)"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="初回検証の後も常駐し、保存されたファイルのみを再検証する"
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="--watch で inotify を使わずポーリングで変更を検知する"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=0.1,
+        help="ポーリング間隔 (秒、既定: 0.1)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["text"] + STREAM_FORMATS,
+        default="text",
+        help="出力形式 (ndjson / sarif は1対象ごとに逐次出力、既定: text)"
+    )
+    parser.add_argument(
+        "--profile-rules",
+        action="store_true",
+        help=(
+            "ルールごとの累積時間と呼び出し回数を標準エラー出力に表示する"
+            " (本文ルールは単一パス走査 part:scan の探索ごとの時間を一致したルールに"
+            "計上した内訳 scan:<rule> を表示する)"
+        )
+    )
+    args = parser.parse_args(argv)
+    if args.watch and args.format == "sarif":
+        parser.error("--watch は --format sarif と併用できません。")
+    if args.watch and (args.staged or args.changed_since is not None):
+        parser.error("--watch は --changed-since / --staged と併用できません。")
+    if args.jobs < 0:
+        parser.error("--jobs には 0 以上の値を指定してください。")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
     root = Path(".")
-    agents_dir = root / "agents"
-    skills_dir = root / "skills"
+    if args.profile_rules:
+        enable_profiling()
+    reporter = TextReporter(root) if args.format == "text" else StreamReporter(args.format)
     
     total_errors = 0
     
-    print("--- 構成検証開始 (Claude Code Best Practices) ---")
-    
-    if agents_dir.exists():
-        print(f"\n[Agents] {agents_dir}")
-        for agent_file in sorted(agents_dir.glob("*.md")):
-            errors = validate_agent(agent_file)
-            if errors:
-                print(f"❌ {agent_file}")
-                for err in errors:
-                    print(f"  - {err}")
-                total_errors += len(errors)
-            else:
-                print(f"✅ {agent_file}")
-                
-    if skills_dir.exists():
-        print(f"\n[Skills] {skills_dir}")
-        for skill_path in sorted(skills_dir.iterdir()):
-            if skill_path.is_dir():
-                errors = validate_skill(skill_path)
-                if errors:
-                    print(f"❌ {skill_path.name}")
-                    for err in errors:
-                        print(f"  - {err}")
-                    total_errors += len(errors)
-                else:
-                    print(f"✅ {skill_path.name}")
-
-    print("\n--- 検証結果 ---")
-    if total_errors > 0:
-        print(f"合計 {total_errors} 個のエラーが見つかりました。")
-        sys.exit(1)
+    reporter.start()
+    
+    incremental = args.staged or args.changed_since is not None
+    if incremental:
+        try:
+            paths = git_changed_paths(root, since=args.changed_since, staged=args.staged)
+        except (OSError, RuntimeError) as e:
+            print(f"❌ 変更ファイルの取得に失敗しました: {e}", file=sys.stderr)
+            sys.exit(2)
+        targets = targets_for_paths(root, paths)
+        if not targets:
+            reporter.notice("検証対象となる変更はありません。")
     else:
-        print("すべての構成がベストプラクティスに準拠しています。")
+        targets = collect_targets(root)
+    cache = None if args.no_cache else ResultCache(root / args.cache_dir)
+    
+    # 結果は targets の順 (セクション順) に届くため、届いたものから出力する
+    results = iter_results(targets, args.jobs, cache)
+    state = {}
+    for kind, section, section_dir in SECTIONS:
+        if not (root / section_dir).exists():
+            continue
+        count = sum(1 for target_kind, _ in targets if target_kind == kind)
+        if incremental and not count:
+            continue
+        reporter.section(section, section_dir)
+        for _ in range(count):
+            target, errors = next(results)
+            state[target] = errors
+            total_errors += reporter.result(kind, target[1], errors)
+    # 未消費の場合に備えてキャッシュの保存まで進める
+    for _ in results:
+        pass
+
+    reporter.finish(total_errors, len(targets))
+    if PROFILER is not None:
+        PROFILER.report(sys.stderr)
+    if args.watch:
+        watch(root, state, cache, reporter, args.poll_interval, args.poll)
         sys.exit(0)
+    sys.exit(1 if total_errors > 0 else 0)
 
 if __name__ == "__main__":
     main()
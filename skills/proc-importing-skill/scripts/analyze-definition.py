@@ -13,6 +13,8 @@ import sys
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from markdown_document import MarkdownDocument
+
 
 class DefinitionAnalyzer:
     """定義ファイルを分析するクラス"""
@@ -30,25 +32,27 @@ class DefinitionAnalyzer:
 
         if main_file:
             print(f"[INFO] Main file found: {main_file.name}")
-            content = main_file.read_text(encoding='utf-8', errors='ignore')
+            doc = MarkdownDocument.open(main_file, errors='ignore')
         else:
             print("[WARNING] No main file found, using empty content")
-            content = ""
-
-        # 分析結果
-        result = {
-            'resource_type': self.resource_type,
-            'original_name': self._extract_name(main_file, content),
-            'description': self._extract_description(content),
-            'purpose': self._extract_purpose(content),
-            'scope': self._extract_scope(content),
-            'files': self._list_all_files(),
-            'dependencies': self._extract_dependencies(content),
-            'autonomy_level': self._detect_autonomy_level(content),
-            'has_scripts': self._has_scripts(),
-            'has_workflow': self._has_workflow(content),
-            'characteristics': self._analyze_characteristics(content)
-        }
+            doc = MarkdownDocument(text="")
+
+        # 分析結果（構造は共有パーサーの解析結果を、本文全体の傾向は text を使う）
+        with doc:
+            content = doc.text
+            result = {
+                'resource_type': self.resource_type,
+                'original_name': self._extract_name(main_file, doc),
+                'description': self._extract_description(doc),
+                'purpose': doc.field('Purpose'),
+                'scope': doc.field('Scope'),
+                'files': self._list_all_files(),
+                'dependencies': self._extract_dependencies(doc),
+                'autonomy_level': self._detect_autonomy_level(content),
+                'has_scripts': self._has_scripts(),
+                'has_workflow': self._has_workflow(content),
+                'characteristics': self._analyze_characteristics(content)
+            }
 
         return result
 
@@ -81,7 +85,7 @@ class DefinitionAnalyzer:
 
         return None
 
-    def _extract_name(self, main_file: Optional[Path], content: str) -> str:
+    def _extract_name(self, main_file: Optional[Path], doc: MarkdownDocument) -> str:
         """リソース名を抽出"""
         if main_file:
             # ファイル名から推測
@@ -93,9 +97,8 @@ class DefinitionAnalyzer:
             name = self.input_dir.name
 
         # タイトルから抽出を試みる
-        title_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-        if title_match:
-            title = title_match.group(1).strip()
+        title = doc.title
+        if title:
             # クリーンアップ
             title = re.sub(r'\s*\[.*?\]', '', title)  # リンクを削除
             title = re.sub(r'\s*\(.*?\)', '', title)  # 括弧を削除
@@ -104,20 +107,20 @@ class DefinitionAnalyzer:
 
         return name
 
-    def _extract_description(self, content: str) -> str:
+    def _extract_description(self, doc: MarkdownDocument) -> str:
         """説明を抽出"""
         # Purposeフィールドを探す
-        purpose_match = re.search(r'[-*]\s*Purpose:\s*(.+)$', content, re.MULTILINE | re.IGNORECASE)
-        if purpose_match:
-            return purpose_match.group(1).strip()
+        purpose = doc.field('Purpose')
+        if purpose:
+            return purpose
 
-        # descriptionフィールドを探す
-        desc_match = re.search(r'description:\s*(.+)$', content, re.MULTILINE | re.IGNORECASE)
-        if desc_match:
-            return desc_match.group(1).strip()
+        # descriptionフィールド（フロントマターまたはリスト項目）を探す
+        description = doc.frontmatter.get('description') or doc.field('Description')
+        if description:
+            return description
 
         # 最初の段落を使用
-        lines = content.split('\n')
+        lines = doc.text.split('\n')
         for i, line in enumerate(lines):
             line = line.strip()
             # ヘッダーをスキップ
@@ -135,20 +138,6 @@ class DefinitionAnalyzer:
 
         return "No description available"
 
-    def _extract_purpose(self, content: str) -> str:
-        """Purposeを抽出"""
-        purpose_match = re.search(r'[-*]\s*Purpose:\s*(.+)$', content, re.MULTILINE | re.IGNORECASE)
-        if purpose_match:
-            return purpose_match.group(1).strip()
-        return ""
-
-    def _extract_scope(self, content: str) -> str:
-        """Scopeを抽出"""
-        scope_match = re.search(r'[-*]\s*Scope:\s*(.+)$', content, re.MULTILINE | re.IGNORECASE)
-        if scope_match:
-            return scope_match.group(1).strip()
-        return ""
-
     def _list_all_files(self) -> List[str]:
         """全ファイルをリスト"""
         files = []
@@ -157,19 +146,14 @@ class DefinitionAnalyzer:
                 files.append(str(item.relative_to(self.input_dir)))
         return sorted(files)
 
-    def _extract_dependencies(self, content: str) -> List[str]:
+    def _extract_dependencies(self, doc: MarkdownDocument) -> List[str]:
         """依存関係を抽出"""
         dependencies = []
 
         # 依存関係セクションを探す
-        dep_section = re.search(
-            r'##\s+依存関係|##\s+Dependencies(.+?)(?=##|$)',
-            content,
-            re.DOTALL | re.IGNORECASE
-        )
-
-        if dep_section:
-            dep_text = dep_section.group(1)
+        dep_text = doc.section('依存関係', 'Dependencies')
+
+        if dep_text:
             # リスト項目を抽出
             for line in dep_text.split('\n'):
                 line = line.strip()
@@ -182,11 +166,10 @@ class DefinitionAnalyzer:
                         dependencies.append(dep.strip())
 
         # コードブロックから推測
-        code_blocks = re.findall(r'```(?:bash|sh|python)\n(.+?)```', content, re.DOTALL)
-        for block in code_blocks:
+        for block in doc.code_blocks_for('bash', 'sh', 'python'):
             # よく使われるコマンド
             for cmd in ['gh', 'git', 'jq', 'curl', 'python', 'node', 'npm', 'pip']:
-                if re.search(rf'\b{cmd}\b', block):
+                if re.search(rf'\b{cmd}\b', block.code):
                     if cmd not in dependencies:
                         dependencies.append(cmd)
 
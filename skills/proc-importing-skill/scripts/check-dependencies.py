@@ -15,6 +15,8 @@ import sys
 from pathlib import Path
 from typing import Dict
 
+from markdown_document import MarkdownDocument
+
 
 class DependencyChecker:
     """依存関係チェッククラス"""
@@ -69,9 +71,9 @@ class DependencyChecker:
         for filename in main_files:
             file_path = self.path / filename
             if file_path.exists():
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
-                self._parse_dependency_section(content)
-                self._parse_code_blocks(content)
+                with MarkdownDocument.open(file_path, errors='ignore') as doc:
+                    self._parse_dependency_section(doc)
+                    self._parse_code_blocks(doc)
 
         # スクリプトファイルから抽出
         script_dirs = ['scripts', 'bin', 'tools', 'verification']
@@ -80,17 +82,12 @@ class DependencyChecker:
             if dir_path.exists():
                 self._scan_scripts(dir_path)
 
-    def _parse_dependency_section(self, content: str):
+    def _parse_dependency_section(self, doc: MarkdownDocument):
         """依存関係セクションを解析"""
         # 依存関係セクションを探す
-        dep_section = re.search(
-            r'##\s+(?:依存関係|Dependencies)(.+?)(?=##|$)',
-            content,
-            re.DOTALL | re.IGNORECASE
-        )
+        dep_text = doc.section('依存関係', 'Dependencies')
 
-        if dep_section:
-            dep_text = dep_section.group(1)
+        if dep_text:
 
             # CLIツール
             cli_tools = ['gh', 'git', 'jq', 'curl', 'wget', 'docker', 'kubectl']
@@ -104,17 +101,15 @@ class DependencyChecker:
                 if pkg not in cli_tools:
                     self.dependencies['python_packages'].add(pkg)
 
-    def _parse_code_blocks(self, content: str):
+    def _parse_code_blocks(self, doc: MarkdownDocument):
         """コードブロックを解析"""
         # Bashコードブロック
-        bash_blocks = re.findall(r'```(?:bash|sh)\n(.+?)```', content, re.DOTALL)
-        for block in bash_blocks:
-            self._extract_cli_tools(block)
+        for block in doc.code_blocks_for('bash', 'sh'):
+            self._extract_cli_tools(block.code)
 
         # Pythonコードブロック
-        python_blocks = re.findall(r'```python\n(.+?)```', content, re.DOTALL)
-        for block in python_blocks:
-            self._extract_python_imports(block)
+        for block in doc.code_blocks_for('python'):
+            self._extract_python_imports(block.code)
 
     def _extract_cli_tools(self, code: str):
         """CLIツールを抽出"""
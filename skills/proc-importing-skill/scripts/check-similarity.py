@@ -11,7 +11,19 @@ import json
 import re
 import sys
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+from markdown_document import MarkdownDocument
+
+SYMBOL_RE = re.compile(r'[^\w\s-]')
+
+# ストップワード（一般的すぎる単語）
+STOP_WORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be',
+    'been', 'this', 'that', 'these', 'those', 'it', 'its', 'use', 'using',
+    'used', 'can', 'will', 'would', 'should', 'may', 'might', 'must'
+}
 
 
 class SimilarityChecker:
@@ -84,79 +96,51 @@ class SimilarityChecker:
 
         return result
 
-    def _extract_resource_info(self, path: Path) -> Dict:
+    def _extract_resource_info(self, path: Path) -> Optional[Dict]:
         """リソースの情報を抽出"""
         # メインファイルを探す
         main_files = ['SKILL.md', 'AGENT.md', 'README.md']
-        main_content = ""
 
         for filename in main_files:
             file_path = path / filename
             if file_path.exists():
-                main_content = file_path.read_text(encoding='utf-8', errors='ignore')
-                break
-
-        if not main_content:
-            return None
-
-        # 情報を抽出
-        info = {
-            'path': str(path),
-            'name': path.name,
-            'title': self._extract_title(main_content),
-            'purpose': self._extract_field(main_content, 'Purpose'),
-            'description': self._extract_field(main_content, 'Description'),
-            'keywords': self._extract_keywords(main_content),
-            'content_length': len(main_content)
-        }
-
-        return info
-
-    def _extract_title(self, content: str) -> str:
-        """タイトルを抽出"""
-        match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-        if match:
-            return match.group(1).strip()
-        return ""
-
-    def _extract_field(self, content: str, field_name: str) -> str:
-        """フィールドを抽出"""
-        pattern = rf'[-*]\s*{field_name}:\s*(.+)$'
-        match = re.search(pattern, content, re.MULTILINE | re.IGNORECASE)
-        if match:
-            return match.group(1).strip()
-        return ""
-
-    def _extract_keywords(self, content: str) -> List[str]:
-        """キーワードを抽出"""
-        # 小文字化して単語を抽出
-        content_lower = content.lower()
-
-        # 特殊文字を削除
-        content_clean = re.sub(r'[^\w\s-]', ' ', content_lower)
-
-        # 単語に分割
-        words = content_clean.split()
-
-        # ストップワード（一般的すぎる単語）を除外
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be',
-            'been', 'this', 'that', 'these', 'those', 'it', 'its', 'use', 'using',
-            'used', 'can', 'will', 'would', 'should', 'may', 'might', 'must'
-        }
-
+                # タイトル・フィールドは共有パーサーで該当行まで、キーワードは行単位の
+                # 走査で求め、大きな定義ファイルでも全文を一度にメモリへ載せない
+                with MarkdownDocument.open(file_path, errors='ignore') as doc:
+                    keywords, content_length = self._extract_keywords(doc)
+                    if not content_length:
+                        return None
+
+                    # 情報を抽出
+                    return {
+                        'path': str(path),
+                        'name': path.name,
+                        'title': doc.title,
+                        'purpose': doc.field('Purpose'),
+                        'description': doc.field('Description'),
+                        'keywords': keywords,
+                        'content_length': content_length
+                    }
+
+        return None
+
+    def _extract_keywords(self, doc: MarkdownDocument) -> Tuple[List[str], int]:
+        """キーワードと本文の文字数を1回の走査で求める"""
         # 頻出単語を抽出（長さ3文字以上、ストップワードでない）
+        # 単語は行をまたがないため、行単位で区切ったチャンクごとに小文字化・特殊文字の削除・分割を行う
         word_freq = {}
-        for word in words:
-            if len(word) >= 3 and word not in stop_words:
-                word_freq[word] = word_freq.get(word, 0) + 1
+        content_length = 0
+        for chunk in doc.iter_chunks():
+            content_length += len(chunk)
+            for word in SYMBOL_RE.sub(' ', chunk.lower()).split():
+                if len(word) >= 3 and word not in STOP_WORDS:
+                    word_freq[word] = word_freq.get(word, 0) + 1
 
         # 頻度順にソート
         keywords = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
 
         # 上位20個のキーワードを返す
-        return [word for word, freq in keywords[:20]]
+        return [word for word, freq in keywords[:20]], content_length
 
     def _calculate_similarity(self, info1: Dict, info2: Dict) -> float:
         """類似度を計算（0.0-1.0）"""
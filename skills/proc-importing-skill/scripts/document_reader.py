@@ -0,0 +1,136 @@
+"""
+定義ファイルの遅延読み込み
+
+フロントマターやタイトルの判定は先頭の数十 KB で足りるため、ファイルを
+mmap して先頭部分だけをデコードする (先頭部分に収まる小さなファイルは
+そのまま読み込む)。本文全体は body に初めてアクセスした時点で読み込み、
+キーワード集計のように行単位で済む処理は iter_lines() で全文を保持せずに
+走査する。取り込み対象は最大 100 MB (DefinitionFetcher.MAX_FILE_SIZE)
+になり得るため、不要な全文読み込みとデコードを避ける。
+
+Usage:
+    from document_reader import LazyDocument
+
+    with LazyDocument(Path('skills/foo/SKILL.md')) as doc:
+        match = doc.search(re.compile(r'^#\\s+(.+)$', re.MULTILINE))
+        if doc.contains('> **Status**: Draft'):
+            ...
+        body = doc.body  # ここで初めて全文を読み込む
+"""
+
+import hashlib
+import io
+import mmap
+from pathlib import Path
+from typing import Iterator, Match, Optional, Pattern
+
+# 先頭として読み込む量 (フロントマターと冒頭の見出し・フィールドが収まる大きさ)
+HEAD_BYTES = 64 * 1024
+
+
+class LazyDocument:
+    """先頭部分のみを即時に、本文全体は必要になった時点で読み込む文書"""
+
+    def __init__(self, path: Path, encoding: str = 'utf-8', errors: str = 'strict',
+                 head_bytes: int = HEAD_BYTES):
+        self.path = Path(path)
+        self.encoding = encoding
+        self.errors = errors
+        self._head_bytes = head_bytes
+        with open(self.path, 'rb') as f:
+            self.size = f.seek(0, 2)
+            if self.size <= head_bytes:
+                # 先頭部分に収まる小さなファイルは mmap せずに読み込む（空ファイルは mmap できない）
+                f.seek(0)
+                self._buffer = f.read()
+            else:
+                # mmap は元のファイルを閉じても有効
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._head: Optional[str] = None
+        self._body: Optional[str] = None
+        self.is_complete = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._buffer = b''
+
+    def _decode(self, data) -> str:
+        # バッファから直接デコードし (bytes へのコピーを作らない)、read_text() と同じく改行を \n に揃える
+        text = str(data, self.encoding, self.errors)
+        return text.replace('\r\n', '\n').replace('\r', '\n') if '\r' in text else text
+
+    @property
+    def head(self) -> str:
+        """先頭部分（行の途中で切らないよう、最後の改行までを返す）"""
+        if self._head is None:
+            if self.size <= self._head_bytes:
+                self._head = self.body
+            else:
+                end = self._buffer.rfind(b'\n', 0, self._head_bytes)
+                with memoryview(self._buffer) as view, view[:end + 1] as head:
+                    self._head = self._decode(head)
+        return self._head
+
+    @property
+    def body(self) -> str:
+        """本文全体（初回アクセス時に読み込む）"""
+        if self._body is None:
+            self._body = self._decode(self._buffer)
+            self.is_complete = True
+        return self._body
+
+    def search(self, pattern: Pattern) -> Optional[Match]:
+        """pattern を先頭部分で探し、見つからなければ本文全体で探す
+
+        先頭部分は完全な行のみで構成されるため、先頭部分での一致は
+        本文全体で探した場合の最初の一致と同じになる。
+        """
+        match = pattern.search(self.head)
+        if match or self.is_complete:
+            return match
+        return pattern.search(self.body)
+
+    def match(self, pattern: Pattern) -> Optional[Match]:
+        """文書の先頭での一致（フロントマター等）"""
+        match = pattern.match(self.head)
+        if match or self.is_complete:
+            return match
+        return pattern.match(self.body)
+
+    def contains(self, needle: str) -> bool:
+        """部分文字列を含むか（デコードせずにバイト列のまま探す）"""
+        if self._body is not None:
+            return needle in self._body
+        return self._buffer.find(needle.encode(self.encoding)) >= 0
+
+    def iter_lines(self) -> Iterator[str]:
+        """全文を保持せずに1行ずつ返す（改行を含む）"""
+        # 先頭部分に収まる小さなファイルは全文を読み込んだ方が速い
+        if self._body is not None or self.size <= self._head_bytes:
+            yield from io.StringIO(self.body)
+            return
+        with open(self.path, encoding=self.encoding, errors=self.errors) as f:
+            yield from f
+
+    def iter_chunks(self) -> Iterator[str]:
+        """行の途中で切らない HEAD_BYTES 程度のテキストを順に返す（全文は保持しない）"""
+        if self._body is not None or self.size <= self._head_bytes:
+            yield self.body
+            return
+        with open(self.path, encoding=self.encoding, errors=self.errors) as f:
+            while True:
+                lines = f.readlines(self._head_bytes)
+                if not lines:
+                    return
+                yield ''.join(lines)
+
+    def sha256(self) -> str:
+        """ファイル内容のハッシュ（mmap 上で計算し、バイト列のコピーを作らない）"""
+        return hashlib.sha256(self._buffer).hexdigest()
@@ -0,0 +1,189 @@
+"""
+ファイル変更の監視 (verify-best-practices.py / validate-structure.py の --watch 用)
+
+Linux では inotify を ctypes 経由で直接使い、利用できない環境では
+stat によるポーリングにフォールバックする。外部パッケージには依存しない。
+
+Usage:
+    from file_watcher import FileWatcher
+
+    watcher = FileWatcher([Path('agents'), Path('skills')])
+    for changed in watcher.changes():
+        ...  # changed: 変更されたパスの集合
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+)
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyBackend:
+    """inotify によるディレクトリ監視（サブディレクトリも再帰的に監視する）"""
+
+    def __init__(self, roots: List[Path]):
+        libc_name = ctypes.util.find_library('c')
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("inotify is not available")
+        self._libc = libc
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: Dict[int, Path] = {}
+        for root in roots:
+            self._add_tree(root)
+
+    def _add_tree(self, directory: Path):
+        """ディレクトリとその配下すべてに watch を登録する"""
+        if not directory.is_dir():
+            return
+        self._add_watch(directory)
+        for current, dirnames, _ in os.walk(directory):
+            for dirname in dirnames:
+                self._add_watch(Path(current) / dirname)
+
+    def _add_watch(self, directory: Path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self._watches[wd] = directory
+
+    def wait(self, timeout: Optional[float]) -> Set[Path]:
+        """イベントを待ち、変更されたパスを返す（タイムアウト時は空集合）"""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    # イベントの取りこぼし: 監視対象全体を変更扱いにする
+                    changed.update(self._watches.values())
+                    continue
+                directory = self._watches.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_IGNORED:
+                    del self._watches[wd]
+                    continue
+                path = directory / os.fsdecode(name) if name else directory
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    # 新しいディレクトリ（新規スキル等）も監視対象に加える
+                    self._add_tree(path)
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingBackend:
+    """stat の比較による監視（inotify が使えない環境向け）"""
+
+    def __init__(self, roots: List[Path], interval: float):
+        self._roots = roots
+        self._interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for root in self._roots:
+            for current, _, filenames in os.walk(root):
+                for filename in filenames:
+                    path = Path(current) / filename
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout: Optional[float]) -> Set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {
+                path for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is None:
+                time.sleep(self._interval)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return set()
+            time.sleep(min(self._interval, remaining))
+
+    def close(self):
+        pass
+
+
+class FileWatcher:
+    """変更されたパスをバッチで通知する監視クラス"""
+
+    # エディタの保存は複数イベント (一時ファイル作成 → rename 等) になるため、
+    # 最初のイベントから少し待って1つのバッチにまとめる
+    DEBOUNCE_SECONDS = 0.02
+
+    def __init__(self, roots: List[Path], poll_interval: float = 0.1, force_polling: bool = False):
+        self.roots = [Path(root) for root in roots]
+        self.backend = None
+        if not force_polling and sys.platform.startswith('linux'):
+            try:
+                self.backend = InotifyBackend(self.roots)
+                self.mode = 'inotify'
+            except OSError:
+                self.backend = None
+        if self.backend is None:
+            self.backend = PollingBackend(self.roots, poll_interval)
+            self.mode = 'polling'
+
+    def changes(self) -> Iterator[Set[Path]]:
+        """変更があるたびに、変更されたパスの集合を返すイテレータ"""
+        try:
+            while True:
+                changed = self.backend.wait(None)
+                if not changed:
+                    continue
+                changed |= self.backend.wait(self.DEBOUNCE_SECONDS)
+                yield changed
+        finally:
+            self.backend.close()
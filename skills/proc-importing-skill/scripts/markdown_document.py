@@ -0,0 +1,331 @@
+"""
+定義ファイル (SKILL.md / AGENT.md 等) の共有パーサー
+
+フロントマター・見出しツリー・フィールド (`- Purpose: ...` 形式のリスト項目)・
+フェンス付きコードブロックを1回の走査で解析し、結果をアクセサごとに保持する。
+analyze-definition.py / check-similarity.py / validate-structure.py /
+check-dependencies.py / verify-best-practices.py が同じ解析結果を使う。
+
+解析は必要になった分だけ進める。title や field() は該当する行に達した時点で
+走査を止め、headings / code_blocks 等の全体が必要なアクセサでのみ末尾まで読む。
+大きなファイルは LazyDocument 経由でチャンク単位に読み、全文を保持しない
+(text / section() にアクセスした場合を除く)。
+
+Usage:
+    from markdown_document import MarkdownDocument
+
+    with MarkdownDocument.open(Path('skills/foo/SKILL.md')) as doc:
+        doc.frontmatter.get('name')
+        doc.title
+        doc.field('Purpose')
+        doc.section('依存関係', 'Dependencies')
+        [block.code for block in doc.code_blocks_for('bash', 'sh')]
+"""
+
+import io
+import itertools
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from document_reader import LazyDocument
+
+FRONTMATTER_RE = re.compile(r'^---\s*\n(.*?)\n---\s*\n', re.DOTALL)
+HEADING_RE = re.compile(r'^ {0,3}(#{1,6})[ \t]+(.+?)(?:[ \t]+#+)?[ \t]*$')
+FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})[ \t]*([^`\s]*)')
+FIELD_RE = re.compile(r'^\s*[-*]\s*([^:\n]+?):\s*(.+?)\s*$')
+# 構造を持ち得る行 (空白を除いた先頭が ` ~ # - * の行)。それ以外の行は読み飛ばす
+MARKUP_LINE_RE = re.compile(r'^[ \t]*[`~#*-][^\n]*', re.MULTILINE)
+
+
+class Heading:
+    """見出し1件（children に直下の下位見出しを持つ）"""
+
+    def __init__(self, level: int, text: str, line: int, parent: Optional['Heading'] = None):
+        self.level = level
+        self.text = text
+        self.line = line
+        self.parent = parent
+        self.children: List[Heading] = []
+        # 次の同格以上の見出しの行番号 (末尾まで続く場合は None)
+        self.end_line: Optional[int] = None
+
+    def __repr__(self):
+        return f"Heading({'#' * self.level} {self.text!r}, line={self.line})"
+
+
+class CodeBlock:
+    """フェンス付きコードブロック1件"""
+
+    def __init__(self, language: str, code: str, line: int):
+        self.language = language
+        self.code = code
+        self.line = line
+
+    def __repr__(self):
+        return f"CodeBlock({self.language!r}, line={self.line})"
+
+
+class MarkdownDocument:
+    """1ファイル分の解析結果（各アクセサは初回アクセス時に1度だけ計算する）"""
+
+    def __init__(self, text: Optional[str] = None, reader: Optional[LazyDocument] = None):
+        if (text is None) == (reader is None):
+            raise ValueError("Specify exactly one of text or reader")
+        self._text = text
+        self._reader = reader
+        self._frontmatter_match = None
+        self._frontmatter: Optional[Dict[str, str]] = None
+
+        # 解析の状態
+        self._parser: Optional[Iterator[None]] = None
+        self._done = False
+        self._fence = None
+        self._stack: List[Heading] = []
+        self._headings: List[Heading] = []
+        self._roots: List[Heading] = []
+        self._title: Optional[str] = None
+        self._fields: Dict[str, str] = {}
+        self._code_blocks: List[CodeBlock] = []
+
+    @classmethod
+    def open(cls, path: Path, errors: str = 'strict') -> 'MarkdownDocument':
+        """ファイルを遅延読み込みで開く（close() または with で閉じる）"""
+        return cls(reader=LazyDocument(path, errors=errors))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._parser is not None:
+            self._parser.close()
+        if self._reader is not None:
+            self._reader.close()
+
+    # ------------------------------------------------------------------
+    # 本文
+
+    @property
+    def reader(self) -> Optional[LazyDocument]:
+        return self._reader
+
+    @property
+    def text(self) -> str:
+        """本文全体（ファイルから開いた場合は初回アクセス時に読み込む）"""
+        if self._text is None:
+            self._text = self._reader.body
+        return self._text
+
+    @property
+    def size(self) -> int:
+        return self._reader.size if self._reader is not None else len(self._text)
+
+    def iter_lines(self) -> Iterator[str]:
+        """全文を保持せずに1行ずつ返す（改行を含む）"""
+        if self._text is not None:
+            yield from io.StringIO(self._text)
+        else:
+            yield from self._reader.iter_lines()
+
+    def iter_chunks(self) -> Iterator[str]:
+        """行の途中で切らない数十 KB 単位のテキストを順に返す"""
+        if self._text is not None:
+            yield self._text
+        else:
+            yield from self._reader.iter_chunks()
+
+    def contains(self, needle: str) -> bool:
+        """部分文字列を含むか（ファイルの場合はデコードせずに探す）"""
+        if self._text is not None:
+            return needle in self._text
+        return self._reader.contains(needle)
+
+    # ------------------------------------------------------------------
+    # フロントマター
+
+    def _match_frontmatter(self):
+        if self._frontmatter_match is None:
+            if self._text is not None:
+                match = FRONTMATTER_RE.match(self._text)
+            else:
+                match = self._reader.match(FRONTMATTER_RE)
+            self._frontmatter_match = match or False
+        return self._frontmatter_match or None
+
+    @property
+    def frontmatter_text(self) -> Optional[str]:
+        """フロントマター (--- で囲まれた部分) の中身。ない場合は None"""
+        match = self._match_frontmatter()
+        return match.group(1) if match else None
+
+    @property
+    def frontmatter(self) -> Dict[str, str]:
+        """フロントマターの `key: value` を辞書にしたもの（値のネストは解釈しない）"""
+        if self._frontmatter is None:
+            data = {}
+            for line in (self.frontmatter_text or '').splitlines():
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                if ':' in line:
+                    key, value = line.split(':', 1)
+                    data[key.strip()] = value.strip()
+            self._frontmatter = data
+        return self._frontmatter
+
+    # ------------------------------------------------------------------
+    # 解析
+
+    def _advance(self, until=None):
+        """until() が真になるか末尾に達するまで解析を進める"""
+        if self._done or (until is not None and until()):
+            return
+        if self._parser is None:
+            self._parser = self._parse()
+        for _ in self._parser:
+            if until is not None and until():
+                return
+        self._done = True
+        self._parser = None
+
+    def _parse(self) -> Iterator[None]:
+        """構造を持つ行を1つ解析するたびに制御を返すジェネレータ
+
+        本文は行の途中で切らないチャンク単位で受け取り、MARKUP_LINE_RE に
+        一致する行だけを Python 側で解析する。コードブロックの中身は行ごとに
+        連結せず、チャンクのスライスとして取り出す。
+        """
+        match = self._match_frontmatter()
+        # フロントマターは本文として解析しない
+        skip = len(match.group(0)) if match else 0
+        newlines = 0
+        for chunk in self.iter_chunks():
+            pos = 0
+            if skip:
+                if skip >= len(chunk):
+                    skip -= len(chunk)
+                    newlines += chunk.count('\n')
+                    continue
+                pos, skip = skip, 0
+                newlines += chunk.count('\n', 0, pos)
+            if self._fence is not None:
+                self._fence[5] = pos
+
+            for line_match in MARKUP_LINE_RE.finditer(chunk, pos):
+                newlines += chunk.count('\n', pos, line_match.start())
+                pos = line_match.start()
+                line_no = newlines + 1
+                line = line_match.group()
+
+                if self._fence is not None:
+                    char, length, language, start, pieces, code_start = self._fence
+                    stripped = line.strip()
+                    if stripped.startswith(char * length) and not stripped.strip(char):
+                        pieces.append(chunk[code_start:pos])
+                        self._code_blocks.append(CodeBlock(language, ''.join(pieces), start))
+                        self._fence = None
+                    continue
+
+                fence = FENCE_RE.match(line)
+                if fence:
+                    marker = fence.group(1)
+                    self._fence = [marker[0], len(marker), fence.group(2).lower(), line_no, [],
+                                   line_match.end() + 1]
+                    continue
+
+                heading = HEADING_RE.match(line)
+                if heading:
+                    self._add_heading(len(heading.group(1)), heading.group(2).strip(), line_no)
+                    yield
+                    continue
+
+                field = FIELD_RE.match(line)
+                if field:
+                    # 同名のフィールドは最初の記述を採用する
+                    self._fields.setdefault(field.group(1).strip().lower(), field.group(2))
+                    yield
+
+            newlines += chunk.count('\n', pos)
+            if self._fence is not None:
+                self._fence[4].append(chunk[self._fence[5]:])
+
+    def _add_heading(self, level: int, text: str, line_no: int):
+        while self._stack and self._stack[-1].level >= level:
+            self._stack.pop().end_line = line_no
+        parent = self._stack[-1] if self._stack else None
+        heading = Heading(level, text, line_no, parent)
+        (parent.children if parent else self._roots).append(heading)
+        self._stack.append(heading)
+        self._headings.append(heading)
+        if level == 1 and self._title is None:
+            self._title = text
+
+    # ------------------------------------------------------------------
+    # 構造アクセサ
+
+    @property
+    def headings(self) -> List[Heading]:
+        """全見出し（出現順、コードブロック内は除く）"""
+        self._advance()
+        return self._headings
+
+    @property
+    def heading_tree(self) -> List[Heading]:
+        """最上位の見出し（下位見出しは children でたどる）"""
+        self._advance()
+        return self._roots
+
+    @property
+    def title(self) -> str:
+        """最初のレベル1見出し。ない場合は空文字列"""
+        self._advance(until=lambda: self._title is not None)
+        return self._title or ""
+
+    @property
+    def first_heading(self) -> Optional[Heading]:
+        """本文の最初の見出し（レベルを問わない）"""
+        self._advance(until=lambda: bool(self._headings))
+        return self._headings[0] if self._headings else None
+
+    @property
+    def fields(self) -> Dict[str, str]:
+        """`- Key: value` 形式のリスト項目（キーは小文字）"""
+        self._advance()
+        return self._fields
+
+    def field(self, name: str) -> str:
+        """フィールドの値（大文字小文字を区別しない）。ない場合は空文字列"""
+        key = name.lower()
+        self._advance(until=lambda: key in self._fields)
+        return self._fields.get(key, "")
+
+    @property
+    def code_blocks(self) -> List[CodeBlock]:
+        """フェンス付きコードブロック（閉じられていないものは含まない）"""
+        self._advance()
+        return self._code_blocks
+
+    def code_blocks_for(self, *languages: str) -> List[CodeBlock]:
+        return [block for block in self.code_blocks if block.language in languages]
+
+    @property
+    def has_unclosed_fence(self) -> bool:
+        self._advance()
+        return self._fence is not None
+
+    def find_heading(self, *names: str) -> Optional[Heading]:
+        """テキストが names のいずれかで始まる最初の見出し（大文字小文字を区別しない）"""
+        prefixes = tuple(name.lower() for name in names)
+        return next((h for h in self.headings if h.text.lower().startswith(prefixes)), None)
+
+    def section(self, *names: str) -> Optional[str]:
+        """見出し names の直下から、次の同格以上の見出しまでの本文。ない場合は None"""
+        heading = self.find_heading(*names)
+        if heading is None:
+            return None
+        start = heading.line
+        stop = heading.end_line - 1 if heading.end_line is not None else None
+        return ''.join(itertools.islice(self.iter_lines(), start, stop))
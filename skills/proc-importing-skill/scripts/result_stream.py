@@ -0,0 +1,129 @@
+"""
+検証結果のストリーミング出力 (NDJSON / SARIF)
+
+verify-best-practices.py / validate-structure.py の --format 用の共有モジュール。
+ファイル1件の検証が終わるたびにレコードを書き出して flush するため、
+大きなツリーでも利用側は全体の完了を待たずに結果を逐次処理できる。
+
+Usage:
+    stream = open_stream('ndjson', tool='validate-structure')
+    stream.start()
+    stream.file_result('skills/foo/SKILL.md', 'fail',
+                       [{'rule': 'required-field', 'level': 'error', 'message': '...', 'line': 3}])
+    stream.finish({'files': 1, 'errors': 1})
+
+issue は rule / level (error|warning|note) / message / line (任意) を持つ辞書。
+"""
+
+import json
+import sys
+from typing import Dict, List, Optional, TextIO
+
+FORMATS = ['ndjson', 'sarif']
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+SARIF_VERSION = '2.1.0'
+
+# ファイル単位の判定 → SARIF の result.kind
+SARIF_KINDS = {
+    'pass': 'pass',
+    'skipped': 'notApplicable',
+}
+
+
+class NdjsonStream:
+    """1ファイル1行の JSON を出力する"""
+
+    def __init__(self, tool: str, out: Optional[TextIO] = None):
+        self.tool = tool
+        self.out = out or sys.stdout
+
+    def _write(self, record: Dict):
+        self.out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.out.flush()
+
+    def start(self):
+        pass
+
+    def file_result(self, path: str, status: str, issues: List[Dict]):
+        self._write({
+            'type': 'result',
+            'tool': self.tool,
+            'path': path,
+            'status': status,
+            'issues': issues,
+        })
+
+    def finish(self, summary: Dict):
+        self._write(dict({'type': 'summary', 'tool': self.tool}, **summary))
+
+
+class SarifStream:
+    """SARIF 2.1.0 のログを results 配列の要素単位で逐次出力する"""
+
+    def __init__(self, tool: str, rules: Optional[Dict[str, str]] = None,
+                 out: Optional[TextIO] = None):
+        self.tool = tool
+        self.rules = rules or {}
+        self.out = out or sys.stdout
+        self._first = True
+
+    def start(self):
+        driver = {
+            'name': self.tool,
+            'rules': [
+                {'id': rule_id, 'shortDescription': {'text': text}}
+                for rule_id, text in self.rules.items()
+            ],
+        }
+        header = json.dumps({'version': SARIF_VERSION, '$schema': SARIF_SCHEMA}, ensure_ascii=False)
+        # 閉じ括弧の手前までを書き、以降は results の要素を追記していく
+        self.out.write(header[:-1] + ', "runs": [{"tool": ')
+        self.out.write(json.dumps({'driver': driver}, ensure_ascii=False))
+        self.out.write(', "results": [\n')
+        self.out.flush()
+
+    def _write_result(self, result: Dict):
+        if not self._first:
+            self.out.write(',\n')
+        self._first = False
+        self.out.write(json.dumps(result, ensure_ascii=False))
+
+    def file_result(self, path: str, status: str, issues: List[Dict]):
+        location = {'physicalLocation': {'artifactLocation': {'uri': path}}}
+        if not issues:
+            self._write_result({
+                'kind': SARIF_KINDS.get(status, 'pass'),
+                'level': 'none',
+                'message': {'text': status},
+                'locations': [location],
+            })
+        for issue in issues:
+            issue_location = location
+            if issue.get('line'):
+                issue_location = {'physicalLocation': dict(
+                    location['physicalLocation'], region={'startLine': issue['line']}
+                )}
+            self._write_result({
+                'ruleId': issue['rule'],
+                'level': issue.get('level', 'error'),
+                'message': {'text': issue['message']},
+                'locations': [issue_location],
+            })
+        self.out.flush()
+
+    def finish(self, summary: Dict):
+        self.out.write('\n], "properties": ')
+        self.out.write(json.dumps(summary, ensure_ascii=False))
+        self.out.write('}]}\n')
+        self.out.flush()
+
+
+def open_stream(fmt: str, tool: str, rules: Optional[Dict[str, str]] = None,
+                out: Optional[TextIO] = None):
+    """--format の値に対応するストリームを返す"""
+    if fmt == 'ndjson':
+        return NdjsonStream(tool, out)
+    if fmt == 'sarif':
+        return SarifStream(tool, rules, out)
+    raise ValueError(f"Unknown format: {fmt}")
@@ -4,38 +4,69 @@
 
 Usage:
     validate-structure.py --path <resource_path> --type <skill|agent>
+    validate-structure.py --path <resource_path> --type <skill|agent> --watch
 """
 
 import argparse
 import json
 import re
 import sys
+import time
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
+
+from markdown_document import MarkdownDocument
 
 
 class StructureValidator:
     """構造検証クラス"""
 
-    def __init__(self, path: str, resource_type: str):
+    def __init__(self, path: str, resource_type: str, stream=None):
         self.path = Path(path)
         self.resource_type = resource_type
         self.errors = []
         self.warnings = []
         self.info_messages = []
+        # --format ndjson|sarif 用: ファイルごとの指摘を溜め、検査が終わるたびに出力する
+        self.stream = stream
+        self._pending_issues = []
+
+    def _error(self, message: str, rule: str, line: Optional[int] = None):
+        self.errors.append(message)
+        self._pending_issues.append({'rule': rule, 'level': 'error', 'message': message, 'line': line})
+
+    def _warning(self, message: str, rule: str, line: Optional[int] = None):
+        self.warnings.append(message)
+        self._pending_issues.append({'rule': rule, 'level': 'warning', 'message': message, 'line': line})
+
+    def _emit(self, file_path: Path):
+        """1ファイル分の検査結果をストリームに出力する"""
+        issues, self._pending_issues = self._pending_issues, []
+        if self.stream is None:
+            return
+        if any(issue['level'] == 'error' for issue in issues):
+            status = 'fail'
+        elif issues:
+            status = 'warn'
+        else:
+            status = 'pass'
+        self.stream.file_result(file_path.as_posix(), status, issues)
 
     def validate(self) -> Dict:
         """検証を実行"""
-        print(f"[INFO] Validating structure: {self.path}")
-        print(f"[INFO] Resource type: {self.resource_type}")
+        if self.stream is None:
+            print(f"[INFO] Validating structure: {self.path}")
+            print(f"[INFO] Resource type: {self.resource_type}")
 
         # ディレクトリの存在確認
         if not self.path.exists():
-            self.errors.append(f"Path does not exist: {self.path}")
+            self._error(f"Path does not exist: {self.path}", 'path')
+            self._emit(self.path)
             return self._build_result()
 
         if not self.path.is_dir():
-            self.errors.append(f"Path is not a directory: {self.path}")
+            self._error(f"Path is not a directory: {self.path}", 'path')
+            self._emit(self.path)
             return self._build_result()
 
         # 命名規則の検証
@@ -47,10 +78,12 @@ class StructureValidator:
         elif self.resource_type == 'agent':
             self._validate_agent_structure()
         else:
-            self.errors.append(f"Unknown resource type: {self.resource_type}")
+            self._error(f"Unknown resource type: {self.resource_type}", 'resource-type')
+            self._emit(self.path)
 
         # 結果を表示
-        self._print_results()
+        if self.stream is None:
+            self._print_results()
 
         return self._build_result()
 
@@ -61,9 +94,10 @@ class StructureValidator:
         if self.resource_type == 'skill':
             # proc-*, action-*, cond-* のいずれかで始まる
             if not re.match(r'^(proc|action|cond)-.+-skill$', name):
-                self.errors.append(
+                self._error(
                     f"Invalid skill name format: {name}\n"
-                    f"  Expected: [proc|action|cond]-[action]-skill"
+                    f"  Expected: [proc|action|cond]-[action]-skill",
+                    'naming'
                 )
             else:
                 self.info_messages.append(f"✓ Skill naming convention: {name}")
@@ -71,19 +105,23 @@ class StructureValidator:
         elif self.resource_type == 'agent':
             # shihan-*, deshi-* のいずれかで始まる
             if not re.match(r'^(shihan|deshi)-.+$', name):
-                self.errors.append(
+                self._error(
                     f"Invalid agent name format: {name}\n"
-                    f"  Expected: [shihan|deshi]-[specialty]"
+                    f"  Expected: [shihan|deshi]-[specialty]",
+                    'naming'
                 )
             else:
                 self.info_messages.append(f"✓ Agent naming convention: {name}")
 
+        self._emit(self.path)
+
     def _validate_skill_structure(self):
         """スキル構造を検証"""
         # 必須ファイル: SKILL.md
         skill_md = self.path / 'SKILL.md'
         if not skill_md.exists():
-            self.errors.append("Required file missing: SKILL.md")
+            self._error("Required file missing: SKILL.md", 'required-file')
+            self._emit(skill_md)
         else:
             self.info_messages.append("✓ SKILL.md exists")
             self._validate_skill_md(skill_md)
@@ -94,9 +132,10 @@ class StructureValidator:
             dir_path = self.path / dir_name
             if dir_path.exists():
                 if not dir_path.is_dir():
-                    self.warnings.append(f"{dir_name} exists but is not a directory")
+                    self._warning(f"{dir_name} exists but is not a directory", 'optional-directory')
                 else:
                     self.info_messages.append(f"✓ Optional directory: {dir_name}/")
+                self._emit(dir_path)
 
         # ファイル命名規則
         self._check_file_naming()
@@ -106,7 +145,8 @@ class StructureValidator:
         # 必須ファイル: AGENT.md
         agent_md = self.path / 'AGENT.md'
         if not agent_md.exists():
-            self.errors.append("Required file missing: AGENT.md")
+            self._error("Required file missing: AGENT.md", 'required-file')
+            self._emit(agent_md)
         else:
             self.info_messages.append("✓ AGENT.md exists")
             self._validate_agent_md(agent_md)
@@ -117,76 +157,68 @@ class StructureValidator:
             dir_path = self.path / dir_name
             if dir_path.exists():
                 if not dir_path.is_dir():
-                    self.warnings.append(f"{dir_name} exists but is not a directory")
+                    self._warning(f"{dir_name} exists but is not a directory", 'optional-directory')
                 else:
                     self.info_messages.append(f"✓ Optional directory: {dir_name}/")
+                self._emit(dir_path)
 
         # ファイル命名規則
         self._check_file_naming()
 
     def _validate_skill_md(self, skill_md: Path):
         """SKILL.mdの内容を検証"""
-        content = skill_md.read_text(encoding='utf-8', errors='ignore')
-
-        # ヘッダーの検証
-        if not content.startswith('#'):
-            self.errors.append("SKILL.md must start with a title (# Title)")
-
-        # 必須フィールドの検証
-        required_fields = ['Purpose', 'Scope']
-        for field in required_fields:
-            pattern = rf'[-*]\s*{field}:\s*.+'
-            if not re.search(pattern, content, re.MULTILINE | re.IGNORECASE):
-                self.errors.append(f"SKILL.md missing required field: {field}")
+        with MarkdownDocument.open(skill_md, errors='ignore') as doc:
+            self._validate_title_and_fields(doc, skill_md)
+
+            # ワークフローセクションの確認
+            workflow_keywords = ['workflow', 'ワークフロー', 'plan', 'execute', 'verify']
+            content_lower = doc.text.lower()
+            has_workflow = any(keyword in content_lower for keyword in workflow_keywords)
+            if not has_workflow:
+                self._warning("SKILL.md does not contain workflow section", 'workflow')
             else:
-                self.info_messages.append(f"✓ Field present: {field}")
-
-        # ワークフローセクションの確認
-        workflow_keywords = ['workflow', 'ワークフロー', 'plan', 'execute', 'verify']
-        has_workflow = any(keyword in content.lower() for keyword in workflow_keywords)
-        if not has_workflow:
-            self.warnings.append("SKILL.md does not contain workflow section")
-        else:
-            self.info_messages.append("✓ Workflow section detected")
+                self.info_messages.append("✓ Workflow section detected")
 
-        # Markdown構文の検証
-        self._validate_markdown(content, skill_md)
+            # Markdown構文の検証
+            self._validate_markdown(doc, skill_md)
+        self._emit(skill_md)
 
     def _validate_agent_md(self, agent_md: Path):
         """AGENT.mdの内容を検証"""
-        content = agent_md.read_text(encoding='utf-8', errors='ignore')
+        with MarkdownDocument.open(agent_md, errors='ignore') as doc:
+            self._validate_title_and_fields(doc, agent_md)
+
+            # Markdown構文の検証
+            self._validate_markdown(doc, agent_md)
+        self._emit(agent_md)
 
-        # ヘッダーの検証
-        if not content.startswith('#'):
-            self.errors.append("AGENT.md must start with a title (# Title)")
+    def _validate_title_and_fields(self, doc: MarkdownDocument, file_path: Path):
+        """タイトルと必須フィールドを検証"""
+        # ヘッダーの検証（1行目が見出しであること）
+        first_heading = doc.first_heading
+        if first_heading is None or first_heading.line != 1:
+            self._error(f"{file_path.name} must start with a title (# Title)", 'title', 1)
 
         # 必須フィールドの検証
         required_fields = ['Purpose', 'Scope']
         for field in required_fields:
-            pattern = rf'[-*]\s*{field}:\s*.+'
-            if not re.search(pattern, content, re.MULTILINE | re.IGNORECASE):
-                self.errors.append(f"AGENT.md missing required field: {field}")
+            if not doc.field(field):
+                self._error(f"{file_path.name} missing required field: {field}", 'required-field')
             else:
                 self.info_messages.append(f"✓ Field present: {field}")
 
-        # Markdown構文の検証
-        self._validate_markdown(content, agent_md)
-
-    def _validate_markdown(self, content: str, file_path: Path):
+    def _validate_markdown(self, doc: MarkdownDocument, file_path: Path):
         """Markdown構文を検証"""
-        lines = content.split('\n')
-
         # コードブロックの対応をチェック
-        code_block_count = content.count('```')
-        if code_block_count % 2 != 0:
-            self.warnings.append(f"{file_path.name}: Unclosed code block detected")
+        if doc.has_unclosed_fence:
+            self._warning(f"{file_path.name}: Unclosed code block detected", 'code-block')
 
         # リストのインデント
-        for i, line in enumerate(lines, start=1):
+        for i, line in enumerate(doc.iter_lines(), start=1):
             # 不適切なリストマーカー
             if re.match(r'^\s*[-*]\s*[-*]', line):
-                self.warnings.append(
-                    f"{file_path.name}:{i}: Double list marker detected"
+                self._warning(
+                    f"{file_path.name}:{i}: Double list marker detected", 'list-marker', i
                 )
 
     def _check_file_naming(self):
@@ -198,9 +230,11 @@ class StructureValidator:
                 if file.is_file():
                     # snake_caseを推奨
                     if not re.match(r'^[a-z0-9_]+\.[a-z0-9]+$', file.name):
-                        self.warnings.append(
-                            f"Script file not in snake_case: {file.relative_to(self.path)}"
+                        self._warning(
+                            f"Script file not in snake_case: {file.relative_to(self.path)}",
+                            'file-naming'
                         )
+                    self._emit(file)
 
         # referencesディレクトリ
         refs_dir = self.path / 'references'
@@ -209,9 +243,11 @@ class StructureValidator:
                 # kebab-caseを推奨
                 stem = file.stem
                 if not re.match(r'^[a-z0-9-]+$', stem):
-                    self.warnings.append(
-                        f"Reference file not in kebab-case: {file.relative_to(self.path)}"
+                    self._warning(
+                        f"Reference file not in kebab-case: {file.relative_to(self.path)}",
+                        'file-naming'
                     )
+                self._emit(file)
 
         # knowledgeディレクトリ
         knowledge_dir = self.path / 'knowledge'
@@ -220,9 +256,11 @@ class StructureValidator:
                 # kebab-caseまたはsnake_caseを許容
                 stem = file.stem
                 if not re.match(r'^[a-z0-9_-]+$', stem):
-                    self.warnings.append(
-                        f"Knowledge file naming: {file.relative_to(self.path)}"
+                    self._warning(
+                        f"Knowledge file naming: {file.relative_to(self.path)}",
+                        'file-naming'
                     )
+                self._emit(file)
 
     def _print_results(self):
         """結果を表示"""
@@ -266,27 +304,91 @@ class StructureValidator:
         }
 
 
+def log(message: str, fmt: str = 'text'):
+    """進捗メッセージを出力（ndjson/sarif 時は stdout を汚さないよう stderr へ）"""
+    print(message, file=sys.stdout if fmt == 'text' else sys.stderr)
+
+
+def save_result(result: Dict, output: str, fmt: str = 'text'):
+    """結果をJSONファイルに保存"""
+    output_path = Path(output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    log(f"[INFO] Result saved to: {output_path}", fmt)
+
+
+def run_validation(path: str, resource_type: str, fmt: str = 'text') -> Dict:
+    """検証を1回実行する（ndjson/sarif ではファイルごとにレコードを逐次出力）"""
+    if fmt == 'text':
+        return StructureValidator(path, resource_type).validate()
+
+    from result_stream import open_stream
+
+    stream = open_stream(fmt, tool='validate-structure')
+    stream.start()
+    result = StructureValidator(path, resource_type, stream=stream).validate()
+    stream.finish({
+        'path': result['path'],
+        'valid': result['valid'],
+        'errors': len(result['errors']),
+        'warnings': len(result['warnings']),
+    })
+    return result
+
+
+def watch(path: str, resource_type: str, output: Optional[str] = None, force_polling: bool = False,
+          fmt: str = 'text'):
+    """リソースディレクトリを監視し、保存のたびにプロセスを再起動せず再検証する"""
+    from file_watcher import FileWatcher
+
+    watcher = FileWatcher([Path(path)], force_polling=force_polling)
+    log(f"[INFO] Watching {path} ({watcher.mode}). Press Ctrl+C to stop.", fmt)
+    sys.stdout.flush()
+
+    try:
+        for changed in watcher.changes():
+            started = time.perf_counter()
+            for changed_path in sorted(changed):
+                log(f"[INFO] Changed: {changed_path}", fmt)
+            result = run_validation(path, resource_type, fmt)
+            if output:
+                save_result(result, output, fmt)
+            elapsed = (time.perf_counter() - started) * 1000
+            log(f"[INFO] Revalidated in {elapsed:.1f} ms", fmt)
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        log("\n[INFO] Stopped watching", fmt)
+
+
 def main():
     parser = argparse.ArgumentParser(description='Validate resource structure')
     parser.add_argument('--path', required=True, help='Path to resource directory')
     parser.add_argument('--type', required=True, choices=['skill', 'agent'], help='Resource type')
     parser.add_argument('--output', help='Output JSON file')
+    parser.add_argument('--format', choices=['text', 'ndjson', 'sarif'], default='text',
+                        help='Output format; ndjson/sarif stream one record per checked file')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and revalidate whenever a file under --path changes')
+    parser.add_argument('--poll', action='store_true',
+                        help='Use polling instead of inotify in --watch mode')
 
     args = parser.parse_args()
+    if args.watch and args.format == 'sarif':
+        parser.error('--watch cannot be combined with --format sarif')
 
     try:
-        validator = StructureValidator(args.path, args.type)
-        result = validator.validate()
+        result = run_validation(args.path, args.type, args.format)
 
         # 結果を保存
         if args.output:
-            output_path = Path(args.output)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+            save_result(result, args.output, args.format)
 
-            print(f"[INFO] Result saved to: {output_path}")
+        if args.watch:
+            watch(args.path, args.type, args.output, args.poll, args.format)
+            sys.exit(0)
 
         # 終了コード
         sys.exit(0 if result['valid'] else 1)
@@ -0,0 +1,409 @@
+"""
+観点別レビューの asyncio 実行エンジン (review-orchestrator.py 用の共有モジュール)
+
+parallel-review.sh は bash のサブシェル4つを起動し、それぞれが gemini → jq → sed を
+呼び出したうえで、全観点の完了後に1つの JSON だけを返す。AspectExecutor は観点ごとの
+レビューを asyncio で並列に実行し、応答の JSON 抽出 (review_json.py: 途中切れ等の
+修復を含む) もプロセス内で行う。レビュー自体はバックエンド (review_backends.py:
+gemini CLI またはスタブ) が行う。
+完了した観点の結果は他の観点を待たずに on_result / as_completed() で受け取れる。
+
+- 観点ごとのタイムアウト (既定 120 秒) を超えたプロセスは kill する
+- 全体のタイムアウト (既定 600 秒) を超えた場合は未完了の観点をキャンセルする
+- キャンセル (Ctrl-C 等) された場合も起動中のプロセスを kill してから戻る
+- バックエンドが例外を投げた観点は失敗として返し、他の観点には影響させない
+- 失敗・不正な JSON の観点だけを指数バックオフで再実行する (成功した観点は再実行しない)
+- stop_when (指摘のリストを受け取る関数) が真を返したら、未完了のレビューをキャンセルして
+  結果を返す (重大な指摘が出た時点でマージを止める fail-fast 用)
+- metrics (review_metrics.ReviewMetrics) を渡すと試行ごとの所要時間・バイト数・
+  タイムアウト等を記録する
+- 各レビューは ReviewScheduler (review_scheduler.py) の実行枠を確保してから起動する
+  (同時実行数・流量の上限と観点の優先度。リトライの待機中は枠を返す)
+
+差分は argv ではなくファイルで受け取る。各観点のプロセスには プロンプトの前半 → 差分
+ファイル → 後半 を stdin へチャンク単位で流し込むため、数 MB の差分でも ARG_MAX に
+かからず、観点数に比例したメモリのコピーも発生しない (全観点が同じ差分ファイルを読む)。
+プロンプトの前半・後半は review_prompt.PromptBuilder が組み立て、ガイドラインは観点ごとに
+1度だけ読む。
+
+shards (diff_sharding.plan_shards の結果) を渡すと、観点 × シャードの組ごとに
+プロセスを起動し、観点ごとに全シャードの指摘をまとめて1つの結果にする。観点ごとに
+異なるシャード (キャッシュにないハンクのみ等) を渡す場合は {観点: シャードのリスト}
+とし、空のリストの観点はプロセスを起動せず cached_findings だけを結果にする。
+
+Usage:
+    from aspect_executor import AspectExecutor
+
+    executor = AspectExecutor(backend=create_backend('gemini'))
+    results = asyncio.run(executor.run(Path('review.diff'), project_context,
+                                       on_result=lambda result: print(result['aspect'])))
+    # results: {'review_summary': {...}, 'aspects': [...]}  (parallel-review.sh と同じ形式)
+"""
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+from diff_sharding import Shard
+from review_backends import ReviewerBackend, create_backend
+from review_json import extract_review
+from review_metrics import ReviewMetrics
+from review_prompt import REFERENCES_DIR, AspectPrompt, PromptBuilder
+from review_scheduler import ReviewScheduler
+
+REVIEW_ASPECTS = ["frontend", "backend", "infrastructure", "security"]
+ASPECT_TIMEOUT = 120  # 各レビューのタイムアウト（秒）
+TOTAL_TIMEOUT = 600   # 全体のタイムアウト（秒）
+STDERR_LINES = 10     # エラー時に結果へ含める stderr の行数
+RETRY_BACKOFF = 1.0       # 1回目のリトライまでの待ち時間（秒）。以降は倍々に延ばす
+RETRY_BACKOFF_MAX = 30.0  # リトライ待ち時間の上限（秒）
+
+# asyncio.wait_for がタイムアウト時に送出する例外
+# (Python 3.10 以前は組み込みの TimeoutError とは別のクラス。3.11 以降は同じもの)
+WAIT_FOR_TIMEOUT = asyncio.TimeoutError
+
+logger = logging.getLogger(__name__)
+
+# 全観点共通のシャード、または観点ごとのシャード
+ShardPlan = Optional[List[Shard] | Dict[str, List[Shard]]]
+
+
+class AspectExecutor:
+    """観点ごとのレビュープロセスを並列に実行する"""
+
+    def __init__(self, aspects: Sequence[str] = REVIEW_ASPECTS,
+                 backend: Optional[ReviewerBackend] = None,
+                 aspect_timeout: float = ASPECT_TIMEOUT,
+                 total_timeout: Optional[float] = TOTAL_TIMEOUT,
+                 references_dir: Path = REFERENCES_DIR,
+                 max_retries: int = 0,
+                 retry_backoff: float = RETRY_BACKOFF,
+                 scheduler: Optional[ReviewScheduler] = None,
+                 metrics: Optional[ReviewMetrics] = None,
+                 prompts: Optional[PromptBuilder] = None):
+        self.aspects = list(aspects)
+        self.backend = backend or create_backend("gemini")
+        self.aspect_timeout = aspect_timeout
+        self.total_timeout = total_timeout
+        # 一括レビューでは PromptBuilder を共有し、ガイドラインを全件で1度だけ読む
+        self.prompts = prompts or PromptBuilder(references_dir)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.scheduler = scheduler or ReviewScheduler()
+        self.metrics = metrics
+
+    @property
+    def references_dir(self) -> Path:
+        return self.prompts.references_dir
+
+    def guidelines_path(self, aspect: str) -> Path:
+        return self.prompts.guidelines_path(aspect)
+
+    async def run_aspect(self, aspect: str, prompt: AspectPrompt, attempt: int = 1) -> Dict:
+        """1観点分のレビューを実行し、結果の辞書を返す
+
+        失敗時は {'aspect', 'error', 'stderr'} を返す。戻り値の 'failed' は
+        プロセスの失敗 (非ゼロ終了・タイムアウト・バックエンドの例外)、'invalid_json' は出力の解析失敗を示す。
+        実行枠を待つ時間は aspect_timeout にも 'elapsed' にも含めない。
+        """
+        queued = time.monotonic()
+        async with self.scheduler.slot(aspect):
+            started = time.monotonic()
+            try:
+                response = await asyncio.wait_for(self.backend.review(prompt),
+                                                  self.aspect_timeout)
+            except WAIT_FOR_TIMEOUT:
+                self._record(aspect, prompt, attempt, started, queued, 0, 'timeout')
+                return _error_result(aspect, f"Review timed out after {self.aspect_timeout}s",
+                                     b'', time.monotonic() - started)
+            except Exception as e:
+                # バックエンドの例外で他の観点 (成功したものを含む) を巻き込まないよう、
+                # この観点の失敗として返す (リトライの対象になる)
+                logger.debug(f"{aspect}: backend raised", exc_info=True)
+                self._record(aspect, prompt, attempt, started, queued, 0, 'failed')
+                return _error_result(aspect, f"Review failed: {type(e).__name__}: {e}",
+                                     b'', time.monotonic() - started)
+
+        elapsed = time.monotonic() - started
+        if response.returncode != 0:
+            self._record(aspect, prompt, attempt, started, queued, len(response.stdout), 'failed')
+            return _error_result(aspect, "Review failed", response.stderr, elapsed)
+
+        extraction = extract_review(response.stdout.decode('utf-8', errors='replace'))
+        result = extraction.result
+        if result is None:
+            self._record(aspect, prompt, attempt, started, queued, len(response.stdout),
+                         'invalid_json')
+            error = _error_result(aspect, "Invalid JSON", response.stderr, elapsed)
+            error['failed'] = False
+            error['invalid_json'] = True
+            return error
+        self._record(aspect, prompt, attempt, started, queued, len(response.stdout), 'ok',
+                     json_repaired=extraction.repaired)
+        if extraction.repaired:
+            logger.warning(f"{aspect}: Repaired review JSON ({', '.join(extraction.repairs)})")
+        result.setdefault('aspect', aspect)
+        if extraction.truncated:
+            # 読めた指摘だけを残し、部分的な結果として扱う（キャッシュしない）
+            result['error'] = f"Truncated JSON (kept {len(result['findings'])} findings)"
+        return {'aspect': aspect, 'result': result, 'failed': False, 'invalid_json': False,
+                'elapsed': elapsed, 'json_repairs': extraction.repairs}
+
+    def _record(self, aspect: str, prompt: AspectPrompt, attempt: int, started: float,
+                queued: float, response_bytes: int, status: str,
+                json_repaired: bool = False):
+        if self.metrics is None:
+            return
+        self.metrics.record_attempt(
+            aspect, started, time.monotonic() - started, started - queued,
+            prompt.size, response_bytes, status, retry=attempt > 1,
+            json_repaired=json_repaired
+        )
+
+    def backoff_delay(self, retry: int) -> float:
+        """retry 回目 (1 始まり) のリトライまでの待ち時間"""
+        return min(self.retry_backoff * 2 ** (retry - 1), RETRY_BACKOFF_MAX)
+
+    async def run_aspect_with_retry(self, aspect: str, prompt: AspectPrompt) -> Dict:
+        """失敗または不正な JSON の場合に、その観点だけを最大 max_retries 回再実行する
+
+        戻り値は最後の試行の結果で、'attempts' に試行回数が入る。
+        """
+        for attempt in range(1, self.max_retries + 2):
+            outcome = await self.run_aspect(aspect, prompt, attempt)
+            outcome['attempts'] = attempt
+            if not (outcome['failed'] or outcome['invalid_json']) or attempt > self.max_retries:
+                return outcome
+            delay = self.backoff_delay(attempt)
+            logger.warning(
+                f"{aspect}: {outcome['result']['error']}; "
+                f"retrying in {delay:.1f}s ({attempt}/{self.max_retries} retries)"
+            )
+            await asyncio.sleep(delay)
+        return outcome
+
+    async def as_completed(self, diff_path: Path, project_context: str,
+                           aspects: Optional[Sequence[str]] = None,
+                           shards: ShardPlan = None) -> AsyncIterator[Dict]:
+        """完了した観点 (シャード分割時は観点 × シャード) から順に結果を返す
+
+        戻り値は run_aspect_with_retry() の結果に 'shard' (シャード番号、分割なしは 0) と
+        'shards' (シャード数) を加えたもの。全体のタイムアウトに達した場合、未完了の分は
+        キャンセルしてエラー結果を返す。イテレーションを途中で抜けた場合も残りはキャンセルされる。
+        """
+        tasks = {}
+        # 優先度の高い観点から起動する (空いている実行枠も優先度順に埋まる)
+        for aspect in sorted(self.aspects if aspects is None else aspects,
+                             key=self.scheduler.priority):
+            shard_list = _shard_list(shards, aspect)
+            if not shard_list:
+                continue
+            for index, shard in enumerate(shard_list):
+                prompt = self.prompts.build(aspect, diff_path, project_context,
+                                            shard, len(shard_list))
+                tasks[asyncio.ensure_future(self.run_aspect_with_retry(aspect, prompt))] = \
+                    (aspect, index, len(shard_list))
+        deadline = None if self.total_timeout is None else time.monotonic() + self.total_timeout
+        pending = set(tasks)
+        try:
+            while pending:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for task in done:
+                    outcome = task.result()
+                    outcome['shard'], outcome['shards'] = tasks[task][1:]
+                    yield outcome
+            for task in pending:
+                aspect, index, count = tasks[task]
+                outcome = _error_result(aspect, f"Review timed out after "
+                                        f"{self.total_timeout}s (total)", b'', self.total_timeout)
+                outcome.update(attempts=None, shard=index, shards=count)
+                if self.metrics is not None:
+                    self.metrics.record_cancelled(aspect)
+                yield outcome
+        finally:
+            await _cancel(pending)
+
+    async def run(self, diff_path: Path, project_context: str,
+                  on_result: Optional[Callable[[Dict], None]] = None,
+                  shards: ShardPlan = None,
+                  on_shard: Optional[Callable[[Dict], None]] = None,
+                  cached_findings: Optional[Dict[str, List[Dict]]] = None,
+                  stop_when: Optional[Callable[[List[Dict]], bool]] = None) -> Dict:
+        """全観点を実行し、parallel-review.sh と同じ形式の結果を返す
+
+        on_result は観点が (シャード分割時はその観点の全シャードが) 完了するたびに、
+        全体の完了を待たずに呼ばれる。on_shard はシャード1件の完了ごとに呼ばれる。
+        cached_findings の指摘は各観点の結果の先頭に加える。
+        stop_when がキャッシュにあった指摘またはシャード1件の指摘に対して真を返した場合、
+        未完了のレビューをキャンセルし、その分は 'cancelled' の結果にする。
+        """
+        cached_findings = cached_findings or {}
+        partial: Dict[str, List[Dict]] = {aspect: [] for aspect in self.aspects}
+        outcomes: Dict[str, Dict] = {}
+
+        def complete(aspect: str, outcome: Dict):
+            outcomes[aspect] = _with_cached(outcome, cached_findings.get(aspect, []))
+            if on_result is not None:
+                on_result(outcomes[aspect])
+
+        for aspect in self.aspects:
+            if not _shard_list(shards, aspect):
+                complete(aspect, _empty_result(aspect))
+
+        # キャッシュにあった指摘だけで止める場合はレビューを起動しない
+        stopped = stop_when is not None and any(
+            stop_when(findings) for findings in cached_findings.values()
+        )
+        if not stopped:
+            results = self.as_completed(diff_path, project_context, shards=shards)
+            try:
+                async for outcome in results:
+                    if on_shard is not None:
+                        on_shard(outcome)
+                    aspect = outcome['aspect']
+                    partial[aspect].append(outcome)
+                    if len(partial[aspect]) == outcome['shards']:
+                        complete(aspect, merge_shard_outcomes(aspect, partial.pop(aspect)))
+                    findings = outcome['result'].get('findings')
+                    if stop_when is not None and isinstance(findings, list) and stop_when(findings):
+                        break
+            finally:
+                # 途中で抜けた場合も、ここで未完了のレビューをキャンセルし終えてから戻る
+                await results.aclose()
+
+        for aspect in self.aspects:
+            if aspect in outcomes:
+                continue
+            done = partial.pop(aspect, [])
+            count = len(_shard_list(shards, aspect))
+            finished = {outcome['shard'] for outcome in done}
+            cancelled = [_cancelled_result(aspect, index, count)
+                         for index in range(count) if index not in finished]
+            complete(aspect, merge_shard_outcomes(aspect, done + cancelled))
+        return merge_outcomes([outcomes[aspect] for aspect in self.aspects])
+
+
+def _shard_list(shards: ShardPlan, aspect: str) -> List[Optional[Shard]]:
+    if isinstance(shards, dict):
+        return shards.get(aspect, [None])
+    return shards or [None]
+
+
+def _empty_result(aspect: str) -> Dict:
+    """レビューする差分がない (すべてキャッシュにある、または振り分けで対象外) 観点の結果"""
+    return {
+        'aspect': aspect,
+        'result': {'aspect': aspect, 'findings': []},
+        'failed': False,
+        'invalid_json': False,
+        'elapsed': 0.0,
+        'attempts': 0,
+        'shard': 0,
+        'shards': 0,
+    }
+
+
+def _with_cached(outcome: Dict, cached: List[Dict]) -> Dict:
+    """キャッシュにあった指摘を観点の結果に加える"""
+    if not cached:
+        return outcome
+    result = dict(outcome['result'])
+    result['findings'] = list(cached) + list(result.get('findings', []))
+    result['cached_findings'] = len(cached)
+    return dict(outcome, result=result)
+
+
+def merge_shard_outcomes(aspect: str, outcomes: List[Dict]) -> Dict:
+    """1観点分の各シャードの結果を1つにまとめる
+
+    成功したシャード (途中で切れた応答の完結した指摘を含む) の指摘はすべて残し、
+    失敗したシャードは error に列挙する
+    (キャンセルしたシャードは件数のみ)。全シャードが失敗した場合のみ観点全体を失敗とみなす。
+    """
+    if len(outcomes) == 1:
+        return outcomes[0]
+    outcomes = sorted(outcomes, key=lambda outcome: outcome['shard'])
+    findings: List[Dict] = []
+    errors = []
+    cancelled = 0
+    for outcome in outcomes:
+        result = outcome['result']
+        if outcome.get('cancelled'):
+            cancelled += 1
+        else:
+            if 'error' in result:
+                errors.append(f"shard {outcome['shard'] + 1}: {result['error']}")
+            # 途中で切れた応答のシャードも完結した指摘は残す
+            findings.extend(result.get('findings', []))
+    result = {'aspect': aspect, 'findings': findings, 'shards': len(outcomes)}
+    messages = []
+    if errors:
+        messages.append(f"{len(errors)}/{len(outcomes)} shards failed ({'; '.join(errors)})")
+    if cancelled:
+        messages.append(f"{cancelled}/{len(outcomes)} shards cancelled (fail-fast)")
+    if messages:
+        result['error'] = '; '.join(messages)
+    failed = all(outcome['failed'] for outcome in outcomes)
+    return {
+        'aspect': aspect,
+        'result': result,
+        'failed': failed,
+        'invalid_json': not failed and any(outcome['invalid_json'] for outcome in outcomes),
+        'elapsed': max(outcome['elapsed'] for outcome in outcomes),
+        'attempts': 1 + sum((outcome.get('attempts') or 1) - 1 for outcome in outcomes),
+        'shard': 0,
+        'shards': len(outcomes),
+        'cancelled': all(outcome.get('cancelled') for outcome in outcomes),
+    }
+
+
+def merge_outcomes(outcomes: List[Dict]) -> Dict:
+    """run_aspect() の戻り値を review_summary / aspects の形式にまとめる"""
+    failed = sum(1 for outcome in outcomes if outcome['failed'])
+    invalid = sum(1 for outcome in outcomes if outcome['invalid_json'])
+    cancelled = sum(1 for outcome in outcomes if outcome.get('cancelled'))
+    summary = {
+        'total_aspects': len(outcomes),
+        'successful': len(outcomes) - failed - cancelled,
+        'failed': failed,
+        'invalid_json': invalid,
+        'retries': sum((outcome.get('attempts') or 1) - 1 for outcome in outcomes),
+    }
+    if cancelled:
+        summary['cancelled'] = cancelled
+    return {
+        'review_summary': summary,
+        'aspects': [outcome['result'] for outcome in outcomes],
+    }
+
+
+def _cancelled_result(aspect: str, shard: int, shards: int) -> Dict:
+    """stop_when によってキャンセルしたレビューの結果（失敗には数えない）"""
+    outcome = _error_result(aspect, "Cancelled (fail-fast)", b'', 0.0)
+    outcome.update(failed=False, cancelled=True, attempts=None, shard=shard, shards=shards)
+    return outcome
+
+
+def _error_result(aspect: str, error: str, stderr: bytes, elapsed: float) -> Dict:
+    stderr_head = '\n'.join(stderr.decode('utf-8', errors='replace').splitlines()[:STDERR_LINES])
+    return {
+        'aspect': aspect,
+        'result': {'aspect': aspect, 'error': error, 'stderr': stderr_head},
+        'failed': True,
+        'invalid_json': False,
+        'elapsed': elapsed,
+    }
+
+
+async def _cancel(tasks):
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,107 @@
+"""
+ファイル種別による観点の振り分け (review-orchestrator.py 用の共有モジュール)
+
+全観点に差分全体を渡すと、Terraform だけの変更でも frontend のレビューが走り、
+プロンプトのバイト数・待ち時間・クォータを無駄にする。route_files() は
+差分のファイルをパス・拡張子で分類し、観点ごとに関係するファイルだけの部分差分
+(diff_sharding.FileDiff の並び) を作る。関係するファイルがない観点はレビューしない。
+
+- frontend: UI のコード・スタイル・テンプレート
+- backend: サーバー側の言語、SQL、設定ファイル
+- infrastructure: IaC (Terraform 等)、コンテナ、CI、デプロイ用のマニフェスト
+- security: ドキュメント・画像以外のすべて
+- どの規則にも当たらないファイルは全観点に渡す (見落とすより無駄に送る方を選ぶ)
+- ドキュメント・画像だけの変更は振り分けず、全観点に差分全体を渡す
+
+パターンに / を含まない場合はファイル名、含む場合はパス (任意の階層の下) と比べる。
+
+Usage:
+    from diff_routing import route_files
+
+    routed = route_files(scan_diff(Path('review.diff')), ['frontend', 'backend', ...])
+    # routed: {観点: [FileDiff, ...]}  (空のリストの観点はレビュー不要)
+"""
+
+import fnmatch
+import posixpath
+from typing import Dict, List, Optional, Sequence, Set
+
+from diff_sharding import FileDiff
+
+ROUTING_RULES: Dict[str, List[str]] = {
+    'frontend': [
+        '*.js', '*.jsx', '*.mjs', '*.cjs', '*.ts', '*.tsx', '*.vue', '*.svelte', '*.astro',
+        '*.css', '*.scss', '*.sass', '*.less', '*.html', '*.htm', '*.hbs', '*.ejs',
+        '*.erb', '*.jinja', '*.j2', '*.swift', '*.dart',
+    ],
+    'backend': [
+        '*.py', '*.go', '*.java', '*.kt', '*.kts', '*.scala', '*.rb', '*.rs', '*.php',
+        '*.cs', '*.ex', '*.exs', '*.erl', '*.c', '*.cc', '*.cpp', '*.h', '*.hpp',
+        '*.js', '*.mjs', '*.cjs', '*.ts', '*.sql', '*.graphql', '*.proto', '*.sh', '*.bash',
+        '*.json', '*.yml', '*.yaml', '*.toml', '*.ini', '*.cfg', '*.conf', '*.env', '*.env.*',
+        'requirements*.txt', 'Gemfile', 'go.mod', 'go.sum', 'pom.xml', '*.gradle', '*.lock',
+    ],
+    'infrastructure': [
+        '*.tf', '*.tfvars', '*.hcl', '*.nix', 'Dockerfile', 'Dockerfile.*', '*.dockerfile',
+        '.dockerignore', 'docker-compose*.yml', 'docker-compose*.yaml', 'compose*.yml',
+        'compose*.yaml', 'Jenkinsfile', 'Procfile', 'Makefile', '*.mk', '.gitlab-ci.yml',
+        'azure-pipelines.yml', 'cloudbuild.yaml', 'skaffold.yaml', 'Chart.yaml',
+        '*.sh', '*.bash',
+        '.github/workflows/*', '.github/actions/*', '.circleci/*', '.buildkite/*',
+        'k8s/*', 'kubernetes/*', 'helm/*', 'charts/*', 'deploy/*', 'deployment/*',
+        'infra/*', 'terraform/*', 'ansible/*', 'manifests/*',
+    ],
+}
+
+# どの観点にも渡さないファイル（ドキュメント・画像等）
+IGNORED_PATTERNS = [
+    '*.md', '*.mdx', '*.rst', '*.txt', '*.adoc', 'LICENSE*', 'CHANGELOG*', 'AUTHORS*',
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.ico', '*.webp', '*.pdf',
+]
+
+
+def _matches(path: str, pattern: str) -> bool:
+    if '/' in pattern:
+        return fnmatch.fnmatchcase(path, pattern) or fnmatch.fnmatchcase(path, '*/' + pattern)
+    return fnmatch.fnmatchcase(posixpath.basename(path), pattern)
+
+
+def classify_path(path: Optional[str], aspects: Sequence[str]) -> Set[str]:
+    """ファイルを受け取る観点の集合（ドキュメント等は空集合）
+
+    振り分けの規則を持たない観点 (security や独自に追加した観点) はドキュメント以外のすべてを受け取る。
+    """
+    if path is None:
+        return set(aspects)
+    matched = {aspect for aspect, patterns in ROUTING_RULES.items()
+               if any(_matches(path, pattern) for pattern in patterns)}
+    if not matched:
+        if any(_matches(path, pattern) for pattern in IGNORED_PATTERNS):
+            return set()
+        # どの規則にも当たらないファイル
+        return set(aspects)
+    unrouted = {aspect for aspect in aspects if aspect not in ROUTING_RULES}
+    return (matched | unrouted) & set(aspects)
+
+
+def route_files(files: List[FileDiff], aspects: Sequence[str]) -> Dict[str, List[FileDiff]]:
+    """観点ごとに関係するファイルだけを残す（差分の順序を保つ）
+
+    差分の前置き (path が None、git show のコミットメッセージ等) は、ファイルを1つ以上
+    受け取る観点に文脈として付ける。どの観点もファイルを受け取らない場合は全観点に全体を渡す。
+    """
+    routed: Dict[str, List[FileDiff]] = {aspect: [] for aspect in aspects}
+    for file_diff in files:
+        if file_diff.path is None:
+            continue
+        for aspect in classify_path(file_diff.path, aspects):
+            routed[aspect].append(file_diff)
+
+    if not any(routed.values()):
+        return {aspect: list(files) for aspect in aspects}
+
+    preamble = [file_diff for file_diff in files if file_diff.path is None]
+    for aspect, selected in routed.items():
+        if selected and preamble:
+            routed[aspect] = sorted(preamble + selected, key=lambda file_diff: file_diff.start)
+    return routed
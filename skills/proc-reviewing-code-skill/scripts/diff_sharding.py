@@ -0,0 +1,160 @@
+"""
+大きな差分の分割 (review-orchestrator.py --shard 用の共有モジュール)
+
+差分ファイルをファイル (diff --git) とハンク (@@) の境界で、プロンプトの予算に収まる
+シャードに分ける。シャードは差分ファイル上のバイト範囲の並びで表し、差分の内容は
+コピーしない (AspectPrompt が範囲を読んで各観点のプロセスへ流し込む)。
+
+- 予算に収まるファイルはまとめて1つのシャードに詰める
+- 予算を超えるファイルはハンク単位で分け、各シャードにファイルヘッダーを付け直す
+- 1つのハンクが予算を超える場合は、そのハンクだけで1つのシャードにする
+
+Usage:
+    from diff_sharding import plan_shards, scan_diff
+
+    shards = plan_shards(scan_diff(Path('review.diff')), budget=64 * 1024)
+    for shard in shards:
+        print(shard.index, shard.size, shard.files)
+"""
+
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+SHARD_BUDGET = 64 * 1024  # 1シャードあたりの差分の上限（バイト）
+
+FILE_HEADER = b'diff --git '
+HUNK_HEADER = b'@@'
+
+Range = Tuple[int, int]
+
+
+class FileDiff:
+    """差分中の1ファイル分（各値は差分ファイル上のバイト位置）"""
+
+    def __init__(self, path: Optional[str], start: int):
+        self.path = path
+        self.start = start
+        self.end = start
+        # 各ハンクの開始位置（最初のハンクの手前までがファイルヘッダー）
+        self.hunks: List[int] = []
+        # select() で一部のハンクに絞った場合のハンクの範囲
+        self.selected: Optional[List[Range]] = None
+
+    @property
+    def header_end(self) -> int:
+        return self.hunks[0] if self.hunks else self.end
+
+    @property
+    def size(self) -> int:
+        return sum(end - start for start, end in self.ranges())
+
+    def hunk_ranges(self) -> List[Range]:
+        if self.selected is not None:
+            return list(self.selected)
+        bounds = self.hunks + [self.end]
+        return [(bounds[i], bounds[i + 1]) for i in range(len(self.hunks))]
+
+    def ranges(self) -> List[Range]:
+        """このファイル分としてプロンプトに含めるバイト範囲"""
+        if self.selected is None:
+            return [(self.start, self.end)]
+        return [(self.start, self.header_end)] + self.selected
+
+    def select(self, hunk_ranges: List[Range]) -> 'FileDiff':
+        """指定したハンクだけを含む FileDiff（ファイルヘッダーは保つ）"""
+        subset = FileDiff(self.path, self.start)
+        subset.end = self.end
+        subset.hunks = self.hunks
+        subset.selected = list(hunk_ranges)
+        return subset
+
+    def __repr__(self):
+        return f"FileDiff({self.path!r}, {self.start}-{self.end}, hunks={len(self.hunks)})"
+
+
+class Shard:
+    """レビュー1回分の差分（差分ファイル上のバイト範囲の並び）"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.ranges: List[Range] = []
+        self.files: List[str] = []
+        self.size = 0
+
+    def add(self, ranges: List[Range], path: Optional[str]):
+        self.ranges.extend(ranges)
+        self.size += sum(end - start for start, end in ranges)
+        if path is not None and path not in self.files:
+            self.files.append(path)
+
+    def __repr__(self):
+        return f"Shard({self.index}, size={self.size}, files={self.files})"
+
+
+def _file_path(header_line: bytes) -> str:
+    """`diff --git a/x b/x` から変更後のパスを取り出す"""
+    text = header_line[len(FILE_HEADER):].decode('utf-8', errors='replace').rstrip('\r\n')
+    _, sep, new_path = text.rpartition(' b/')
+    return new_path if sep else text
+
+
+def scan_diff(diff_path: Path) -> List[FileDiff]:
+    """差分ファイルを1行ずつ走査し、ファイルとハンクの位置を求める
+
+    最初の `diff --git` より前の部分 (git show のコミットメッセージ等) は
+    path が None の FileDiff になる。`diff --git` を含まない差分は全体を1ファイルとみなす。
+    """
+    files: List[FileDiff] = []
+    current: Optional[FileDiff] = None
+    offset = 0
+    with open(diff_path, 'rb') as f:
+        for line in f:
+            if line.startswith(FILE_HEADER):
+                current = FileDiff(_file_path(line), offset)
+                files.append(current)
+            elif current is None:
+                current = FileDiff(None, offset)
+                files.append(current)
+            elif line.startswith(HUNK_HEADER):
+                current.hunks.append(offset)
+            offset += len(line)
+            current.end = offset
+    return files
+
+
+def _split_file(file_diff: FileDiff, budget: int) -> List[List[Range]]:
+    """予算を超えるファイルをハンク単位で分け、各部分の先頭にファイルヘッダーを付ける"""
+    header = (file_diff.start, file_diff.header_end)
+    header_size = file_diff.header_end - file_diff.start
+    parts: List[List[Range]] = []
+    part: List[Range] = []
+    part_size = header_size
+    for start, end in file_diff.hunk_ranges():
+        if part and part_size + (end - start) > budget:
+            parts.append([header] + part)
+            part, part_size = [], header_size
+        part.append((start, end))
+        part_size += end - start
+    if part:
+        parts.append([header] + part)
+    return parts
+
+
+def plan_shards(files: List[FileDiff], budget: int = SHARD_BUDGET) -> List[Shard]:
+    """ファイル・ハンクの境界で、予算に収まるシャードに詰める（差分の順序は保つ）"""
+    pieces: List[Tuple[List[Range], Optional[str]]] = []
+    for file_diff in files:
+        if file_diff.size <= budget or len(file_diff.hunk_ranges()) <= 1:
+            pieces.append((file_diff.ranges(), file_diff.path))
+        else:
+            pieces.extend((ranges, file_diff.path) for ranges in _split_file(file_diff, budget))
+
+    shards: List[Shard] = []
+    current: Optional[Shard] = None
+    for ranges, path in pieces:
+        size = sum(end - start for start, end in ranges)
+        if current is None or (current.ranges and current.size + size > budget):
+            current = Shard(len(shards))
+            shards.append(current)
+        current.add(ranges, path)
+    return shards
@@ -0,0 +1,157 @@
+"""
+観点をまたいだ指摘の重複排除 (review-orchestrator.py 用の共有モジュール)
+
+backend と security のレビューは同じ file / line の問題を異なる表現で報告することが多く、
+単純に連結するとレポートが膨らむ。FindingDeduplicator は指摘を
+(正規化したファイルパス, 行の窓) のバケットで引き、近くの指摘と比べて重複をまとめる。
+
+重複とみなす条件 (行の差が LINE_WINDOW 以内の指摘同士):
+- 異なる観点で、正規化したカテゴリ (大文字小文字・記号を無視) が同じ
+- または issue の語 (英数字の単語、日本語等は2文字ずつ) の Jaccard 係数が SIMILARITY 以上
+
+まとめた指摘は重要度の最も高いもの (同じ重要度なら最初に登録したもの) を残し、
+'aspects' に報告した観点を、'duplicates' にまとめた件数を入れる。後から登録した重複の
+方が重要度が高い場合は、それを新しい代表に置き換える (replaced に元の代表が入る)。
+バケットはハッシュで引き、1件あたりの比較数は MAX_CANDIDATES で抑えるため、
+シャード分割で数千件の指摘があっても全体は重要度のソート O(n log n) で収まる。
+
+Usage:
+    from finding_dedup import dedupe_findings
+
+    findings, removed = dedupe_findings([('security', finding), ('backend', finding2), ...])
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from findings_cache import normalize_path
+from review_stream import severity_rank
+
+LINE_WINDOW = 3       # 同じ問題とみなす行の差
+SIMILARITY = 0.6      # 同じ問題とみなす issue の類似度（Jaccard 係数）
+MAX_CANDIDATES = 64   # 1件あたりに比べる近くの指摘の上限
+
+WORD_RE = re.compile(r'[a-z0-9_]+|[^\W\d_a-z]+')
+CATEGORY_SEPARATOR_RE = re.compile(r'[\W_]+')
+
+
+def normalize_category(category) -> str:
+    """'SQL-Injection' と 'sql injection' を同じ値にする"""
+    return CATEGORY_SEPARATOR_RE.sub(' ', str(category or '').lower()).strip()
+
+
+def issue_tokens(text) -> frozenset:
+    """issue の語の集合（英数字は単語、それ以外の文字の並びは2文字ずつ）"""
+    tokens = set()
+    for word in WORD_RE.findall(str(text or '').lower()):
+        if word.isascii() or len(word) == 1:
+            tokens.add(word)
+        else:
+            tokens.update(word[i:i + 2] for i in range(len(word) - 1))
+    return frozenset(tokens)
+
+
+def _similarity(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class _Cluster:
+    """まとめた指摘1件（finding は出力する代表の指摘）"""
+
+    def __init__(self, aspect: str, finding: Dict, line: Optional[int], index: int):
+        self.finding = dict(finding, aspects=[aspect])
+        self.index = index  # FindingDeduplicator.findings 上の位置
+        self.line = line
+        self.category = normalize_category(finding.get('category'))
+        self.tokens = issue_tokens(finding.get('issue'))
+
+
+class FindingDeduplicator:
+    """指摘を1件ずつ登録し、既に登録した指摘との重複をまとめる"""
+
+    def __init__(self, line_window: int = LINE_WINDOW, similarity: float = SIMILARITY):
+        self.line_window = max(line_window, 1)
+        self.similarity = similarity
+        # (ファイルパス, 行 // line_window) → その範囲の指摘。行のない指摘は (パス, None)
+        self._buckets: Dict[Tuple[str, Optional[int]], List[_Cluster]] = {}
+        self.findings: List = []
+        self.removed = 0
+        # 直前の add() で代表を置き換えた場合の元の代表（置き換えていなければ None）
+        self.replaced: Optional[Dict] = None
+
+    def _candidates(self, path: str, line: Optional[int]) -> Iterable[_Cluster]:
+        if line is None:
+            keys = [(path, None)]
+        else:
+            bucket = line // self.line_window
+            keys = [(path, bucket - 1), (path, bucket), (path, bucket + 1)]
+        for key in keys:
+            # 新しく登録したものから比べる
+            yield from reversed(self._buckets.get(key, [])[-MAX_CANDIDATES:])
+
+    def _is_duplicate(self, cluster: _Cluster, aspect: str, line: Optional[int],
+                      category: str, tokens: frozenset) -> bool:
+        if line is not None and (cluster.line is None or
+                                 abs(cluster.line - line) > self.line_window):
+            return False
+        if category and category == cluster.category and aspect not in cluster.finding['aspects']:
+            return True
+        return _similarity(tokens, cluster.tokens) >= self.similarity
+
+    def add(self, aspect: str, finding) -> Optional[Dict]:
+        """指摘を登録する。新しい指摘なら代表の指摘を、重複ならまとめて None を返す
+
+        重複でも代表より重要度が高い場合は、代表を置き換えて新しい代表を返す
+        (元の代表は replaced に入る)。
+        """
+        self.replaced = None
+        if not isinstance(finding, dict):
+            self.findings.append(finding)
+            return finding
+
+        path = normalize_path(finding.get('file'))
+        line = finding.get('line')
+        if not isinstance(line, int) or isinstance(line, bool):
+            line = None
+        category = normalize_category(finding.get('category'))
+        tokens = issue_tokens(finding.get('issue'))
+
+        for checked, cluster in enumerate(self._candidates(path, line)):
+            if checked >= MAX_CANDIDATES:
+                break
+            if self._is_duplicate(cluster, aspect, line, category, tokens):
+                return self._merge(cluster, aspect, finding)
+
+        cluster = _Cluster(aspect, finding, line, len(self.findings))
+        key = (path, None if line is None else line // self.line_window)
+        self._buckets.setdefault(key, []).append(cluster)
+        self.findings.append(cluster.finding)
+        return cluster.finding
+
+    def _merge(self, cluster: _Cluster, aspect: str, finding: Dict) -> Optional[Dict]:
+        representative = cluster.finding
+        aspects = representative['aspects']
+        if aspect not in aspects:
+            aspects.append(aspect)
+        duplicates = representative.get('duplicates', 0) + 1
+        self.removed += 1
+        if severity_rank(finding) >= severity_rank(representative):
+            representative['duplicates'] = duplicates
+            return None
+        # 後から来た重複の方が重要度が高い: 代表を置き換える
+        cluster.finding = dict(finding, aspects=aspects, duplicates=duplicates)
+        self.findings[cluster.index] = cluster.finding
+        self.replaced = representative
+        return cluster.finding
+
+
+def dedupe_findings(entries: Iterable[Tuple[str, Dict]],
+                    line_window: int = LINE_WINDOW,
+                    similarity: float = SIMILARITY) -> Tuple[List, int]:
+    """(観点, 指摘) の並びの重複をまとめ、(重要度順の指摘, まとめた件数) を返す"""
+    deduplicator = FindingDeduplicator(line_window, similarity)
+    for aspect, finding in sorted(entries, key=lambda entry: severity_rank(entry[1])):
+        deduplicator.add(aspect, finding)
+    return deduplicator.findings, deduplicator.removed
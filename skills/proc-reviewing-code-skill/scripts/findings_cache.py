@@ -0,0 +1,271 @@
+"""
+ハンク単位のレビュー結果キャッシュ (review-orchestrator.py 用の共有モジュール)
+
+PR に新しい push があると、大半のハンクが前回と同じでも差分全体を再レビューしていた。
+FindingsCache は 観点・正規化したハンクのハッシュ・ガイドラインのハッシュ・
+プロジェクトコンテキストのハッシュ をキーに、ハンクごとの指摘をディスクに保存する。
+キャッシュにあるハンクはレビューに送らず、新規・変更されたハンクだけをレビューする。
+
+- ハンクの正規化: ファイルパスと本文 (@@ 行の行番号を除く、行末の空白を除く) のみを
+  ハッシュするため、前後の変更で位置がずれただけのハンクもヒットする
+- 指摘の行番号はハンクの開始行からの相対値で保存し、取り出す際に現在の位置へ戻す
+- 指摘は file / line からハンクに割り当てる。割り当てられない指摘 (file や line が
+  ない等) は、そのプロンプトの最初のハンクの指摘として保存する
+- エントリは <cache_dir>/<キーの先頭2文字>/<キー>.json の1ファイル1キーで、
+  書き込みは一時ファイル + rename で行う (並行する CI ジョブ間でも安全)
+- 既定の保存先は $XDG_CACHE_HOME/proc-reviewing-code/findings (未設定なら ~/.cache の下)。
+  レビューするリポジトリの中には書かない
+- 壊れた・手で編集されたエントリ (形式の合わないもの) はキャッシュにないものとして扱う
+
+Usage:
+    from findings_cache import FindingsCache, scan_hunks
+
+    cache = FindingsCache(DEFAULT_CACHE_DIR, project_context)
+    hunks = scan_hunks(diff_path, files)
+    hits, misses = cache.partition('security', guidelines_path, hunks)
+    ...
+    cache.store('security', guidelines_path, reviewed_hunks, findings)
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from diff_sharding import FileDiff, Range, Shard
+
+CACHE_VERSION = 1
+
+
+def default_cache_dir() -> Path:
+    """$XDG_CACHE_HOME (未設定なら ~/.cache) の下のキャッシュの保存先"""
+    base = os.environ.get('XDG_CACHE_HOME') or str(Path.home() / '.cache')
+    return Path(base) / 'proc-reviewing-code' / 'findings'
+
+
+DEFAULT_CACHE_DIR = default_cache_dir()
+
+# @@ -a,b +c,d @@ の変更後の開始行と行数
+HUNK_RANGE_RE = re.compile(rb'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+
+class Hunk:
+    """差分中の1ハンク（ハンクを持たないファイルはファイル全体を1ハンクとみなす）"""
+
+    def __init__(self, file_diff: FileDiff, start: int, end: int, digest: str,
+                 new_start: Optional[int] = None, new_count: Optional[int] = None):
+        self.file_diff = file_diff
+        self.path = file_diff.path
+        self.start = start
+        self.end = end
+        self.digest = digest
+        self.new_start = new_start
+        self.new_count = new_count
+
+    @property
+    def range(self) -> Range:
+        return (self.start, self.end)
+
+    def contains_line(self, line: int) -> bool:
+        if self.new_start is None:
+            return False
+        return self.new_start <= line < self.new_start + max(self.new_count or 0, 1)
+
+    def distance(self, line: int) -> int:
+        if self.new_start is None:
+            return 0
+        if line < self.new_start:
+            return self.new_start - line
+        return max(line - (self.new_start + max(self.new_count or 0, 1) - 1), 0)
+
+    def __repr__(self):
+        return f"Hunk({self.path!r}, +{self.new_start},{self.new_count})"
+
+
+def _normalized_digest(path: Optional[str], data: bytes) -> str:
+    """ファイルパスと、行番号・行末の空白を除いたハンク本文のハッシュ"""
+    digest = hashlib.sha256((path or '').encode('utf-8') + b'\0')
+    lines = data.split(b'\n')
+    if lines and lines[0].startswith(b'@@'):
+        lines = lines[1:]
+    for line in lines:
+        digest.update(line.rstrip() + b'\n')
+    return digest.hexdigest()
+
+
+def scan_hunks(diff_path: Path, files: List[FileDiff]) -> List[Hunk]:
+    """scan_diff() の結果からハンクを列挙する（ハンクを1つずつ読む）"""
+    hunks: List[Hunk] = []
+    with open(diff_path, 'rb') as f:
+        for file_diff in files:
+            ranges = file_diff.hunk_ranges() or [(file_diff.start, file_diff.end)]
+            for start, end in ranges:
+                f.seek(start)
+                data = f.read(end - start)
+                match = HUNK_RANGE_RE.match(data)
+                new_start = new_count = None
+                if match:
+                    new_start = int(match.group(1))
+                    new_count = int(match.group(2)) if match.group(2) is not None else 1
+                hunks.append(Hunk(file_diff, start, end, _normalized_digest(file_diff.path, data),
+                                  new_start, new_count))
+    return hunks
+
+
+def select_files(hunks: List[Hunk]) -> List[FileDiff]:
+    """指定したハンクだけを含む FileDiff の並び（差分の順序を保つ）"""
+    by_file: Dict[int, Tuple[FileDiff, List[Range]]] = {}
+    for hunk in hunks:
+        entry = by_file.setdefault(id(hunk.file_diff), (hunk.file_diff, []))
+        entry[1].append(hunk.range)
+    files = []
+    for file_diff, ranges in by_file.values():
+        if file_diff.hunks:
+            files.append(file_diff.select(ranges))
+        else:
+            files.append(file_diff)
+    return files
+
+
+def hunks_in_shard(shard: Shard, hunks: List[Hunk]) -> List[Hunk]:
+    """シャードのバイト範囲に含まれるハンク"""
+    ranges = sorted(shard.ranges)
+    starts = [start for start, _ in ranges]
+    contained = []
+    for hunk in hunks:
+        index = bisect.bisect_right(starts, hunk.start) - 1
+        if index >= 0 and ranges[index][1] >= hunk.end:
+            contained.append(hunk)
+    return contained
+
+
+def normalize_path(path) -> str:
+    path = str(path or '').strip()
+    for prefix in ('a/', 'b/', './'):
+        path = path.removeprefix(prefix)
+    return path
+
+
+def assign_findings(hunks: List[Hunk], findings: List[Dict]) -> Dict[int, List[Dict]]:
+    """指摘を file / line からハンクに割り当てる（キーは hunks 内の位置）
+
+    同じファイルのハンクのうち、行を含むもの → 最も近いもの の順に選ぶ。
+    割り当てられない指摘は最初のハンクに割り当てる。
+    """
+    assigned: Dict[int, List[Dict]] = {index: [] for index in range(len(hunks))}
+    if not hunks:
+        return assigned
+    by_path: Dict[str, List[int]] = {}
+    for index, hunk in enumerate(hunks):
+        by_path.setdefault(normalize_path(hunk.path), []).append(index)
+
+    for finding in findings:
+        if not isinstance(finding, dict):
+            assigned[0].append(finding)
+            continue
+        candidates = by_path.get(normalize_path(finding.get('file')))
+        line = finding.get('line')
+        target = 0
+        if candidates:
+            target = candidates[0]
+            if isinstance(line, int) and not isinstance(line, bool):
+                target = min(candidates, key=lambda index: (not hunks[index].contains_line(line),
+                                                            hunks[index].distance(line)))
+        assigned[target].append(finding)
+    return assigned
+
+
+def _valid_entry(entry) -> bool:
+    """キャッシュのエントリ {'finding': 指摘, 'line_offset': int または None} の形式か"""
+    if not isinstance(entry, dict) or not isinstance(entry.get('finding'), dict):
+        return False
+    offset = entry.get('line_offset')
+    return offset is None or (isinstance(offset, int) and not isinstance(offset, bool))
+
+
+class FindingsCache:
+    """観点 × ハンク単位の指摘のキャッシュ"""
+
+    def __init__(self, cache_dir: Path, project_context: str, salt: str = ''):
+        self.cache_dir = Path(cache_dir)
+        self.context_hash = hashlib.sha256(project_context.encode('utf-8')).hexdigest()
+        # レビューの実行方法 (バックエンド等) が変わった場合にキーを変えるための値
+        self.salt = salt
+        self._guideline_hashes: Dict[Path, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _guidelines_hash(self, guidelines_path: Path) -> str:
+        if guidelines_path not in self._guideline_hashes:
+            self._guideline_hashes[guidelines_path] = hashlib.sha256(
+                Path(guidelines_path).read_bytes()
+            ).hexdigest()
+        return self._guideline_hashes[guidelines_path]
+
+    def key(self, aspect: str, guidelines_path: Path, hunk: Hunk) -> str:
+        parts = [str(CACHE_VERSION), self.salt, aspect, hunk.digest,
+                 self._guidelines_hash(guidelines_path), self.context_hash]
+        return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def lookup(self, key: str) -> Optional[List[Dict]]:
+        try:
+            data = json.loads(self._entry_path(key).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or not isinstance(data.get('findings'), list):
+            return None
+        if not all(_valid_entry(entry) for entry in data['findings']):
+            return None
+        return data['findings']
+
+    def partition(self, aspect: str, guidelines_path: Path,
+                  hunks: List[Hunk]) -> Tuple[List[Dict], List[Hunk]]:
+        """キャッシュにある指摘 (現在の行番号に戻したもの) と、レビューが必要なハンクを返す"""
+        findings: List[Dict] = []
+        misses: List[Hunk] = []
+        for hunk in hunks:
+            entries = self.lookup(self.key(aspect, guidelines_path, hunk))
+            if entries is None:
+                misses.append(hunk)
+                self.misses += 1
+                continue
+            self.hits += 1
+            for entry in entries:
+                finding = dict(entry['finding'])
+                if entry.get('line_offset') is not None and hunk.new_start is not None:
+                    finding['line'] = hunk.new_start + entry['line_offset']
+                findings.append(finding)
+        return findings, misses
+
+    def store(self, aspect: str, guidelines_path: Path, hunks: List[Hunk], findings: List[Dict]):
+        """1回のレビューで対象にしたハンクと、その指摘を保存する"""
+        for index, assigned in assign_findings(hunks, findings).items():
+            hunk = hunks[index]
+            entries = []
+            for finding in assigned:
+                if not isinstance(finding, dict):
+                    continue
+                line = finding.get('line')
+                offset = None
+                if isinstance(line, int) and not isinstance(line, bool) \
+                        and hunk.new_start is not None:
+                    offset = line - hunk.new_start
+                entries.append({'finding': finding, 'line_offset': offset})
+            self._write(self.key(aspect, guidelines_path, hunk), {'findings': entries})
+
+    def _write(self, key: str, data: Dict):
+        path = self._entry_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp_path, path)
+        except OSError:
+            # キャッシュに書けなくてもレビュー自体は続行する
+            pass
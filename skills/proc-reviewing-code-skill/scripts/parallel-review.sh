@@ -1,17 +1,40 @@
 #!/bin/bash
 # parallel_review.sh - 4観点並列レビュー実行エンジン
 # Usage: ./parallel_review.sh "<diff_content>" "<project_context>"
+#        ./parallel_review.sh --diff-file <path> "<project_context>"
+#        git diff HEAD | ./parallel_review.sh --diff - "<project_context>"
 
 set -euo pipefail
 
-# 引数チェック
-if [ $# -ne 2 ]; then
+usage() {
   echo "Usage: $0 '<diff_content>' '<project_context>'" >&2
+  echo "       $0 --diff-file <path> '<project_context>'" >&2
+  echo "       $0 --diff - '<project_context>'  (diff from stdin)" >&2
   exit 1
+}
+
+# 引数チェック
+if [ $# -ne 2 ] && [ $# -ne 3 ]; then
+  usage
 fi
 
-DIFF_CONTENT="$1"
-PROJECT_CONTEXT="$2"
+DIFF_CONTENT=""
+DIFF_FILE=""
+DIFF_FROM_STDIN=false
+if [ $# -eq 3 ]; then
+  case "$1" in
+    --diff-file) DIFF_FILE="$2" ;;
+    --diff)
+      [ "$2" = "-" ] || usage
+      DIFF_FROM_STDIN=true
+      ;;
+    *) usage ;;
+  esac
+  PROJECT_CONTEXT="$3"
+else
+  DIFF_CONTENT="$1"
+  PROJECT_CONTEXT="$2"
+fi
 REVIEW_ASPECTS=("frontend" "backend" "infrastructure" "security")
 TIMEOUT=120  # 各レビューのタイムアウト（秒）
 PIDS=()
@@ -40,13 +63,41 @@ cleanup() {
 }
 trap cleanup EXIT
 
+# 差分は1度だけファイルに書き出し、全観点のプロセスがそのファイルを読む
+# （argv やシェル変数に差分を複製しない）
+if [ -n "$DIFF_FILE" ]; then
+  if [ ! -r "$DIFF_FILE" ]; then
+    echo "Error: Diff file not readable: $DIFF_FILE" >&2
+    exit 1
+  fi
+else
+  DIFF_FILE="${TEMP_DIR}/diff_content.txt"
+  if $DIFF_FROM_STDIN; then
+    cat > "$DIFF_FILE"
+  else
+    printf '%s' "$DIFF_CONTENT" > "$DIFF_FILE"
+    DIFF_CONTENT=""
+  fi
+fi
+
+# 観点ごとのプロンプトの前半（文脈・観点）と後半（ガイドライン・出力形式）を
+# 起動前に1度だけ組み立ててファイルに書き出す（ガイドラインは各1回だけ読む）
+if ! python3 "${SCRIPT_DIR}/review_prompt.py" \
+    --context "$PROJECT_CONTEXT" \
+    --output-dir "$TEMP_DIR" \
+    --references-dir "$REFERENCES_DIR" \
+    "${REVIEW_ASPECTS[@]}"; then
+  echo "Error: Failed to build review prompts" >&2
+  exit 1
+fi
+
 echo "Starting parallel code review with 4 perspectives..." >&2
 echo "Timeout per aspect: ${TIMEOUT}s" >&2
 echo "" >&2
 
-# 並列実行：各観点ごとにGemini CLIプロセスを起動
-for aspect in "${REVIEW_ASPECTS[@]}"; do
-  {
+# 1観点分のレビュー（バックグラウンドで実行する）
+review_aspect() {
+    local aspect="$1"
     echo "Launching ${aspect} review..." >&2
 
     # Gemini CLI ヘッドレスモード with ベストプラクティス
@@ -56,49 +107,10 @@ for aspect in "${REVIEW_ASPECTS[@]}"; do
       CMD_PREFIX=""
     fi
 
-    # レビューガイドラインを読み込み
-    REVIEW_GUIDELINES=$(cat "${REFERENCES_DIR}/${aspect}-review.md")
-
-    # 差分内容を一時ファイルに保存（パラメータ展開を防ぐため）
-    printf '%s' "$DIFF_CONTENT" > "${TEMP_DIR}/diff_content.txt"
-
-    # プロンプトを構築
-    PROMPT=$(cat <<_REVIEW_PROMPT_EOF_
-# Project Context
-${PROJECT_CONTEXT}
-
-# Review Focus: ${aspect}
-You are reviewing code changes from a ${aspect} perspective.
-Your task is to identify issues, risks, and improvement opportunities.
-
-# Code Changes
-$(cat "${TEMP_DIR}/diff_content.txt")
-
-# Review Guidelines
-${REVIEW_GUIDELINES}
-
-# Output Format
-Provide findings in JSON format with this exact structure:
-{
-  "aspect": "${aspect}",
-  "findings": [
-    {
-      "severity": "critical|high|medium|low",
-      "category": "string",
-      "file": "relative/path/to/file",
-      "line": 0,
-      "issue": "description",
-      "suggestion": "improvement"
-    }
-  ]
-}
-
-IMPORTANT: Output ONLY valid JSON, no additional text or explanation.
-_REVIEW_PROMPT_EOF_
-)
-
-    $CMD_PREFIX gemini \
-      -p "$PROMPT" \
+    # プロンプトは argv ではなく stdin で渡す（ARG_MAX を超える差分に対応）
+    # 前半・差分・後半の各ファイルを順に流し込む（シェル変数に展開しない）
+    cat "${TEMP_DIR}/prompt_${aspect}.head" "$DIFF_FILE" "${TEMP_DIR}/prompt_${aspect}.tail" \
+      | $CMD_PREFIX gemini \
       --output-format json \
       > "${TEMP_DIR}/review_${aspect}_raw.json" 2>"${TEMP_DIR}/review_${aspect}.err" || {
         # エラーハンドリング：失敗時はエラー情報を記録（jqで安全にJSON構築）
@@ -109,35 +121,28 @@ _REVIEW_PROMPT_EOF_
           > "${TEMP_DIR}/review_${aspect}.json"
         echo "Error: ${aspect} review failed" >&2
         echo "${aspect} review completed" >&2
-        return
+        # 失敗数とスクリプトの終了コードに数える（wait で検出する）
+        return 1
       }
 
-    # Gemini CLI出力からresponseフィールドを抽出し、Markdownコードブロックを除去
+    # Gemini CLI出力からレビュー結果のJSONを取り出す（コードブロック・前後の説明文・
+    # 末尾のカンマ・途中切れを1回の走査で修復する）。取り出せない場合は応答の本文が
+    # 書かれ、後段のバリデーションで Invalid JSON として扱う
     if [ -f "${TEMP_DIR}/review_${aspect}_raw.json" ]; then
-      # responseフィールドを抽出
-      RESPONSE=$(jq -r '.response // empty' "${TEMP_DIR}/review_${aspect}_raw.json" 2>/dev/null)
-
-      if [ -n "$RESPONSE" ]; then
-        # Markdownコードブロック（```json ... ```）を除去
-        # shellcheck disable=SC2016
-        echo "$RESPONSE" | sed -n '/^```json$/,/^```$/p' | sed '1d;$d' > "${TEMP_DIR}/review_${aspect}.json"
-
-        # JSONが空または不正な場合は、元のレスポンスから直接抽出を試みる
-        if ! jq empty "${TEMP_DIR}/review_${aspect}.json" 2>/dev/null; then
-          # 別の形式の可能性：コードブロックなしでJSONが直接入っている場合
-          echo "$RESPONSE" > "${TEMP_DIR}/review_${aspect}.json"
-        fi
-      else
-        # responseフィールドがない場合は、生の出力をそのまま使用
-        cp "${TEMP_DIR}/review_${aspect}_raw.json" "${TEMP_DIR}/review_${aspect}.json"
-      fi
+      python3 "${SCRIPT_DIR}/review_json.py" \
+        < "${TEMP_DIR}/review_${aspect}_raw.json" \
+        > "${TEMP_DIR}/review_${aspect}.json" 2>>"${TEMP_DIR}/review_${aspect}.err" || true
 
       # 一時ファイルをクリーンアップ
       rm -f "${TEMP_DIR}/review_${aspect}_raw.json"
     fi
 
     echo "${aspect} review completed" >&2
-  } &
+}
+
+# 並列実行：各観点ごとにGemini CLIプロセスを起動
+for aspect in "${REVIEW_ASPECTS[@]}"; do
+  review_aspect "$aspect" &
   PIDS+=($!)
 done
 
@@ -153,7 +158,7 @@ for i in "${!PIDS[@]}"; do
   if wait "$pid"; then
     echo "✓ ${aspect} review succeeded" >&2
   else
-    ((failed++))
+    failed=$((failed + 1))
     echo "✗ ${aspect} review failed (PID: $pid)" >&2
   fi
 done
@@ -162,16 +167,22 @@ echo "" >&2
 echo "Review completion status: $((${#REVIEW_ASPECTS[@]} - failed))/${#REVIEW_ASPECTS[@]} succeeded" >&2
 echo "" >&2
 
+# レビュー結果（findings）またはエラー情報（error）を持つ JSON オブジェクトか
+# （gemini の外側の JSON がそのまま残った場合等は不正とみなす）
+is_review_json() {
+  [ -s "$1" ] && jq -e 'type == "object" and (has("findings") or has("error"))' "$1" > /dev/null 2>&1
+}
+
 # 結果のバリデーション
 echo "Validating JSON outputs..." >&2
 invalid_count=0
 for aspect in "${REVIEW_ASPECTS[@]}"; do
   if [ -f "${TEMP_DIR}/review_${aspect}.json" ]; then
-    if jq empty "${TEMP_DIR}/review_${aspect}.json" 2>/dev/null; then
+    if is_review_json "${TEMP_DIR}/review_${aspect}.json"; then
       echo "✓ ${aspect}: Valid JSON" >&2
     else
       echo "✗ ${aspect}: Invalid JSON" >&2
-      ((invalid_count++))
+      invalid_count=$((invalid_count + 1))
       # 不正なJSONの場合、エラー情報を確認
       if [ -s "${TEMP_DIR}/review_${aspect}.err" ]; then
         echo "  Error output:" >&2
@@ -180,7 +191,7 @@ for aspect in "${REVIEW_ASPECTS[@]}"; do
     fi
   else
     echo "✗ ${aspect}: Output file not found" >&2
-    ((invalid_count++))
+    invalid_count=$((invalid_count + 1))
   fi
 done
 
@@ -216,7 +227,7 @@ else
 
     first=true
     for aspect in "${REVIEW_ASPECTS[@]}"; do
-      if [ -f "${TEMP_DIR}/review_${aspect}.json" ] && jq empty "${TEMP_DIR}/review_${aspect}.json" 2>/dev/null; then
+      if [ -f "${TEMP_DIR}/review_${aspect}.json" ] && is_review_json "${TEMP_DIR}/review_${aspect}.json"; then
         if ! $first; then
           echo ","
         fi
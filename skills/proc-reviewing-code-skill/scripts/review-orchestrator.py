@@ -2,19 +2,51 @@
 """
 review_orchestrator.py - コードレビュー全体のオーケストレーション
 
+各観点のレビューは aspect_executor.py が asyncio で並列に実行する。
+差分は一時ファイル (または --diff-file で指定したファイル) に1度だけ置き、
+全観点のプロセスがそのファイルを読む。
+
 Usage:
     ./review_orchestrator.py --diff "<diff_content>" --context "<project_context>"
+    ./review_orchestrator.py --diff-file review.diff --context "<project_context>"
+    git diff HEAD | ./review_orchestrator.py --diff - --context "<project_context>"
+    ./review_orchestrator.py --diff-file review.diff --context "..." --backend stub --stub-latency 2
+    ./review_orchestrator.py --diff-file review.diff --context "..." --stream  # NDJSON
+    ./review_orchestrator.py --diff-file review.diff --context "..." \
+        --metrics-json metrics.json --metrics-prom /var/lib/node_exporter/textfile/review.prom
+    ./review_orchestrator.py --diff-file review.diff --context "..." --fail-fast-on critical
+    ./review_orchestrator.py --batch ranges.txt --context "..." --batch-output-dir reports
     ./review_orchestrator.py --help
 """
 
 import argparse
+import asyncio
+import contextlib
 import json
 import logging
-import os
-import subprocess
+import shutil
 import sys
+import tempfile
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from aspect_executor import ASPECT_TIMEOUT, RETRY_BACKOFF, TOTAL_TIMEOUT, AspectExecutor
+from diff_routing import route_files
+from diff_sharding import SHARD_BUDGET, FileDiff, plan_shards, scan_diff
+from finding_dedup import FindingDeduplicator, dedupe_findings
+from findings_cache import (
+    DEFAULT_CACHE_DIR,
+    FindingsCache,
+    hunks_in_shard,
+    scan_hunks,
+    select_files,
+)
+from review_backends import BACKENDS, ReviewerBackend, create_backend
+from review_batch import BatchEntry, read_batch_file, read_batch_list
+from review_metrics import ReviewMetrics
+from review_prompt import PromptBuilder
+from review_scheduler import DEFAULT_PRIORITY, MAX_CONCURRENCY, ReviewScheduler
+from review_stream import SEVERITY_ORDER, FindingStream, severity_rank
 
 # ログ設定
 logging.basicConfig(
@@ -23,102 +55,311 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# スクリプトのディレクトリを取得
-SCRIPT_DIR = Path(__file__).parent.resolve()
-PARALLEL_REVIEW_SCRIPT = SCRIPT_DIR / "parallel-review.sh"
+LARGE_DIFF_LINES = 1000
+FAIL_FAST_SEVERITIES = ['critical', 'high']
+EXIT_GATE_FAILED = 2  # --fail-fast-on の重要度以上の指摘があった場合の終了コード
+
+
+def count_lines(path: Path) -> Tuple[int, int]:
+    """ファイルのバイト数と行数を、全体を読み込まずに数える"""
+    size = lines = 0
+    last = b''
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            size += len(chunk)
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    if size and last != b'\n':
+        lines += 1
+    return size, lines
+
+
+class PrefixedLogger(logging.LoggerAdapter):
+    """一括レビューで、どのレビュー対象のログかを行頭に付ける"""
+
+    def process(self, msg, kwargs):
+        return f"[{self.extra['name']}] {msg}", kwargs
 
 
 class ReviewOrchestrator:
     """コードレビュープロセスの統合管理"""
 
-    def __init__(self, diff_content: str, project_context: str, max_retries: int = 2):
+    def __init__(self, diff_content: Optional[str], project_context: str, max_retries: int = 2,
+                 retry_backoff: float = RETRY_BACKOFF,
+                 executor: Optional[AspectExecutor] = None,
+                 diff_path: Optional[Path] = None,
+                 shard_budget: Optional[int] = None,
+                 cache_dir: Optional[Path] = None,
+                 backend: Optional[ReviewerBackend] = None,
+                 scheduler: Optional[ReviewScheduler] = None,
+                 stream: Optional[FindingStream] = None,
+                 dedup: bool = True,
+                 route: bool = True,
+                 metrics: Optional[ReviewMetrics] = None,
+                 name: Optional[str] = None,
+                 report_path: Optional[Path] = None,
+                 fail_fast_on: Optional[str] = None):
+        if (diff_content is None) == (diff_path is None):
+            raise ValueError("Specify exactly one of diff_content or diff_path")
         self.diff_content = diff_content
+        self.diff_path = Path(diff_path) if diff_path is not None else None
         self.project_context = project_context
+        # 差分をシャードに分ける場合の1シャードの上限（バイト、None は分割しない）
+        self.shard_budget = shard_budget
         self.max_retries = max_retries
+        self.executor = executor or AspectExecutor(
+            backend=backend, max_retries=max_retries, retry_backoff=retry_backoff,
+            scheduler=scheduler, metrics=metrics
+        )
+        # ハンク単位の指摘キャッシュ（None は使わない、バックエンドごとに分ける）
+        self.cache = None
+        if cache_dir is not None:
+            self.cache = FindingsCache(cache_dir, project_context,
+                                       salt=self.executor.backend.cache_salt)
+        self._cache_plan: Dict[str, Tuple[List, List]] = {}
+        # 観点の完了ごとに指摘を書き出す場合の出力先（None は完了後に JSON を1つ出力）
+        self.stream = stream
+        # 観点をまたいだ重複する指摘をまとめるか
+        self.dedup = dedup
+        # ファイル種別で観点ごとの部分差分を作るか（関係するファイルがない観点はレビューしない）
+        self.route = route
+        self.skipped_aspects: List[str] = []
+        # この重要度以上の指摘が出た時点で残りのレビューをキャンセルする（None は全観点を待つ）
+        if fail_fast_on is not None and fail_fast_on not in FAIL_FAST_SEVERITIES:
+            raise ValueError(f"Unsupported fail-fast severity: {fail_fast_on}")
+        self.fail_fast_on = fail_fast_on
+        self.gate_trigger: Optional[Dict] = None
+        # レポートの出力先（None は標準出力）
+        self.report_path = report_path
+        self.logger = PrefixedLogger(logger, {'name': name}) if name else logger
         self.results: Optional[Dict] = None
 
-    def validate_inputs(self) -> bool:
+    @contextlib.contextmanager
+    def diff_file(self) -> Iterator[Path]:
+        """レビュー対象の差分ファイル（文字列で渡された場合は一時ファイルに1度だけ書き出す）"""
+        if self.diff_path is not None:
+            yield self.diff_path
+            return
+        with tempfile.TemporaryDirectory(prefix='code_review.') as temp_dir:
+            path = Path(temp_dir) / 'diff_content.txt'
+            path.write_text(self.diff_content, encoding='utf-8')
+            yield path
+
+    def validate_inputs(self, diff_path: Path) -> bool:
         """入力の検証"""
-        logger.info("Validating inputs...")
+        self.logger.info("Validating inputs...")
 
         # 差分サイズチェック
-        diff_lines = len(self.diff_content.split('\n'))
-        logger.info(f"Diff size: {diff_lines} lines")
+        try:
+            diff_bytes, diff_lines = count_lines(diff_path)
+        except OSError as e:
+            self.logger.error(f"Failed to read diff: {e}")
+            return False
+        self.logger.info(f"Diff size: {diff_lines} lines ({diff_bytes} bytes)")
 
         if diff_lines == 0:
-            logger.error("Empty diff provided")
+            self.logger.error("Empty diff provided")
             return False
 
-        if diff_lines > 1000:
-            logger.warning(
+        if diff_lines > LARGE_DIFF_LINES and self.shard_budget is None:
+            self.logger.warning(
                 f"Large diff detected ({diff_lines} lines). "
-                "Consider splitting the review or reviewing specific files."
+                "Consider splitting the review (--shard) or reviewing specific files."
             )
             # 警告は出すが、処理は続行
 
-        # 並列レビュースクリプトの存在確認
-        if not PARALLEL_REVIEW_SCRIPT.exists():
-            logger.error(f"Parallel review script not found: {PARALLEL_REVIEW_SCRIPT}")
+        # レビューのバックエンドとガイドラインの存在確認
+        backend_error = self.executor.backend.check()
+        if backend_error:
+            self.logger.error(backend_error)
             return False
 
-        if not os.access(PARALLEL_REVIEW_SCRIPT, os.X_OK):
-            logger.error(f"Parallel review script is not executable: {PARALLEL_REVIEW_SCRIPT}")
-            return False
+        for aspect in self.executor.aspects:
+            guidelines = self.executor.guidelines_path(aspect)
+            if not guidelines.is_file():
+                self.logger.error(f"Review guidelines not found: {guidelines}")
+                return False
 
-        logger.info("Input validation passed")
+        self.logger.info("Input validation passed")
         return True
 
-    def run_parallel_review(self) -> Optional[Dict]:
-        """並列レビューの実行"""
-        logger.info("Starting parallel review execution...")
+    async def run_parallel_review(self, diff_path: Path) -> Optional[Dict]:
+        """並列レビューの実行（完了した観点から順に結果を受け取る）"""
+        self.logger.info("Starting parallel review execution...")
+        self.logger.info(f"Timeout per aspect: {self.executor.aspect_timeout}s")
+
+        shards = None
+        cached_findings = None
+        files = None
+        routed = None
+        if self.route or self.cache is not None or self.shard_budget is not None:
+            files = scan_diff(diff_path)
+        if self.route:
+            routed = self.route_review(files)
+        if self.cache is not None:
+            shards, cached_findings = self.plan_cached_review(diff_path, files, routed)
+        elif routed is not None:
+            budget = self.shard_budget if self.shard_budget is not None else sys.maxsize
+            shards = {aspect: plan_shards(selected, budget)
+                      for aspect, selected in routed.items()
+                      if selected is not files or self.shard_budget is not None}
+            jobs = sum(len(aspect_shards) for aspect_shards in shards.values()) \
+                + len(self.executor.aspects) - len(shards)
+            self.logger.info(f"Planned {jobs} review job(s) for {len(self.executor.aspects)} aspects")
+        elif self.shard_budget is not None:
+            shards = plan_shards(files, self.shard_budget)
+            jobs = len(shards) * len(self.executor.aspects)
+            self.logger.info(
+                f"Split diff into {len(shards)} shard(s) "
+                f"(budget: {self.shard_budget} bytes, {jobs} jobs)"
+            )
+            if len(shards) <= 1:
+                shards = None
 
         try:
-            result = subprocess.run(
-                [str(PARALLEL_REVIEW_SCRIPT), self.diff_content, self.project_context],
-                capture_output=True,
-                text=True,
-                timeout=600  # 全体のタイムアウト: 10分
+            review_data = await self.executor.run(
+                diff_path, self.project_context, on_result=self.on_aspect_completed, shards=shards,
+                on_shard=self.on_shard_completed, cached_findings=cached_findings,
+                stop_when=self.check_gate if self.fail_fast_on else None
             )
-
-            # stderrをログに出力（進捗情報が含まれる）
-            if result.stderr:
-                for line in result.stderr.split('\n'):
-                    if line.strip():
-                        logger.info(f"parallel_review: {line}")
-
-            # JSON結果をパース
-            if result.stdout:
-                try:
-                    review_data = json.loads(result.stdout)
-                    logger.info("Successfully parsed review results")
-                    return review_data
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse JSON output: {e}")
-                    logger.debug(f"Raw output: {result.stdout[:500]}")
-                    return None
-
-            # 出力がない場合
-            logger.error("No output from parallel review script")
-            return None
-
-        except subprocess.TimeoutExpired:
-            logger.error("Parallel review timed out after 10 minutes")
-            return None
         except Exception as e:
-            logger.error(f"Failed to execute parallel review: {e}")
+            self.logger.error(f"Failed to execute parallel review: {e}")
             return None
 
+        summary = review_data['review_summary']
+        if self.cache is not None:
+            summary['cache'] = {'hits': self.cache.hits, 'misses': self.cache.misses}
+        if self.skipped_aspects:
+            # 振り分けで対象外にした観点はレビューしていないため、成功に数えない
+            summary['successful'] -= len(self.skipped_aspects)
+            summary['skipped'] = len(self.skipped_aspects)
+            summary['skipped_aspects'] = list(self.skipped_aspects)
+            for result in review_data['aspects']:
+                if result.get('aspect') in self.skipped_aspects:
+                    result['skipped'] = True
+        self.logger.info(
+            f"Review completion status: {summary['successful']}/{summary['total_aspects']} succeeded"
+            + (f", {summary['skipped']} skipped" if self.skipped_aspects else "")
+        )
+        return review_data
+
+    def route_review(self, files: List[FileDiff]) -> Dict[str, List[FileDiff]]:
+        """観点ごとに関係するファイルを選ぶ（全ファイルを受け取る観点は files そのもの）"""
+        routed = route_files(files, self.executor.aspects)
+        paths = [file_diff.path for file_diff in files if file_diff.path is not None]
+        self.skipped_aspects = []
+        for aspect, selected in routed.items():
+            selected_paths = [file_diff.path for file_diff in selected
+                              if file_diff.path is not None]
+            if not selected:
+                self.skipped_aspects.append(aspect)
+                self.logger.info(f"{aspect}: no relevant files, skipping review")
+            elif len(selected) == len(files):
+                routed[aspect] = files
+            else:
+                self.logger.info(f"{aspect}: {len(selected_paths)}/{len(paths)} files routed")
+        return routed
+
+    def plan_cached_review(self, diff_path: Path, files: List[FileDiff],
+                           routed: Optional[Dict[str, List[FileDiff]]] = None):
+        """キャッシュにないハンクだけを観点ごとのシャードにする
+
+        routed を渡した場合は、観点ごとに振り分けたファイルのハンクだけを対象にする。
+        戻り値は ({観点: シャードのリスト}, {観点: キャッシュにあった指摘})。
+        """
+        hunks = scan_hunks(diff_path, files)
+        budget = self.shard_budget if self.shard_budget is not None else sys.maxsize
+        shards: Dict[str, List] = {}
+        cached_findings: Dict[str, List[Dict]] = {}
+        self._cache_plan = {}
+        for aspect in self.executor.aspects:
+            aspect_hunks = hunks
+            if routed is not None and routed[aspect] is not files:
+                selected = {id(file_diff) for file_diff in routed[aspect]}
+                aspect_hunks = [hunk for hunk in hunks if id(hunk.file_diff) in selected]
+            findings, misses = self.cache.partition(
+                aspect, self.executor.guidelines_path(aspect), aspect_hunks
+            )
+            cached_findings[aspect] = findings
+            shards[aspect] = plan_shards(select_files(misses), budget) if misses else []
+            self._cache_plan[aspect] = (shards[aspect], misses)
+            if aspect_hunks:
+                self.logger.info(
+                    f"{aspect}: {len(aspect_hunks) - len(misses)}/{len(aspect_hunks)} hunks "
+                    f"served from cache, {len(shards[aspect])} review job(s)"
+                )
+        return shards, cached_findings
+
+    def check_gate(self, findings: List[Dict]) -> bool:
+        """fail_fast_on 以上の重要度の指摘があれば、最初の1件を記録して True を返す"""
+        threshold = SEVERITY_ORDER[self.fail_fast_on]
+        for finding in findings:
+            if severity_rank(finding) <= threshold:
+                if self.gate_trigger is None:
+                    self.gate_trigger = finding
+                    self.logger.warning(
+                        f"Fail-fast: {finding.get('severity')} finding in "
+                        f"{finding.get('file', 'unknown')}:{finding.get('line', '?')}, "
+                        "cancelling remaining reviews"
+                    )
+                return True
+        return False
+
+    @property
+    def gate_failed(self) -> bool:
+        return self.gate_trigger is not None
+
+    def on_shard_completed(self, outcome: Dict):
+        """シャード1件の完了時に、成功した結果をハンク単位でキャッシュへ保存する"""
+        if self.cache is None or 'error' in outcome['result']:
+            return
+        aspect = outcome['aspect']
+        shards, misses = self._cache_plan[aspect]
+        findings = outcome['result'].get('findings')
+        if not isinstance(findings, list):
+            return
+        self.cache.store(aspect, self.executor.guidelines_path(aspect),
+                         hunks_in_shard(shards[outcome['shard']], misses), findings)
+
+    def on_aspect_completed(self, outcome: Dict):
+        """観点1件の完了時に呼ばれる（他の観点の完了を待たない）"""
+        aspect = outcome['aspect']
+        result = outcome['result']
+        if aspect in self.skipped_aspects:
+            self.logger.info(f"- {aspect} review skipped (no relevant files)")
+        elif outcome.get('cancelled'):
+            self.logger.info(f"- {aspect} review cancelled (fail-fast)")
+        elif 'error' in result and result.get('findings'):
+            self.logger.warning(
+                f"△ {aspect} review partially completed in {outcome['elapsed']:.1f}s "
+                f"({len(result['findings'])} findings): {result['error']}"
+            )
+        elif 'error' in result:
+            self.logger.warning(
+                f"✗ {aspect} review failed after {outcome['elapsed']:.1f}s: {result['error']}"
+                + (f" ({outcome['attempts']} attempts)" if outcome.get('attempts') else "")
+            )
+            for line in result.get('stderr', '').splitlines():
+                self.logger.info(f"{aspect}: {line}")
+        else:
+            self.logger.info(
+                f"✓ {aspect} review completed in {outcome['elapsed']:.1f}s "
+                f"({len(result.get('findings', []))} findings)"
+            )
+        if self.stream is not None:
+            self.stream.aspect_result(outcome)
+
     def validate_results(self, results: Dict) -> bool:
         """結果の検証"""
-        logger.info("Validating results...")
+        self.logger.info("Validating results...")
 
         if not results:
-            logger.error("Empty results")
+            self.logger.error("Empty results")
             return False
 
         # review_summaryの確認
         if 'review_summary' not in results:
-            logger.warning("Missing review_summary in results")
+            self.logger.warning("Missing review_summary in results")
             return False
 
         summary = results['review_summary']
@@ -126,34 +367,35 @@ class ReviewOrchestrator:
         successful = summary.get('successful', 0)
         failed = summary.get('failed', 0)
 
-        logger.info(f"Review summary: {successful}/{total} aspects succeeded, {failed} failed")
+        self.logger.info(f"Review summary: {successful}/{total} aspects succeeded, {failed} failed")
 
         # 少なくとも1つの観点で成功している必要がある
-        if successful == 0:
-            logger.error("All review aspects failed")
+        # (fail-fast でキャッシュの指摘だけで止めた場合は、レビューせずに判定できている)
+        if successful == 0 and not self.gate_failed:
+            self.logger.error("All review aspects failed")
             return False
 
         # aspectsの確認
         if 'aspects' not in results or not results['aspects']:
-            logger.error("Missing or empty aspects in results")
+            self.logger.error("Missing or empty aspects in results")
             return False
 
-        logger.info(f"Found {len(results['aspects'])} aspect results")
+        self.logger.info(f"Found {len(results['aspects'])} aspect results")
 
         # 各観点の結果をチェック
         for aspect in results['aspects']:
             aspect_name = aspect.get('aspect', 'unknown')
             if 'error' in aspect:
-                logger.warning(f"Aspect '{aspect_name}' returned an error: {aspect.get('error')}")
+                self.logger.warning(f"Aspect '{aspect_name}' returned an error: {aspect.get('error')}")
             elif 'findings' in aspect:
                 findings_count = len(aspect['findings'])
-                logger.info(f"Aspect '{aspect_name}': {findings_count} findings")
+                self.logger.info(f"Aspect '{aspect_name}': {findings_count} findings")
 
         return True
 
     def merge_and_format_results(self, results: Dict) -> Dict:
         """結果のマージと整形"""
-        logger.info("Merging and formatting results...")
+        self.logger.info("Merging and formatting results...")
 
         # サマリー情報の集計
         total_issues = 0
@@ -165,20 +407,32 @@ class ReviewOrchestrator:
         }
 
         all_findings = []
+        duplicates = 0
 
         for aspect in results.get('aspects', []):
             if 'findings' in aspect:
                 for finding in aspect['findings']:
-                    all_findings.append(finding)
-                    total_issues += 1
-
-                    severity = finding.get('severity', 'unknown').lower()
-                    if severity in severity_counts:
-                        severity_counts[severity] += 1
-
-        # 重要度順にソート
-        severity_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3, 'unknown': 4}
-        all_findings.sort(key=lambda x: severity_order.get(x.get('severity', 'unknown').lower(), 4))
+                    all_findings.append((aspect.get('aspect', 'unknown'), finding))
+
+        if self.dedup:
+            # 観点をまたいだ重複をまとめる（重要度順に並ぶ）
+            all_findings, duplicates = dedupe_findings(all_findings)
+        else:
+            # 重要度順にソート
+            all_findings = [finding for _, finding in sorted(all_findings,
+                                                             key=lambda x: severity_rank(x[1]))]
+
+        # 観点ごとの重複排除後の件数（まとめた指摘は最初に報告した観点に数える）
+        unique_counts: Dict[str, int] = {}
+        for finding in all_findings:
+            aspects = finding.get('aspects') if isinstance(finding, dict) else None
+            if aspects:
+                unique_counts[aspects[0]] = unique_counts.get(aspects[0], 0) + 1
+        for finding in all_findings:
+            total_issues += 1
+            severity = finding.get('severity', 'unknown').lower()
+            if severity in severity_counts:
+                severity_counts[severity] += 1
 
         # 最終レポート作成
         report = {
@@ -187,99 +441,312 @@ class ReviewOrchestrator:
                 'critical': severity_counts['critical'],
                 'high': severity_counts['high'],
                 'medium': severity_counts['medium'],
-                'low': severity_counts['low']
+                'low': severity_counts['low'],
+                'duplicates_removed': duplicates,
+                # 重複排除前の件数 (findings_by_aspect の count の合計)
+                'reported_issues': total_issues + duplicates
             },
             'review_details': results.get('review_summary', {}),
             'findings_by_aspect': {},
             'all_findings': all_findings
         }
 
+        if self.fail_fast_on is not None:
+            report['gate'] = {
+                'fail_on': self.fail_fast_on,
+                'passed': not self.gate_failed,
+                'trigger': self.gate_trigger,
+            }
+
         # 観点別にグルーピング
         for aspect in results.get('aspects', []):
             aspect_name = aspect.get('aspect', 'unknown')
+            count = len(aspect.get('findings', []))
             report['findings_by_aspect'][aspect_name] = {
+                # 観点が報告したままの指摘と件数 (重複排除前: summary の reported_issues の内訳)
                 'findings': aspect.get('findings', []),
-                'count': len(aspect.get('findings', [])),
+                'count': count,
+                # 重複排除後の件数 (summary の total_issues の内訳)
+                'unique_count': unique_counts.get(aspect_name, 0) if self.dedup else count,
                 'error': aspect.get('error')
             }
+            if aspect.get('skipped'):
+                report['findings_by_aspect'][aspect_name]['skipped'] = True
 
-        logger.info(f"Formatted report: {total_issues} total issues found")
+        self.logger.info(
+            f"Formatted report: {total_issues} total issues found"
+            + (f" ({duplicates} duplicates merged)" if duplicates else "")
+        )
         return report
 
-    def execute_with_retry(self) -> Optional[Dict]:
-        """リトライロジック付きでレビューを実行"""
-        for attempt in range(1, self.max_retries + 2):  # max_retries + 初回実行
-            logger.info(f"Review attempt {attempt}/{self.max_retries + 1}")
-
-            results = self.run_parallel_review()
+    async def execute_with_retry(self, diff_path: Path) -> Optional[Dict]:
+        """リトライ付きでレビューを実行
 
-            if results and self.validate_results(results):
-                logger.info("Review completed successfully")
-                return self.merge_and_format_results(results)
+        リトライは観点単位: 失敗または不正な JSON を返した観点だけを指数バックオフで
+        再実行し、成功した観点の結果はそのまま使う（AspectExecutor.max_retries）。
+        """
+        results = await self.run_parallel_review(diff_path)
 
-            if attempt <= self.max_retries:
-                logger.warning(f"Retrying... ({attempt}/{self.max_retries} retries)")
-            else:
-                logger.error("Max retries reached, review failed")
-                return None
+        if results and self.validate_results(results):
+            self.logger.info("Review completed successfully")
+            return self.merge_and_format_results(results)
 
+        self.logger.error("Review failed after retries")
         return None
 
+    def fail(self, message: str) -> bool:
+        self.logger.error(message)
+        if self.stream is not None:
+            self.stream.finish(None, error=message)
+        return False
+
     def run(self) -> bool:
         """メインのワークフロー実行"""
-        logger.info("=" * 60)
-        logger.info("Code Review Orchestrator - Starting")
-        logger.info("=" * 60)
+        return asyncio.run(self.run_async())
 
-        # 1. Plan: 入力検証
-        if not self.validate_inputs():
-            logger.error("Input validation failed")
-            return False
+    async def run_async(self) -> bool:
+        """メインのワークフロー（一括レビューでは複数を同じイベントループで並行に実行する）"""
+        self.logger.info("=" * 60)
+        self.logger.info("Code Review Orchestrator - Starting")
+        self.logger.info("=" * 60)
+
+        with self.diff_file() as diff_path:
+            # 1. Plan: 入力検証
+            if not self.validate_inputs(diff_path):
+                return self.fail("Input validation failed")
 
-        # 2. Execute: 並列レビュー実行（リトライ付き）
-        self.results = self.execute_with_retry()
+            # 2. Execute: 並列レビュー実行（リトライ付き）
+            self.results = await self.execute_with_retry(diff_path)
 
         if not self.results:
-            logger.error("Review execution failed")
-            return False
+            return self.fail("Review execution failed")
 
         # 3. Verify: 結果出力
-        logger.info("=" * 60)
-        logger.info("Review Results")
-        logger.info("=" * 60)
-        logger.warning(
+        self.logger.info("=" * 60)
+        self.logger.info("Review Results")
+        self.logger.info("=" * 60)
+        self.logger.warning(
             "Review results may contain code snippets. "
             "Ensure no sensitive data is exposed in CI/CD logs."
         )
-        print(json.dumps(self.results, indent=2, ensure_ascii=False))
+        if self.stream is not None:
+            # 指摘は観点の完了ごとに出力済み
+            self.stream.finish(self.results)
+        elif self.report_path is not None:
+            self.report_path.parent.mkdir(parents=True, exist_ok=True)
+            self.report_path.write_text(
+                json.dumps(self.results, indent=2, ensure_ascii=False) + '\n', encoding='utf-8'
+            )
+            self.logger.info(f"Report written to {self.report_path}")
+        else:
+            print(json.dumps(self.results, indent=2, ensure_ascii=False))
 
-        logger.info("=" * 60)
-        logger.info("Code Review Orchestrator - Completed")
-        logger.info("=" * 60)
+        self.logger.info("=" * 60)
+        self.logger.info("Code Review Orchestrator - Completed")
+        self.logger.info("=" * 60)
 
         return True
 
 
+async def run_batch(entries: List[BatchEntry], make_orchestrator: Callable[..., ReviewOrchestrator],
+                    output_dir: Path, temp_dir: Path) -> Dict:
+    """全件のレビューを1つのイベントループで並行に実行し、レポートの索引を返す
+
+    (範囲 × 観点) のレビューはすべて make_orchestrator が渡す共有の ReviewScheduler の
+    実行枠を取り合うため、全体の同時実行数・流量は件数によらず一定になる。
+    """
+    records = []
+    runs = []
+    for entry in entries:
+        record = {'name': entry.name, 'source': entry.source, 'success': False, 'report': None}
+        records.append(record)
+        try:
+            diff_path = entry.prepare(temp_dir)
+        except (OSError, ValueError) as e:
+            logger.error(f"[{entry.name}] {e}")
+            record['error'] = str(e)
+            continue
+        orchestrator = make_orchestrator(diff_path=diff_path, name=entry.name,
+                                         report_path=output_dir / f"{entry.name}.json")
+        runs.append((record, orchestrator))
+
+    logger.info(f"Batch review: {len(runs)} of {len(entries)} entries scheduled")
+    outcomes = await asyncio.gather(*(orchestrator.run_async() for _, orchestrator in runs),
+                                    return_exceptions=True)
+    for (record, orchestrator), outcome in zip(runs, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.error(f"[{record['name']}] Review crashed: {outcome}")
+            record['error'] = str(outcome)
+        elif outcome:
+            record['success'] = True
+            record['report'] = str(orchestrator.report_path)
+            record['summary'] = orchestrator.results['summary']
+            if 'gate' in orchestrator.results:
+                record['gate_passed'] = orchestrator.results['gate']['passed']
+
+    succeeded = sum(1 for record in records if record['success'])
+    return {'total': len(records), 'succeeded': succeeded, 'failed': len(records) - succeeded,
+            'entries': records}
+
+
 def main():
     """メイン関数"""
     parser = argparse.ArgumentParser(
         description='Code Review Orchestrator - 4観点並列レビューを統合管理'
     )
-    parser.add_argument(
+    diff_group = parser.add_mutually_exclusive_group(required=True)
+    diff_group.add_argument(
         '--diff',
-        required=True,
-        help='Git diff content to review'
+        help='Git diff content to review ("-" to read from stdin)'
+    )
+    diff_group.add_argument(
+        '--diff-file',
+        type=Path,
+        help='File containing the git diff to review'
+    )
+    diff_group.add_argument(
+        '--batch',
+        help='File listing diff files or git commit ranges to review in one run ("-" for stdin)'
     )
     parser.add_argument(
         '--context',
         required=True,
         help='Project context information'
     )
+    parser.add_argument(
+        '--shard',
+        action='store_true',
+        help='Split large diffs at file/hunk boundaries and review the chunks in parallel'
+    )
+    parser.add_argument(
+        '--shard-budget',
+        type=int,
+        default=SHARD_BUDGET,
+        help=f'Maximum diff bytes per shard with --shard (default: {SHARD_BUDGET})'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=DEFAULT_CACHE_DIR,
+        help=f'Directory for the hunk-level findings cache (default: {DEFAULT_CACHE_DIR})'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Review every hunk without reading or writing the findings cache'
+    )
     parser.add_argument(
         '--max-retries',
         type=int,
         default=2,
-        help='Maximum number of retries on failure (default: 2)'
+        help='Maximum number of retries per failed aspect (default: 2)'
+    )
+    parser.add_argument(
+        '--retry-backoff',
+        type=float,
+        default=RETRY_BACKOFF,
+        help=f'Initial retry delay in seconds, doubled on each retry (default: {RETRY_BACKOFF})'
+    )
+    parser.add_argument(
+        '--max-concurrency',
+        type=int,
+        default=MAX_CONCURRENCY,
+        help=f'Maximum number of reviews running at once, 0 for no limit '
+             f'(default: {MAX_CONCURRENCY})'
+    )
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        default=0.0,
+        help='Maximum reviews started per second, 0 for no limit (default: 0)'
+    )
+    parser.add_argument(
+        '--rate-burst',
+        type=int,
+        default=1,
+        help='Reviews that may start at once under --rate-limit (default: 1)'
+    )
+    parser.add_argument(
+        '--priority',
+        default=','.join(DEFAULT_PRIORITY),
+        help=f'Comma-separated aspects in scheduling order (default: {",".join(DEFAULT_PRIORITY)})'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=BACKENDS,
+        default='gemini',
+        help='Reviewer backend; "stub" returns deterministic offline results (default: gemini)'
+    )
+    parser.add_argument(
+        '--stub-latency',
+        type=float,
+        default=0.0,
+        help='Seconds the stub backend waits per review (default: 0)'
+    )
+    parser.add_argument(
+        '--stub-jitter',
+        type=float,
+        default=0.0,
+        help='Random +/- seconds added to --stub-latency (default: 0)'
+    )
+    parser.add_argument(
+        '--stub-fail-rate',
+        type=float,
+        default=0.0,
+        help='Probability that a stub review fails (default: 0)'
+    )
+    parser.add_argument(
+        '--stub-invalid-rate',
+        type=float,
+        default=0.0,
+        help='Probability that a stub review returns truncated JSON (default: 0)'
+    )
+    parser.add_argument(
+        '--stub-seed',
+        type=int,
+        default=0,
+        help='Seed for the stub backend (same seed and diff give the same results)'
+    )
+    parser.add_argument(
+        '--stub-responses',
+        type=Path,
+        help='JSON file mapping each aspect to the review result the stub returns'
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Write findings as NDJSON as each aspect completes, followed by a summary record'
+    )
+    parser.add_argument(
+        '--fail-fast-on',
+        choices=FAIL_FAST_SEVERITIES,
+        help=f'Cancel the remaining reviews as soon as a finding at or above this severity '
+             f'arrives and exit with {EXIT_GATE_FAILED}'
+    )
+    parser.add_argument(
+        '--no-routing',
+        action='store_true',
+        help='Send every file to every aspect instead of routing files by type'
+    )
+    parser.add_argument(
+        '--no-dedup',
+        action='store_true',
+        help='Keep findings that different aspects report for the same file/line'
+    )
+    parser.add_argument(
+        '--metrics-json',
+        type=Path,
+        help='Write per-aspect metrics (latency, bytes, retries, timeouts) as JSON'
+    )
+    parser.add_argument(
+        '--metrics-prom',
+        type=Path,
+        help='Write the same metrics as a Prometheus textfile (node_exporter textfile collector)'
+    )
+    parser.add_argument(
+        '--batch-output-dir',
+        type=Path,
+        default=Path('review-reports'),
+        help='Directory for the per-entry reports with --batch (default: review-reports)'
     )
     parser.add_argument(
         '--verbose',
@@ -288,19 +755,111 @@ def main():
     )
 
     args = parser.parse_args()
+    if args.batch and args.stream:
+        parser.error("--stream cannot be combined with --batch")
 
     if args.verbose:
         logger.setLevel(logging.DEBUG)
 
-    # オーケストレーター実行
-    orchestrator = ReviewOrchestrator(
-        diff_content=args.diff,
-        project_context=args.context,
-        max_retries=args.max_retries
+    backend_options = {}
+    if args.backend == 'stub':
+        backend_options = {
+            'latency': args.stub_latency,
+            'jitter': args.stub_jitter,
+            'fail_rate': args.stub_fail_rate,
+            'invalid_rate': args.stub_invalid_rate,
+            'seed': args.stub_seed,
+            'responses': args.stub_responses,
+        }
+
+    metrics = None
+    if args.metrics_json or args.metrics_prom:
+        metrics = ReviewMetrics(aspect_timeout=ASPECT_TIMEOUT, total_timeout=TOTAL_TIMEOUT)
+
+    # 一括レビューでも全件で共有する（実行枠・流量の上限は全体に対して効く）
+    backend = create_backend(args.backend, **backend_options)
+    scheduler = ReviewScheduler(
+        max_concurrency=args.max_concurrency,
+        rate=args.rate_limit or None,
+        burst=args.rate_burst,
+        priority=[aspect.strip() for aspect in args.priority.split(',') if aspect.strip()]
     )
+    # ガイドラインと組み立てたプロンプトの前半・後半も全件で共有する
+    prompts = PromptBuilder()
+
+    def make_orchestrator(**options) -> ReviewOrchestrator:
+        return ReviewOrchestrator(
+            project_context=args.context,
+            max_retries=args.max_retries,
+            retry_backoff=args.retry_backoff,
+            shard_budget=args.shard_budget if args.shard else None,
+            cache_dir=None if args.no_cache else Path(args.cache_dir),
+            backend=backend,
+            scheduler=scheduler,
+            dedup=not args.no_dedup,
+            route=not args.no_routing,
+            metrics=metrics,
+            fail_fast_on=args.fail_fast_on,
+            **options
+        )
+
+    with contextlib.ExitStack() as stack:
+        temp_dir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix='code_review.')))
+        if args.batch:
+            if args.batch == '-':
+                entries = read_batch_list(sys.stdin)
+            else:
+                entries = read_batch_file(Path(args.batch))
+            if not entries:
+                parser.error("--batch list is empty")
+            # 待ち行列で待つ時間が全体のタイムアウトを消費しないよう、件ごとの全体の
+            # タイムアウトは使わない (観点ごとのタイムアウトは実行中の時間にだけ効く)
+            index = asyncio.run(run_batch(
+                entries,
+                lambda **options: make_orchestrator(
+                    diff_content=None,
+                    executor=AspectExecutor(backend=backend, max_retries=args.max_retries,
+                                            retry_backoff=args.retry_backoff,
+                                            total_timeout=None, scheduler=scheduler,
+                                            metrics=metrics, prompts=prompts),
+                    **options
+                ),
+                args.batch_output_dir, temp_dir
+            ))
+            print(json.dumps(index, indent=2, ensure_ascii=False))
+            success = index['failed'] == 0
+            gate_failed = any(entry.get('gate_passed') is False for entry in index['entries'])
+        else:
+            diff_content, diff_path = args.diff, args.diff_file
+            if diff_content == '-':
+                # stdin はメモリに溜めずに一時ファイルへ書き出す
+                diff_content, diff_path = None, temp_dir / 'diff_content.txt'
+                with open(diff_path, 'wb') as f:
+                    shutil.copyfileobj(sys.stdin.buffer, f)
+
+            # オーケストレーター実行
+            orchestrator = make_orchestrator(
+                diff_content=diff_content,
+                diff_path=diff_path,
+                stream=FindingStream(
+                    deduplicator=None if args.no_dedup else FindingDeduplicator()
+                ) if args.stream else None
+            )
+            success = orchestrator.run()
+            gate_failed = orchestrator.gate_failed
 
-    success = orchestrator.run()
-    sys.exit(0 if success else 1)
+    if metrics is not None:
+        metrics.finish(success)
+        try:
+            if args.metrics_json:
+                metrics.write_json(args.metrics_json)
+            if args.metrics_prom:
+                metrics.write_prometheus(args.metrics_prom)
+        except OSError as e:
+            logger.warning(f"Failed to write metrics: {e}")
+    if not success:
+        sys.exit(1)
+    sys.exit(EXIT_GATE_FAILED if gate_failed else 0)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,206 @@
+"""
+レビューを実行するバックエンド (review-orchestrator.py --backend 用の共有モジュール)
+
+AspectExecutor はプロンプトをバックエンドに渡し、gemini --output-format json と
+同じ形式の出力 (終了コード・stdout・stderr) を受け取る。
+
+- gemini: Gemini CLI をヘッドレスモードで起動し、プロンプトを stdin へ流し込む
+- stub: ネットワークを使わない決定的なスタブ。プロンプト中のハンクごとに指摘を合成するか、
+  --stub-responses の JSON を返す。遅延・失敗・不正な JSON をシード付きで再現できるため、
+  オーケストレーション・マージ・リトライの経路をオフラインで計測・負荷試験できる
+
+Usage:
+    from review_backends import create_backend
+
+    backend = create_backend('stub', latency=0.5, fail_rate=0.1, seed=1)
+    response = await backend.review(prompt)  # ReviewResponse(returncode, stdout, stderr)
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+BACKENDS = ["gemini", "stub"]
+
+SEVERITIES = ["critical", "high", "medium", "low"]
+# スタブが合成する指摘の重要度の分布 (critical は稀)
+STUB_SEVERITY_WEIGHTS = [1, 4, 10, 20]
+
+STUB_HUNK_RE = re.compile(r'^(diff --git a/\S+ b/(\S+)|@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@)',
+                          re.MULTILINE)
+
+
+class ReviewResponse:
+    """バックエンドの出力（gemini CLI のプロセスの結果と同じ形）"""
+
+    def __init__(self, returncode: int, stdout: bytes, stderr: bytes = b''):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+
+
+class ReviewerBackend:
+    """バックエンドの基底クラス"""
+
+    name = ""
+
+    def check(self) -> Optional[str]:
+        """利用できない場合はその理由を返す"""
+        return None
+
+    @property
+    def cache_salt(self) -> str:
+        """指摘キャッシュのキーに含める値（結果が変わる設定を含める）"""
+        return self.name
+
+    async def review(self, prompt) -> ReviewResponse:
+        """prompt (review_prompt.AspectPrompt) をレビューする
+
+        キャンセルされた場合は起動したプロセス等を片付けてから CancelledError を送出する。
+        """
+        raise NotImplementedError
+
+
+class CommandBackend(ReviewerBackend):
+    """プロンプトを stdin で受け取る CLI (gemini 等) を起動する"""
+
+    def __init__(self, command: Sequence[str], name: str = ""):
+        self.command = list(command)
+        self.name = name or Path(self.command[0]).name
+
+    def check(self) -> Optional[str]:
+        if shutil.which(self.command[0]) is None:
+            return f"Reviewer command not found: {self.command[0]}"
+        return None
+
+    async def review(self, prompt) -> ReviewResponse:
+        process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await _communicate(process, prompt)
+        except BaseException:
+            # タイムアウト (wait_for によるキャンセル) や Ctrl-C でもプロセスを残さない
+            await _kill(process)
+            raise
+        return ReviewResponse(process.returncode, stdout, stderr)
+
+
+class StubBackend(ReviewerBackend):
+    """ネットワークを使わない決定的なバックエンド
+
+    同じシード・同じプロンプトには常に同じ結果を返す。失敗・不正な JSON は
+    (観点, プロンプト, 試行回数) ごとに決まるため、リトライで回復する経路も再現できる。
+    """
+
+    name = "stub"
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, fail_rate: float = 0.0,
+                 invalid_rate: float = 0.0, seed: int = 0,
+                 responses: Optional[Path] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.invalid_rate = invalid_rate
+        self.seed = seed
+        # {観点: レビュー結果の JSON} を返す場合のファイル
+        self.responses: Optional[Dict[str, Dict]] = None
+        if responses is not None:
+            self.responses = json.loads(Path(responses).read_text(encoding='utf-8'))
+        self._attempts: Dict[str, int] = {}
+
+    @property
+    def cache_salt(self) -> str:
+        return f"stub:{self.seed}:{bool(self.responses)}"
+
+    async def review(self, prompt) -> ReviewResponse:
+        text = prompt.text()
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        attempt = self._attempts.get(digest, 0) + 1
+        self._attempts[digest] = attempt
+        rng = random.Random(f"{self.seed}:{digest}:{attempt}")
+
+        await asyncio.sleep(max(self.latency + rng.uniform(-self.jitter, self.jitter), 0))
+
+        if rng.random() < self.fail_rate:
+            return ReviewResponse(1, b'', f"stub: simulated failure (attempt {attempt})\n".encode())
+
+        if self.responses is not None:
+            review = self.responses.get(prompt.aspect, {'aspect': prompt.aspect, 'findings': []})
+        else:
+            review = {'aspect': prompt.aspect, 'findings': self.synthesize(prompt.aspect, text)}
+        body = json.dumps(review, ensure_ascii=False, indent=2)
+        if rng.random() < self.invalid_rate:
+            # 途中で切れた応答
+            body = body[:len(body) // 2]
+        output = {'response': f"```json\n{body}\n```", 'stats': {'backend': self.name}}
+        return ReviewResponse(0, json.dumps(output, ensure_ascii=False).encode('utf-8'))
+
+    def synthesize(self, aspect: str, text: str) -> List[Dict]:
+        """プロンプト中のハンクごとに、ハンクの内容から決まる指摘を0〜1件作る"""
+        findings = []
+        path = None
+        for match in STUB_HUNK_RE.finditer(text):
+            if match.group(2) is not None:
+                path = match.group(2)
+                continue
+            new_start = int(match.group(3))
+            rng = random.Random(f"{self.seed}:{aspect}:{path}:{match.group(0)}")
+            if rng.random() < 0.5:
+                continue
+            severity = rng.choices(SEVERITIES, weights=STUB_SEVERITY_WEIGHTS)[0]
+            findings.append({
+                'severity': severity,
+                'category': f"stub-{aspect}",
+                'file': path or 'unknown',
+                'line': new_start + rng.randrange(max(int(match.group(4) or 1), 1)),
+                'issue': f"Stub {aspect} finding for {path}",
+                'suggestion': "No action needed (generated by the stub backend)",
+            })
+        return findings
+
+
+def create_backend(name: str, **options) -> ReviewerBackend:
+    """--backend の値に対応するバックエンドを返す"""
+    if name == "gemini":
+        return CommandBackend(["gemini", "--output-format", "json"], name="gemini")
+    if name == "stub":
+        return StubBackend(**options)
+    raise ValueError(f"Unknown backend: {name}")
+
+
+async def _communicate(process: asyncio.subprocess.Process, prompt):
+    """プロンプトを stdin へ流し込みながら stdout / stderr を読む"""
+
+    async def feed():
+        try:
+            for chunk in prompt.chunks():
+                process.stdin.write(chunk)
+                await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            # 入力を読み切らずに終了したプロセス (終了コードで判定する)
+            pass
+
+    _, stdout, stderr = await asyncio.gather(
+        feed(), process.stdout.read(), process.stderr.read()
+    )
+    await process.wait()
+    return stdout, stderr
+
+
+async def _kill(process: asyncio.subprocess.Process):
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+    await process.wait()
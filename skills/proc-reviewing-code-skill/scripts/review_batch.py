@@ -0,0 +1,80 @@
+"""
+複数の差分・コミット範囲の一括レビュー (review-orchestrator.py --batch 用の共有モジュール)
+
+CI で多数の PR・コミット範囲をレビューする際、範囲ごとに review-orchestrator.py を
+起動すると、範囲ごとに4つの gemini プロセスが起動して全体の流量を制御できない。
+--batch ではリストの全範囲を1つのプロセスで扱い、(範囲 × 観点) のレビューを
+共有の ReviewScheduler (同時実行数・流量の上限) に載せ、範囲ごとにレポートを書き出す。
+
+リストの書式 (1行1件、空行と # で始まる行は無視):
+    review.diff                 差分ファイル
+    main..feature               git diff に渡すコミット範囲
+    pr-123=origin/main...pr/123 名前=差分ファイルまたはコミット範囲 (名前はレポートのファイル名)
+
+Usage:
+    entries = read_batch_file(Path('ranges.txt'))
+    for entry in entries:
+        diff_path = entry.prepare(temp_dir)   # コミット範囲は git diff の結果をファイルへ
+"""
+
+import re
+import subprocess
+from pathlib import Path
+from typing import List, Optional, TextIO
+
+NAME_UNSAFE_RE = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+class BatchEntry:
+    """一括レビューの1件（差分ファイルまたはコミット範囲）"""
+
+    def __init__(self, source: str, name: Optional[str] = None, index: int = 0):
+        self.source = source
+        self.index = index
+        self.name = name or NAME_UNSAFE_RE.sub('_', source).strip('_.') or f"entry-{index + 1}"
+
+    @property
+    def is_file(self) -> bool:
+        return Path(self.source).is_file()
+
+    def prepare(self, temp_dir: Path) -> Path:
+        """レビューする差分ファイルのパス（コミット範囲は git diff の出力を直接ファイルへ書く）"""
+        if self.is_file:
+            return Path(self.source)
+        path = Path(temp_dir) / f"{self.index:04d}-{self.name}.diff"
+        with open(path, 'wb') as f:
+            result = subprocess.run(['git', 'diff', self.source], stdout=f,
+                                    stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            message = result.stderr.decode('utf-8', errors='replace').strip()
+            raise ValueError(f"git diff {self.source} failed: {message}")
+        return path
+
+    def __repr__(self):
+        return f"BatchEntry({self.name!r}, {self.source!r})"
+
+
+def read_batch_list(lines: TextIO) -> List[BatchEntry]:
+    """リストを読み、名前が重複しないようにした BatchEntry の並びを返す"""
+    entries: List[BatchEntry] = []
+    names = set()
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        name = None
+        if '=' in line:
+            name, _, line = line.partition('=')
+            name = NAME_UNSAFE_RE.sub('_', name.strip()) or None
+            line = line.strip()
+        entry = BatchEntry(line, name, len(entries))
+        if entry.name in names:
+            entry.name = f"{entry.name}-{entry.index + 1}"
+        names.add(entry.name)
+        entries.append(entry)
+    return entries
+
+
+def read_batch_file(path: Path) -> List[BatchEntry]:
+    with open(path, encoding='utf-8') as f:
+        return read_batch_list(f)
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+レビュー応答からの寛容な JSON 抽出 (aspect_executor.py / parallel-review.sh 用の共有モジュール)
+
+レビューの応答は gemini --output-format json の外側の JSON の 'response' に入り、
+```json のフェンス・前後の説明文・末尾のカンマ・出力上限による途中切れ等で
+そのままでは解析できないことがある。従来は jq と sed を何度も通し、解析できない応答は
+観点ごと捨てていた。extract_review() はプロセス内で次の順に修復を試みる。
+
+1. 応答全体、```json のフェンスの中身 (閉じていなくてもよい)、応答中の { の位置から
+   JSON オブジェクトを1つ読む (前後の説明文は無視する: 'surrounding_text')
+2. 読めない場合は JsonScanner で1回だけ走査し、末尾のカンマを除き ('trailing_comma')、
+   途中で切れていれば最後に完結した値の直後で切って括弧を閉じる ('truncated')
+
+途中で切れた応答は読めた指摘を残す (最後の指摘は issue まで読めていれば残し、
+suggestion 等の後続のキーは欠ける)。外側の JSON がない応答 (スタブや他の CLI) は
+応答全体をレビュー結果の候補とみなす。
+
+Usage:
+    extraction = extract_review(stdout.decode('utf-8', errors='replace'))
+    if extraction.result is None:
+        ...                     # JSON が見つからない
+    elif extraction.truncated:
+        ...                     # 途中で切れていた (result['findings'] は読めた分のみ)
+
+    # シェルから: 応答を stdin で渡すとレビュー結果の JSON を stdout へ書く
+    # (取り出せない場合は応答の本文 (なければ空) を書いて終了コード 1)
+    python3 review_json.py < review_raw.json > review.json
+"""
+
+import json
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# 応答中の ```json (または ```) のフェンスの開始行
+FENCE_RE = re.compile(r'^[ \t]*```(?:json|JSON)?[ \t]*\n', re.MULTILINE)
+FENCE_END_RE = re.compile(r'\n[ \t]*```')
+
+MAX_CANDIDATES = 32  # 応答中で JSON の開始とみなして試す { の数の上限
+
+CLOSERS = {'{': '}', '[': ']'}
+
+_decoder = json.JSONDecoder()
+
+
+class JsonScanner:
+    """JSON の構造を1文字ずつ追い、途中で切れた・末尾のカンマがある JSON を修復する
+
+    feed() は応答を分けて渡してもよい (状態はチャンクをまたいで保つ)。最初の { または [ から
+    走査し、対応する括弧で閉じた時点で完結とみなす (以降の入力は無視する)。
+    """
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._offset = 0             # 次に渡されるチャンクの先頭の位置
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._stack: List[str] = []
+        # 切り詰めてよい位置とその時点で開いている括弧
+        self._safe: Tuple[int, Tuple[str, ...]] = (0, ())
+        self._pending_comma: Optional[int] = None
+        self._drops: List[int] = []  # 取り除く末尾のカンマの位置
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        self.mismatched = False
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None
+
+    def feed(self, chunk: str):
+        if self.end is not None or self.mismatched:
+            return
+        base = self._offset
+        self._chunks.append(chunk)
+        self._offset += len(chunk)
+        stack = self._stack
+        for i, char in enumerate(chunk):
+            position = base + i
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if not self._started:
+                if char not in CLOSERS:
+                    continue
+                self._started = True
+                self.start = position
+            if char in ' \t\r\n':
+                continue
+            if char in CLOSERS:
+                self._pending_comma = None
+                in_array = bool(stack) and stack[-1] == '['
+                stack.append(char)
+                # 配列の要素は途中で切れたら空にせず捨てる (空の指摘 {} を残さない)
+                if not in_array:
+                    self._safe = (position + 1, tuple(stack))
+            elif char in '}]':
+                if not stack or CLOSERS[stack[-1]] != char:
+                    self.mismatched = True
+                    return
+                if self._pending_comma is not None:
+                    self._drops.append(self._pending_comma)
+                    self._pending_comma = None
+                stack.pop()
+                self._safe = (position + 1, tuple(stack))
+                if not stack:
+                    self.end = position + 1
+                    return
+            elif char == ',':
+                self._safe = (position, tuple(stack))
+                self._pending_comma = position
+            else:
+                self._pending_comma = None
+                if char == '"':
+                    self._in_string = True
+
+    def close(self) -> Tuple[Optional[str], List[str]]:
+        """修復した JSON の文字列と修復の種類 (trailing_comma / truncated) を返す"""
+        if self.start is None or self.mismatched:
+            return None, []
+        text = ''.join(self._chunks)
+        repairs = []
+        if self.end is not None:
+            cut, open_brackets = self.end, ()
+        else:
+            cut, open_brackets = self._safe
+            repairs.append('truncated')
+        drops = [position for position in self._drops if position < cut]
+        if drops:
+            repairs.insert(0, 'trailing_comma')
+        pieces = []
+        previous = self.start
+        for position in drops:
+            pieces.append(text[previous:position])
+            previous = position + 1
+        pieces.append(text[previous:cut])
+        pieces.extend(CLOSERS[bracket] for bracket in reversed(open_brackets))
+        return ''.join(pieces), repairs
+
+
+class JsonExtraction:
+    """extract_review() の結果"""
+
+    def __init__(self, result: Optional[Dict] = None, repairs: Optional[List[str]] = None):
+        self.result = result
+        # 行った修復の種類 (surrounding_text / trailing_comma / truncated)
+        self.repairs = repairs or []
+
+    @property
+    def repaired(self) -> bool:
+        return bool(self.repairs)
+
+    @property
+    def truncated(self) -> bool:
+        return 'truncated' in self.repairs
+
+    def __repr__(self):
+        return f"JsonExtraction(repairs={self.repairs!r})"
+
+
+def _candidate_starts(text: str) -> List[Tuple[int, Optional[int]]]:
+    """JSON の開始位置の候補と、フェンスの中ならフェンスの中身の終わりの位置
+
+    フェンスの直後の { を優先し、次に応答中の { を先頭から試す。
+    """
+    starts: List[Tuple[int, Optional[int]]] = []
+    for match in FENCE_RE.finditer(text):
+        brace = text.find('{', match.end())
+        if brace == -1 or text[match.end():brace].strip():
+            continue
+        fence_end = FENCE_END_RE.search(text, brace)
+        # 閉じていないフェンスは応答の終わりまでを中身とみなす
+        starts.append((brace, fence_end.start() if fence_end else len(text)))
+    seen = {start for start, _ in starts}
+    brace = text.find('{')
+    while brace != -1 and len(starts) < MAX_CANDIDATES:
+        if brace not in seen:
+            starts.append((brace, None))
+        brace = text.find('{', brace + 1)
+    return starts
+
+
+def _is_review(value) -> bool:
+    return isinstance(value, dict) and ('findings' in value or 'aspect' in value)
+
+
+def parse_json_object(text: str) -> Tuple[Optional[Dict], List[str]]:
+    """文字列中の JSON オブジェクトを1つ読み、(オブジェクト, 修復の種類) を返す"""
+    stripped = text.strip()
+    try:
+        value = json.loads(stripped)
+    except ValueError:
+        pass
+    else:
+        return (value, []) if isinstance(value, dict) else (None, [])
+
+    starts = _candidate_starts(text)
+    decoded = []
+    for start, fence_end in starts:
+        try:
+            value, end = _decoder.raw_decode(text, start)
+        except ValueError:
+            continue
+        if _is_review(value):
+            # フェンスの中身がちょうどオブジェクト1つなら修復ではない
+            fenced = fence_end is not None and not text[end:fence_end].strip()
+            return value, [] if fenced else ['surrounding_text']
+        if isinstance(value, dict):
+            decoded.append(value)
+
+    # レビュー結果として読める候補がない: 末尾のカンマ・途中切れを修復する
+    # (途中で切れた結果の中の完結した指摘だけを先に読まないよう、修復を優先する)
+    fallback = None
+    for start, fence_end in starts:
+        scanner = JsonScanner()
+        scanner.feed(text[start:])
+        repaired, repairs = scanner.close()
+        if repaired is None:
+            continue
+        try:
+            value = json.loads(repaired)
+        except ValueError:
+            continue
+        if not isinstance(value, dict):
+            continue
+        before = '' if fence_end is not None else text[:start]
+        after = text[start + scanner.end:fence_end] if scanner.complete else ''
+        if before.strip() or after.strip():
+            repairs.insert(0, 'surrounding_text')
+        if _is_review(value):
+            return value, repairs
+        if fallback is None:
+            fallback = (value, repairs)
+    if decoded:
+        return decoded[0], ['surrounding_text']
+    if fallback is not None:
+        return fallback
+    return None, []
+
+
+def _unwrap(raw_output: str) -> Tuple[Optional[str], Optional[Dict]]:
+    """(解析する応答の本文, 外側の JSON がそのままレビュー結果ならそれ) を返す
+
+    外側の JSON に 'response' があれば、空でない文字列の場合だけ本文とする (空・エラーの
+    オブジェクト等は (None, None): 不正な JSON としてリトライさせる)。'response' がない
+    JSON はレビュー結果の形 ('findings' または 'aspect' を持つ) の場合だけ結果とする。
+    """
+    try:
+        data = json.loads(raw_output)
+    except ValueError:
+        return raw_output, None
+    if not isinstance(data, dict):
+        return raw_output, None
+    if 'response' in data:
+        response = data['response']
+        if isinstance(response, str) and response.strip():
+            return response, None
+        return None, None
+    return None, data if _is_review(data) else None
+
+
+def extract_review(raw_output: str) -> JsonExtraction:
+    """gemini --output-format json の出力からレビュー結果の JSON を取り出す
+
+    外側の JSON に 'response' があればその中から、なければレビュー結果の形の外側の JSON
+    (JSON でない出力は出力全体) を結果とみなす。'response' が空・文字列でない場合や、
+    途中で切れていて指摘が1件も残らない場合は見つからなかったものとする
+    (リトライの対象にする)。
+    """
+    text, data = _unwrap(raw_output)
+    if text is None:
+        return JsonExtraction(data)
+
+    result, repairs = parse_json_object(text)
+    if result is None:
+        return JsonExtraction()
+    if 'truncated' in repairs:
+        findings = result.get('findings')
+        if not isinstance(findings, list):
+            return JsonExtraction()
+        # 途中で切れた最後の指摘は issue まで読めていなければ捨てる
+        if findings and isinstance(findings[-1], dict) and 'issue' not in findings[-1]:
+            findings.pop()
+        if not findings:
+            return JsonExtraction()
+    return JsonExtraction(result, repairs)
+
+
+def main() -> int:
+    raw_output = sys.stdin.read()
+    extraction = extract_review(raw_output)
+    if extraction.result is None:
+        # 取り出せない場合は応答の本文をそのまま書く (後段の検証で不正な JSON として扱う)。
+        # 本文がない場合 (外側の JSON の 'response' が空・エラー等) は何も書かない
+        text, _ = _unwrap(raw_output)
+        sys.stdout.write(text or '')
+        print("Error: No JSON object found in the review output", file=sys.stderr)
+        return 1
+    if extraction.repaired:
+        print(f"Warning: Repaired review JSON ({', '.join(extraction.repairs)})", file=sys.stderr)
+    json.dump(extraction.result, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+レビュー実行のメトリクス (review-orchestrator.py --metrics-json / --metrics-prom 用の共有モジュール)
+
+観点ごとの所要時間の分布や、観点のタイムアウト (120 秒)・全体のタイムアウト (600 秒) に
+どこまで近づいたかをログの行からは追えないため、AspectExecutor の試行1回ごとに
+記録して JSON と Prometheus の textfile (node_exporter の textfile collector 形式) に書き出す。
+
+観点ごとの値:
+- wall_seconds: 最初の試行の開始から最後の試行の終了まで (シャード・リトライを含む)
+- queued_seconds: 実行枠 (review_scheduler) を待った時間の合計
+- max_attempt_seconds: 最も長かった試行 (観点のタイムアウトとの比較用)
+- prompt_bytes / response_bytes: 全試行の合計
+- attempts / retries / timeouts / failures / invalid_json / json_repairs / cancelled
+
+Usage:
+    metrics = ReviewMetrics(aspect_timeout=120, total_timeout=600)
+    executor = AspectExecutor(metrics=metrics)
+    ...
+    metrics.write_json(Path('review-metrics.json'))
+    metrics.write_prometheus(Path('/var/lib/node_exporter/textfile/review.prom'))
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 試行1回の所要時間のヒストグラムの境界（秒）
+DURATION_BUCKETS = [1, 5, 10, 30, 60, 90, 120, 300, 600]
+
+METRIC_PREFIX = "code_review"
+
+# 観点ごとのカウンター（JSON のキー → Prometheus のメトリクス名と説明）
+COUNTERS = {
+    'attempts': ('attempts_total', 'Review attempts including retries'),
+    'retries': ('retries_total', 'Retried attempts'),
+    'timeouts': ('timeouts_total', 'Attempts that hit the per-aspect timeout'),
+    'failures': ('failures_total', 'Attempts that exited with an error'),
+    'invalid_json': ('invalid_json_total', 'Attempts whose output could not be parsed as JSON'),
+    'json_repairs': ('json_repairs_total', 'Attempts whose JSON output had to be repaired'),
+    'cancelled': ('cancelled_total', 'Reviews cancelled by the total timeout'),
+}
+GAUGES = {
+    'wall_seconds': ('wall_seconds', 'Wall time from the first attempt start to the last end'),
+    'queued_seconds': ('queued_seconds', 'Time spent waiting for a scheduler slot'),
+    'max_attempt_seconds': ('max_attempt_seconds', 'Longest single attempt'),
+    'prompt_bytes': ('prompt_bytes', 'Prompt bytes sent to the reviewer'),
+    'response_bytes': ('response_bytes', 'Response bytes received from the reviewer'),
+}
+
+
+class AspectMetrics:
+    """1観点分の集計"""
+
+    def __init__(self):
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.values: Dict[str, float] = {key: 0 for key in list(COUNTERS) + list(GAUGES)}
+        self.durations: List[float] = []
+
+    def to_dict(self) -> Dict:
+        data = dict(self.values)
+        if self.started is not None and self.finished is not None:
+            data['wall_seconds'] = self.finished - self.started
+        for key in ('wall_seconds', 'queued_seconds', 'max_attempt_seconds'):
+            data[key] = round(data[key], 3)
+        return data
+
+
+class ReviewMetrics:
+    """1回のレビュー実行のメトリクス"""
+
+    def __init__(self, aspect_timeout: Optional[float] = None,
+                 total_timeout: Optional[float] = None):
+        self.aspect_timeout = aspect_timeout
+        self.total_timeout = total_timeout
+        self.aspects: Dict[str, AspectMetrics] = {}
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.success: Optional[bool] = None
+
+    def aspect(self, aspect: str) -> AspectMetrics:
+        if aspect not in self.aspects:
+            self.aspects[aspect] = AspectMetrics()
+        return self.aspects[aspect]
+
+    def record_attempt(self, aspect: str, started: float, elapsed: float, queued: float,
+                       prompt_bytes: int, response_bytes: int, status: str,
+                       retry: bool = False, json_repaired: bool = False):
+        """試行1回を記録する（status は ok / failed / timeout / invalid_json）"""
+        metrics = self.aspect(aspect)
+        if metrics.started is None or started < metrics.started:
+            metrics.started = started
+        finished = started + elapsed
+        if metrics.finished is None or finished > metrics.finished:
+            metrics.finished = finished
+        values = metrics.values
+        values['attempts'] += 1
+        values['retries'] += int(retry)
+        values['timeouts'] += int(status == 'timeout')
+        values['failures'] += int(status == 'failed')
+        values['invalid_json'] += int(status == 'invalid_json')
+        values['json_repairs'] += int(json_repaired)
+        values['queued_seconds'] += queued
+        values['max_attempt_seconds'] = max(values['max_attempt_seconds'], elapsed)
+        values['prompt_bytes'] += prompt_bytes
+        values['response_bytes'] += response_bytes
+        metrics.durations.append(elapsed)
+
+    def record_cancelled(self, aspect: str):
+        self.aspect(aspect).values['cancelled'] += 1
+
+    def finish(self, success: bool):
+        self.finished = time.monotonic()
+        self.success = success
+
+    def to_dict(self) -> Dict:
+        finished = self.finished if self.finished is not None else time.monotonic()
+        return {
+            'run': {
+                'wall_seconds': round(finished - self.started, 3),
+                'success': self.success,
+                'aspect_timeout_seconds': self.aspect_timeout,
+                'total_timeout_seconds': self.total_timeout,
+            },
+            'aspects': {aspect: metrics.to_dict()
+                        for aspect, metrics in sorted(self.aspects.items())},
+        }
+
+    def to_prometheus(self) -> str:
+        data = self.to_dict()
+        lines: List[str] = []
+
+        def metric(name: str, help_text: str, metric_type: str, samples):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {metric_type}")
+            for labels, value in samples:
+                lines.append(f"{METRIC_PREFIX}_{name}{_labels(labels)} {_number(value)}")
+
+        run = data['run']
+        metric('run_wall_seconds', 'Wall time of the whole review', 'gauge',
+               [({}, run['wall_seconds'])])
+        metric('run_success', 'Whether the review succeeded (1) or failed (0)', 'gauge',
+               [({}, 1 if run['success'] else 0)])
+        if run['aspect_timeout_seconds'] is not None:
+            metric('aspect_timeout_seconds', 'Configured per-aspect timeout', 'gauge',
+                   [({}, run['aspect_timeout_seconds'])])
+        if run['total_timeout_seconds'] is not None:
+            metric('total_timeout_seconds', 'Configured total timeout', 'gauge',
+                   [({}, run['total_timeout_seconds'])])
+
+        aspects = data['aspects']
+        for key, (name, help_text) in list(GAUGES.items()) + list(COUNTERS.items()):
+            metric_type = 'counter' if key in COUNTERS else 'gauge'
+            metric(f"aspect_{name}", help_text, metric_type,
+                   [({'aspect': aspect}, values[key]) for aspect, values in aspects.items()])
+
+        name = f"{METRIC_PREFIX}_attempt_duration_seconds"
+        lines.append(f"# HELP {name} Duration of single review attempts")
+        lines.append(f"# TYPE {name} histogram")
+        for aspect, metrics in sorted(self.aspects.items()):
+            for bound in DURATION_BUCKETS:
+                count = sum(1 for duration in metrics.durations if duration <= bound)
+                lines.append(f"{name}_bucket{_labels({'aspect': aspect, 'le': bound})} {count}")
+            lines.append(f"{name}_bucket{_labels({'aspect': aspect, 'le': '+Inf'})} "
+                         f"{len(metrics.durations)}")
+            lines.append(f"{name}_sum{_labels({'aspect': aspect})} "
+                         f"{_number(sum(metrics.durations))}")
+            lines.append(f"{name}_count{_labels({'aspect': aspect})} {len(metrics.durations)}")
+        return '\n'.join(lines) + '\n'
+
+    def write_json(self, path: Path):
+        _write_atomic(Path(path), json.dumps(self.to_dict(), indent=2, ensure_ascii=False) + '\n')
+
+    def write_prometheus(self, path: Path):
+        _write_atomic(Path(path), self.to_prometheus())
+
+
+def _labels(labels: Dict) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    return '{' + pairs + '}'
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.6g}" if value != int(value) else str(int(value))
+    return str(value)
+
+
+def _write_atomic(path: Path, text: str):
+    """textfile collector が書きかけのファイルを読まないよう一時ファイル + rename で書く"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding='utf-8')
+    os.replace(tmp_path, path)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+観点別レビュープロンプトの組み立て (aspect_executor.py / parallel-review.sh 用の共有モジュール)
+
+プロンプトは 前半 (プロジェクトの文脈・観点) → 差分 → 後半 (ガイドライン・出力形式) の順で、
+差分以外は観点 (とシャードの番号) だけで決まる。PromptBuilder はガイドライン
+(references/<観点>-review.md) を観点ごとに1度だけ読み、組み立てた前半・後半のバイト列も
+キャッシュする。差分は組み込まず、AspectPrompt がファイル (またはその範囲) を読んで
+流し込むため、差分は1度ファイルに書き出すだけで全観点・全シャードが共有する。
+
+シェル (parallel-review.sh) からは、観点ごとの前半・後半をファイルに書き出して使う
+(シェル変数に差分・ガイドラインを展開しない):
+    python3 review_prompt.py --context "..." --output-dir "$TEMP_DIR" frontend backend ...
+    cat "$TEMP_DIR/prompt_frontend.head" review.diff "$TEMP_DIR/prompt_frontend.tail" | gemini
+
+Usage:
+    from review_prompt import PromptBuilder
+
+    builder = PromptBuilder()
+    prompt = builder.build('security', Path('review.diff'), project_context)
+    for chunk in prompt.chunks():   # 前半 → 差分 → 後半
+        ...
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from diff_sharding import Shard
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+REFERENCES_DIR = SCRIPT_DIR.parent / "references"
+
+CHUNK_SIZE = 64 * 1024  # 差分ファイルを stdin へ流し込む単位（バイト）
+
+PROMPT_TEMPLATE = """\
+# Project Context
+{context}
+
+# Review Focus: {aspect}
+You are reviewing code changes from a {aspect} perspective.
+Your task is to identify issues, risks, and improvement opportunities.
+
+# Code Changes{part}
+{diff}
+
+# Review Guidelines
+{guidelines}
+
+# Output Format
+Provide findings in JSON format with this exact structure:
+{{
+  "aspect": "{aspect}",
+  "findings": [
+    {{
+      "severity": "critical|high|medium|low",
+      "category": "string",
+      "file": "relative/path/to/file",
+      "line": 0,
+      "issue": "description",
+      "suggestion": "improvement"
+    }}
+  ]
+}}
+
+IMPORTANT: Output ONLY valid JSON, no additional text or explanation."""
+
+
+class AspectPrompt:
+    """観点別のレビュープロンプト（差分はファイルのまま持ち、文字列に展開しない）"""
+
+    def __init__(self, aspect: str, diff_path: Path, head: bytes, tail: bytes,
+                 ranges: Optional[List[Tuple[int, int]]] = None):
+        self.aspect = aspect
+        self.diff_path = Path(diff_path)
+        self.head = head
+        self.tail = tail
+        # 差分ファイル上のバイト範囲 (None は全体)
+        self.ranges = ranges
+
+    @property
+    def size(self) -> int:
+        if self.ranges is None:
+            diff_size = self.diff_path.stat().st_size
+        else:
+            diff_size = sum(end - start for start, end in self.ranges)
+        return len(self.head) + diff_size + len(self.tail)
+
+    def chunks(self) -> Iterator[bytes]:
+        """プロンプトを先頭から CHUNK_SIZE 程度ずつ返す"""
+        yield self.head
+        with open(self.diff_path, 'rb') as f:
+            for start, end in self.ranges or [(0, None)]:
+                f.seek(start)
+                remaining = end - start if end is not None else None
+                while remaining is None or remaining > 0:
+                    chunk = f.read(CHUNK_SIZE if remaining is None
+                                   else min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    if remaining is not None:
+                        remaining -= len(chunk)
+                    yield chunk
+        yield self.tail
+
+    def text(self) -> str:
+        """プロンプト全体（デバッグ用。通常は chunks() で流し込む）"""
+        return b''.join(self.chunks()).decode('utf-8', errors='replace')
+
+
+class PromptBuilder:
+    """ガイドラインと組み立てたプロンプトの前半・後半をキャッシュしてプロンプトを作る"""
+
+    def __init__(self, references_dir: Path = REFERENCES_DIR):
+        self.references_dir = Path(references_dir)
+        self._guidelines: Dict[str, str] = {}
+        # (観点, プロジェクトの文脈, シャードの表記) → (前半, 後半)
+        self._parts: Dict[Tuple[str, str, str], Tuple[bytes, bytes]] = {}
+
+    def guidelines_path(self, aspect: str) -> Path:
+        return self.references_dir / f"{aspect}-review.md"
+
+    def guidelines(self, aspect: str) -> str:
+        """観点のガイドライン（最初の1回だけファイルを読む）"""
+        if aspect not in self._guidelines:
+            self._guidelines[aspect] = self.guidelines_path(aspect).read_text(encoding='utf-8')
+        return self._guidelines[aspect]
+
+    def parts(self, aspect: str, project_context: str, part: str = "") -> Tuple[bytes, bytes]:
+        """差分の前に置く前半と後に置く後半"""
+        key = (aspect, project_context, part)
+        if key not in self._parts:
+            head, tail = PROMPT_TEMPLATE.split('{diff}')
+            values = {'context': project_context, 'aspect': aspect, 'part': part,
+                      'guidelines': self.guidelines(aspect)}
+            self._parts[key] = (head.format(**values).encode('utf-8'),
+                                tail.format(**values).encode('utf-8'))
+        return self._parts[key]
+
+    def build(self, aspect: str, diff_path: Path, project_context: str,
+              shard: Optional[Shard] = None, shards: int = 1) -> AspectPrompt:
+        part = f" (part {shard.index + 1}/{shards}; other parts are reviewed separately)" \
+            if shard is not None and shards > 1 else ""
+        head, tail = self.parts(aspect, project_context, part)
+        return AspectPrompt(aspect, diff_path, head, tail,
+                            shard.ranges if shard is not None else None)
+
+    def write_parts(self, aspect: str, project_context: str,
+                    output_dir: Path) -> Tuple[Path, Path]:
+        """前半・後半を output_dir/prompt_<観点>.head / .tail に書き出す（シェル用）"""
+        head, tail = self.parts(aspect, project_context)
+        head_path = Path(output_dir) / f"prompt_{aspect}.head"
+        tail_path = Path(output_dir) / f"prompt_{aspect}.tail"
+        head_path.write_bytes(head)
+        tail_path.write_bytes(tail)
+        return head_path, tail_path
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Write the per-aspect prompt parts placed before and after the diff"
+    )
+    parser.add_argument('aspects', nargs='+', help='Review aspects')
+    parser.add_argument('--context', required=True, help='Project context')
+    parser.add_argument('--output-dir', required=True, type=Path,
+                        help='Directory to write prompt_<aspect>.head / .tail into')
+    parser.add_argument('--references-dir', type=Path, default=REFERENCES_DIR,
+                        help='Directory containing <aspect>-review.md guidelines')
+    args = parser.parse_args(argv)
+
+    builder = PromptBuilder(args.references_dir)
+    for aspect in args.aspects:
+        try:
+            builder.write_parts(aspect, args.context, args.output_dir)
+        except OSError as e:
+            print(f"Error: Failed to build {aspect} prompt: {e}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
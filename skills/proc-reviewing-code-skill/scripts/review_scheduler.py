@@ -0,0 +1,124 @@
+"""
+レビュー実行のスケジューラー (aspect_executor.py 用の共有モジュール)
+
+観点 × シャードの数だけレビューを同時に起動すると、CI で複数のレビューが重なった際に
+LLM CLI のクォータを使い切り、タイムアウトが連鎖する。ReviewScheduler は
+レビュー1回ごとに実行枠を割り当てる。
+
+- 同時実行数の上限: 枠が空くまで待たせる (待ち時間は観点のタイムアウトに含めない)
+- トークンバケットによる流量制限: 1秒あたりの起動数を rate、瞬間的な起動数を burst に抑える
+- 観点ごとの優先度: 枠が空いたら優先度の高い観点 (既定は security) から順に割り当てる。
+  同じ優先度の中では待ち始めた順
+
+Usage:
+    from review_scheduler import ReviewScheduler
+
+    scheduler = ReviewScheduler(max_concurrency=4, rate=1.0, burst=2)
+    async with scheduler.slot('security'):
+        response = await backend.review(prompt)
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import time
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+MAX_CONCURRENCY = 4  # 既定の同時実行数（従来の観点ごとに1プロセスと同じ）
+# 既定の優先度（先頭ほど先に実行する）
+DEFAULT_PRIORITY = ["security", "backend", "infrastructure", "frontend"]
+
+
+class TokenBucket:
+    """rate 個/秒で補充され、最大 burst 個まで貯まるトークンバケット"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive: {rate}")
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        # イベントループ内で作る (Python 3.9 以前の Lock はループに結び付くため)
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """トークンを1つ取り出す（なければ補充されるまで待つ、待つ順は先着順）"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class ReviewScheduler:
+    """同時実行数・流量・観点の優先度に従ってレビューの実行枠を割り当てる"""
+
+    def __init__(self, max_concurrency: Optional[int] = MAX_CONCURRENCY,
+                 rate: Optional[float] = None, burst: int = 1,
+                 priority: Sequence[str] = DEFAULT_PRIORITY):
+        # None または 0 以下は上限なし
+        self.max_concurrency = max_concurrency if max_concurrency and max_concurrency > 0 \
+            else None
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.priorities: Dict[str, int] = {aspect: index for index, aspect in enumerate(priority)}
+        self.active = 0
+        self._waiters: List = []  # (優先度, 到着順, Future) のヒープ
+        self._sequence = itertools.count()
+
+    def priority(self, aspect: str) -> int:
+        """小さいほど優先（優先度の指定がない観点は最後）"""
+        return self.priorities.get(aspect, len(self.priorities))
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def acquire(self, aspect: str):
+        """実行枠を1つ確保する（キャンセルされた場合は確保しない）"""
+        if self.max_concurrency is None or \
+                (self.active < self.max_concurrency and not self.waiting):
+            self.active += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters,
+                           (self.priority(aspect), next(self._sequence), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # 枠を譲られた直後にキャンセルされた場合は次の待ちへ渡す
+                    self.release()
+                raise
+        if self.bucket is not None:
+            try:
+                await self.bucket.acquire()
+            except BaseException:
+                self.release()
+                raise
+
+    def release(self):
+        """実行枠を返す（待っている中で最も優先度の高いものへ直接渡す）"""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    @contextlib.asynccontextmanager
+    async def slot(self, aspect: str) -> AsyncIterator[None]:
+        await self.acquire(aspect)
+        try:
+            yield
+        finally:
+            self.release()
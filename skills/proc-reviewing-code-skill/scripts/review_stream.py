@@ -0,0 +1,116 @@
+"""
+レビュー結果のストリーミング出力 (review-orchestrator.py --stream 用の共有モジュール)
+
+通常の出力は全観点の完了後に1つの JSON を書き出す。FindingStream は観点が完了する
+たびに、その観点の指摘を1件1行の JSON (NDJSON) として書き出して flush するため、
+PR コメント用のボット等は最も遅い観点を待たずに重大な指摘から処理を始められる。
+
+レコードの種類 (type):
+- finding: 指摘1件 ({'type', 'aspect', 'finding', 'id'})。観点内では重要度の高い順。
+  'id' は出力の通し番号。deduplicator (finding_dedup.FindingDeduplicator) を設定した
+  場合、先に出力した指摘と重複するものは出力せず、観点の完了レコードの 'duplicates' に
+  数える。ただし重複の方が重要度が高い場合は、まとめた代表の指摘を 'replaces'
+  (置き換える指摘の 'id') 付きで出力する (後の観点の critical が落ちないように)
+- aspect: 観点1件の完了 ({'type', 'aspect', 'status' (ok|partial|failed|cancelled),
+  'findings', ...})
+- summary: 最後に1件だけ出力する集計 ({'type', 'success', 'summary', 'review_details'}、
+  --fail-fast-on 指定時は 'gate' も)
+
+Usage:
+    stream = FindingStream()
+    stream.aspect_result(outcome)   # AspectExecutor の on_result から
+    stream.finish(report)           # 失敗時は stream.finish(None, error='...')
+"""
+
+import json
+import sys
+from typing import Dict, List, Optional, TextIO
+
+# 重要度の並び順（未知の重要度は最後）
+SEVERITY_ORDER = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3, 'unknown': 4}
+
+
+def severity_rank(finding) -> int:
+    severity = finding.get('severity', 'unknown') if isinstance(finding, dict) else 'unknown'
+    return SEVERITY_ORDER.get(str(severity).lower(), SEVERITY_ORDER['unknown'])
+
+
+class FindingStream:
+    """指摘を NDJSON で逐次出力する"""
+
+    def __init__(self, out: Optional[TextIO] = None, deduplicator=None):
+        self.out = out or sys.stdout
+        self.findings = 0
+        # 代表の指摘 (id()) → その指摘を出力したレコードの 'id'
+        self._record_ids: Dict[int, int] = {}
+        self._emitted: List[Dict] = []  # id() が再利用されないよう参照を保つ
+        # 先に出力した指摘との重複を除く場合の finding_dedup.FindingDeduplicator
+        self.deduplicator = deduplicator
+
+    def _write(self, record: Dict):
+        self.out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.out.flush()
+
+    def _write_finding(self, aspect: str, finding, replaces: Optional[int] = None):
+        self.findings += 1
+        record = {'type': 'finding', 'aspect': aspect, 'finding': finding, 'id': self.findings}
+        if replaces is not None:
+            record['replaces'] = replaces
+        self._record_ids[id(finding)] = self.findings
+        self._emitted.append(finding)
+        self._write(record)
+
+    def aspect_result(self, outcome: Dict):
+        """観点1件の結果 (AspectExecutor の outcome) の指摘と完了レコードを書き出す"""
+        aspect = outcome['aspect']
+        result = outcome['result']
+        findings = result.get('findings')
+        findings = sorted(findings, key=severity_rank) if isinstance(findings, list) else []
+        duplicates = 0
+        for finding in findings:
+            replaces = None
+            if self.deduplicator is not None:
+                finding = self.deduplicator.add(aspect, finding)
+                if self.deduplicator.replaced is not None:
+                    duplicates += 1
+                    replaces = self._record_ids.get(id(self.deduplicator.replaced))
+                elif finding is None:
+                    duplicates += 1
+                    continue
+            self._write_finding(aspect, finding, replaces)
+
+        if 'error' not in result:
+            status = 'ok'
+        elif findings:
+            status = 'partial'
+        elif outcome.get('cancelled'):
+            status = 'cancelled'
+        else:
+            status = 'failed'
+        record = {
+            'type': 'aspect',
+            'aspect': aspect,
+            'status': status,
+            'findings': len(findings),
+            'elapsed': round(outcome.get('elapsed') or 0.0, 3),
+            'attempts': outcome.get('attempts'),
+        }
+        if duplicates:
+            record['duplicates'] = duplicates
+        if 'error' in result:
+            record['error'] = result['error']
+        self._write(record)
+
+    def finish(self, report: Optional[Dict], error: Optional[str] = None):
+        """集計レコードを書き出す（report は merge_and_format_results() の結果）"""
+        record = {'type': 'summary', 'success': report is not None and error is None}
+        if report is not None:
+            record['summary'] = report.get('summary', {})
+            record['review_details'] = report.get('review_details', {})
+            if 'gate' in report:
+                record['gate'] = report['gate']
+        else:
+            record['findings_streamed'] = self.findings
+        if error is not None:
+            record['error'] = error
+        self._write(record)
@@ -0,0 +1,150 @@
+"""diff_sharding のバイト範囲によるシャード分割のテスト
+
+Usage:
+    python3 -m pytest skills/proc-reviewing-code-skill/scripts/tests
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from diff_sharding import plan_shards, scan_diff
+from review_prompt import CHUNK_SIZE, AspectPrompt
+
+
+def _hunk(new_start, lines):
+    body = ''.join(f"+line {new_start + i}\n" for i in range(lines))
+    return f"@@ -{new_start},0 +{new_start},{lines} @@\n{body}"
+
+
+def _file(path, *hunks):
+    return (f"diff --git a/{path} b/{path}\n"
+            f"--- a/{path}\n"
+            f"+++ b/{path}\n" + ''.join(hunks))
+
+
+class DiffShardingTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.diff_path = Path(self._tmp.name) / 'review.diff'
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def plan(self, diff_text, budget):
+        self.diff_path.write_text(diff_text)
+        files = scan_diff(self.diff_path)
+        return files, plan_shards(files, budget)
+
+    def shard_bytes(self, shard):
+        # 実際にプロンプトへ流し込む経路 (AspectPrompt.chunks) で読む
+        return b''.join(AspectPrompt('security', self.diff_path, b'', b'', shard.ranges).chunks())
+
+    def assert_reassembles(self, shards):
+        """ファイルヘッダーの重複を除いてシャードを順に連結すると元の差分に戻る"""
+        data = self.diff_path.read_bytes()
+        seen = set()
+        pieces = []
+        for shard in shards:
+            for start, end in shard.ranges:
+                if (start, end) in seen:
+                    continue
+                seen.add((start, end))
+                pieces.append(data[start:end])
+        self.assertEqual(b''.join(pieces), data)
+
+    def assert_on_boundaries(self, files, shards):
+        boundaries = set()
+        for file_diff in files:
+            boundaries.update([file_diff.start, file_diff.end, file_diff.header_end])
+            boundaries.update(file_diff.hunks)
+        for shard in shards:
+            for start, end in shard.ranges:
+                self.assertIn(start, boundaries)
+                self.assertIn(end, boundaries)
+                self.assertLess(start, end)
+
+    def test_small_files_share_one_shard(self):
+        diff = _file('a.py', _hunk(1, 3)) + _file('b.py', _hunk(1, 3))
+
+        files, shards = self.plan(diff, budget=10_000)
+
+        self.assertEqual(len(shards), 1)
+        self.assertEqual(shards[0].files, ['a.py', 'b.py'])
+        self.assertEqual(self.shard_bytes(shards[0]), diff.encode())
+
+    def test_split_on_file_and_hunk_boundaries(self):
+        diff = (_file('a.py', _hunk(1, 20), _hunk(100, 20), _hunk(200, 20))
+                + _file('b.py', _hunk(1, 5))
+                + _file('c.py', _hunk(1, 30), _hunk(50, 30)))
+
+        files, shards = self.plan(diff, budget=400)
+
+        self.assertGreater(len(shards), 3)
+        self.assert_on_boundaries(files, shards)
+        self.assert_reassembles(shards)
+        for shard in shards:
+            data = self.shard_bytes(shard)
+            # 各シャードはファイルヘッダーから始まり、ハンクの途中で切れない
+            self.assertTrue(data.startswith(b'diff --git '))
+            self.assertTrue(data.endswith(b'\n'))
+            self.assertEqual(data.count(b'@@ -'), data.count(b'\n@@ -'))
+
+    def test_split_file_repeats_header_in_every_part(self):
+        diff = _file('a.py', _hunk(1, 20), _hunk(100, 20), _hunk(200, 20))
+
+        files, shards = self.plan(diff, budget=300)
+
+        self.assertEqual(len(shards), 3)
+        header = diff[:diff.index('@@')].encode()
+        for shard in shards:
+            self.assertTrue(self.shard_bytes(shard).startswith(header))
+            self.assertEqual(shard.files, ['a.py'])
+        self.assert_reassembles(shards)
+
+    def test_hunk_larger_than_budget_gets_its_own_shard(self):
+        big = _hunk(100, 10_000)  # CHUNK_SIZE を超えるハンク
+        self.assertGreater(len(big), CHUNK_SIZE)
+        diff = _file('a.py', _hunk(1, 2), big, _hunk(20_000, 2)) + _file('b.py', _hunk(1, 2))
+
+        files, shards = self.plan(diff, budget=1024)
+
+        self.assert_on_boundaries(files, shards)
+        self.assert_reassembles(shards)
+        containing = [shard for shard in shards if big.encode() in self.shard_bytes(shard)]
+        self.assertEqual(len(containing), 1)
+        self.assertGreater(containing[0].size, 1024)
+        self.assertEqual(len(containing[0].ranges), 2)  # ファイルヘッダー + 大きなハンク
+
+    def test_budget_smaller_than_single_hunk_file(self):
+        diff = _file('a.py', _hunk(1, 50))
+
+        files, shards = self.plan(diff, budget=1)
+
+        self.assertEqual(len(shards), 1)
+        self.assertEqual(self.shard_bytes(shards[0]), diff.encode())
+
+    def test_preamble_before_first_file_is_kept(self):
+        diff = "commit 1234\n\n    message\n\n" + _file('a.py', _hunk(1, 20), _hunk(100, 20))
+
+        files, shards = self.plan(diff, budget=200)
+
+        self.assertIsNone(files[0].path)
+        self.assert_on_boundaries(files, shards)
+        self.assert_reassembles(shards)
+
+    def test_diff_without_file_header_is_one_file(self):
+        diff = _hunk(1, 3) + _hunk(10, 3)
+
+        files, shards = self.plan(diff, budget=10_000)
+
+        self.assertEqual(len(files), 1)
+        self.assertEqual(self.shard_bytes(shards[0]), diff.encode())
+
+
+if __name__ == '__main__':
+    unittest.main()
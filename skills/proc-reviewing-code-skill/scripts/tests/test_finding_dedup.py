@@ -0,0 +1,157 @@
+"""finding_dedup.FindingDeduplicator の重複の判定と代表の置き換えのテスト
+
+Usage:
+    python3 -m pytest skills/proc-reviewing-code-skill/scripts/tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from finding_dedup import (
+    LINE_WINDOW,
+    FindingDeduplicator,
+    dedupe_findings,
+    issue_tokens,
+)
+
+
+def _finding(line, severity='medium', category='SQL Injection', issue=None, file='app.py'):
+    finding = {'severity': severity, 'category': category, 'file': file,
+               'issue': issue or 'User input is concatenated into a SQL query'}
+    if line is not None:
+        finding['line'] = line
+    return finding
+
+
+class FindingDeduplicatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.deduplicator = FindingDeduplicator()
+
+    def add(self, aspect, finding):
+        return self.deduplicator.add(aspect, finding)
+
+    def test_same_category_across_aspects_within_window_is_merged(self):
+        first = self.add('backend', _finding(10))
+        merged = self.add('security', _finding(10 + LINE_WINDOW, category='sql-injection',
+                                               issue='Query built from request parameters'))
+
+        self.assertIsNone(merged)
+        self.assertEqual(self.deduplicator.findings, [first])
+        self.assertEqual(first['aspects'], ['backend', 'security'])
+        self.assertEqual(first['duplicates'], 1)
+        self.assertEqual(self.deduplicator.removed, 1)
+
+    def test_merge_across_adjacent_line_buckets(self):
+        # 11 // 3 と 12 // 3 は別のバケットだが、行の差は窓の中
+        self.add('backend', _finding(11))
+
+        self.assertIsNone(self.add('security', _finding(12)))
+
+    def test_no_merge_beyond_window_in_adjacent_bucket(self):
+        # 10 // 3 と 14 // 3 は隣のバケットだが、行の差 4 は窓の外
+        self.add('backend', _finding(10))
+
+        self.assertIsNotNone(self.add('security', _finding(10 + LINE_WINDOW + 1)))
+        self.assertEqual(len(self.deduplicator.findings), 2)
+        self.assertEqual(self.deduplicator.removed, 0)
+
+    def test_no_merge_beyond_adjacent_buckets(self):
+        self.add('backend', _finding(0))
+
+        self.assertIsNotNone(self.add('security', _finding(2 * LINE_WINDOW)))
+        self.assertEqual(len(self.deduplicator.findings), 2)
+
+    def test_no_merge_across_files(self):
+        self.add('backend', _finding(10))
+
+        self.assertIsNotNone(self.add('security', _finding(10, file='other.py')))
+
+    def test_paths_are_normalized(self):
+        self.add('backend', _finding(10, file='a/app.py'))
+
+        self.assertIsNone(self.add('security', _finding(10, file='./app.py')))
+
+    def test_same_category_within_one_aspect_needs_similar_issue(self):
+        self.add('security', _finding(10, issue='Password is logged in plain text'))
+
+        self.assertIsNotNone(self.add('security', _finding(11, issue='Missing CSRF token check')))
+
+    def test_similar_issue_with_other_category_is_merged(self):
+        self.add('backend', _finding(10, category='Database'))
+
+        self.assertIsNone(self.add('security', _finding(10, category='Injection')))
+
+    def test_higher_severity_duplicate_replaces_representative(self):
+        low = self.add('backend', _finding(10, severity='low'))
+
+        critical = self.add('security', _finding(11, severity='critical'))
+
+        self.assertIsNotNone(critical)
+        self.assertEqual(critical['severity'], 'critical')
+        self.assertIs(self.deduplicator.replaced, low)
+        self.assertEqual(self.deduplicator.findings, [critical])
+        self.assertEqual(critical['aspects'], ['backend', 'security'])
+        self.assertEqual(critical['duplicates'], 1)
+
+        # 置き換えた代表が以降の重複の比較に使われる
+        self.assertIsNone(self.add('infrastructure', _finding(12, severity='medium')))
+        self.assertIsNone(self.deduplicator.replaced)
+        self.assertEqual(self.deduplicator.findings, [critical])
+        self.assertEqual(critical['duplicates'], 2)
+        self.assertEqual(critical['aspects'], ['backend', 'security', 'infrastructure'])
+
+    def test_replacement_keeps_position_among_other_findings(self):
+        self.add('backend', _finding(100, category='Logging', issue='Secrets are logged'))
+        self.add('backend', _finding(10, severity='low'))
+        self.add('frontend', _finding(50, category='XSS', issue='Unescaped HTML output'))
+
+        self.add('security', _finding(10, severity='high'))
+
+        severities = [finding['severity'] for finding in self.deduplicator.findings]
+        self.assertEqual(severities, ['medium', 'high', 'medium'])
+
+    def test_findings_without_line_are_merged_with_each_other_only(self):
+        first = self.add('backend', _finding(None))
+
+        self.assertIsNone(self.add('security', _finding(None)))
+        self.assertEqual(first['aspects'], ['backend', 'security'])
+        # 行のある指摘は行のない指摘とまとめない
+        self.assertIsNotNone(self.add('infrastructure', _finding(10)))
+        self.assertIsNotNone(FindingDeduplicator().add('security', _finding(None)))
+
+    def test_non_dict_finding_is_kept_as_is(self):
+        self.assertEqual(self.add('backend', 'free text finding'), 'free text finding')
+        self.assertEqual(self.deduplicator.findings, ['free text finding'])
+
+
+class DedupeFindingsTest(unittest.TestCase):
+
+    def test_sorted_by_severity_and_counts_removed(self):
+        findings, removed = dedupe_findings([
+            ('backend', _finding(10, severity='low')),
+            ('frontend', _finding(50, severity='medium', category='XSS',
+                                  issue='Unescaped HTML output')),
+            ('security', _finding(11, severity='critical')),
+        ])
+
+        self.assertEqual(removed, 1)
+        self.assertEqual([finding['severity'] for finding in findings], ['critical', 'medium'])
+        self.assertEqual(findings[0]['aspects'], ['security', 'backend'])
+
+
+class IssueTokensTest(unittest.TestCase):
+
+    def test_words_and_bigrams(self):
+        self.assertEqual(issue_tokens('SQL 注入が 危険 x'),
+                         frozenset({'sql', '注入', '入が', '危険', 'x'}))
+
+    def test_single_non_ascii_character(self):
+        self.assertEqual(issue_tokens('鍵'), frozenset({'鍵'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+"""findings_cache のハンク単位のキャッシュ (キーの正規化・保存の条件) のテスト
+
+Usage:
+    python3 -m pytest skills/proc-reviewing-code-skill/scripts/tests
+"""
+
+import importlib.util
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from diff_sharding import scan_diff
+from findings_cache import FindingsCache, scan_hunks
+from review_backends import StubBackend
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+GUIDELINES = SCRIPTS_DIR.parent / 'references' / 'security-review.md'
+
+HUNK_BODY = """\
+ def handler(request):
+-    query = "SELECT 1"
++    query = "SELECT * FROM users WHERE id = " + request.args["id"]
++    return db.execute(query)
+"""
+
+
+def _diff(new_start, body=HUNK_BODY):
+    return (
+        "diff --git a/app.py b/app.py\n"
+        "--- a/app.py\n"
+        "+++ b/app.py\n"
+        f"@@ -{new_start},2 +{new_start},3 @@\n"
+        + body
+    )
+
+
+def _finding(line):
+    return {'severity': 'critical', 'category': 'SQL Injection', 'file': 'app.py',
+            'line': line, 'issue': 'User input is concatenated into a SQL query'}
+
+
+def _load_orchestrator_module():
+    spec = importlib.util.spec_from_file_location(
+        'review_orchestrator', SCRIPTS_DIR / 'review-orchestrator.py'
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FindingsCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.cache_dir = self.tmp / 'cache'
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def hunks(self, diff_text, name='review.diff'):
+        diff_path = self.tmp / name
+        diff_path.write_text(diff_text)
+        return scan_hunks(diff_path, scan_diff(diff_path))
+
+    def store(self, diff_text, findings, context='context'):
+        hunks = self.hunks(diff_text, 'stored.diff')
+        FindingsCache(self.cache_dir, context).store('security', GUIDELINES, hunks, findings)
+
+    def partition(self, diff_text, context='context'):
+        cache = FindingsCache(self.cache_dir, context)
+        return cache.partition('security', GUIDELINES, self.hunks(diff_text))
+
+    def test_hit_after_hunk_moves_to_other_lines(self):
+        self.store(_diff(10), [_finding(11)])
+
+        findings, misses = self.partition(_diff(40))
+
+        self.assertEqual(misses, [])
+        self.assertEqual(len(findings), 1)
+        # 行番号はハンクの開始行からの相対位置で保存し、現在の位置へ戻す
+        self.assertEqual(findings[0]['line'], 41)
+        self.assertEqual(findings[0]['issue'], 'User input is concatenated into a SQL query')
+
+    def test_hit_ignores_trailing_whitespace(self):
+        self.store(_diff(10), [_finding(11)])
+
+        findings, misses = self.partition(_diff(10, HUNK_BODY.replace('\n', '  \n')))
+
+        self.assertEqual(misses, [])
+        self.assertEqual(len(findings), 1)
+
+    def test_miss_when_hunk_body_changes(self):
+        self.store(_diff(10), [_finding(11)])
+
+        findings, misses = self.partition(_diff(10, HUNK_BODY.replace('users', 'accounts')))
+
+        self.assertEqual(findings, [])
+        self.assertEqual(len(misses), 1)
+
+    def test_miss_when_context_changes(self):
+        self.store(_diff(10), [_finding(11)])
+
+        findings, misses = self.partition(_diff(10), context='another project')
+
+        self.assertEqual(findings, [])
+        self.assertEqual(len(misses), 1)
+
+    def test_hunk_without_findings_is_cached_as_empty(self):
+        self.store(_diff(10), [])
+
+        findings, misses = self.partition(_diff(10))
+
+        self.assertEqual((findings, misses), ([], []))
+
+    def test_corrupted_entry_is_a_miss(self):
+        self.store(_diff(10), [_finding(11)])
+        for entry in self.cache_dir.rglob('*.json'):
+            entry.write_text('{"findings": [{"finding": "not a dict"}]}')
+
+        findings, misses = self.partition(_diff(10))
+
+        self.assertEqual(findings, [])
+        self.assertEqual(len(misses), 1)
+
+
+class CacheStoreConditionTest(unittest.TestCase):
+    """review-orchestrator.py はエラーを含む結果をキャッシュに保存しない"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.module = _load_orchestrator_module()
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.cache_dir = self.tmp / 'cache'
+        self.diff_path = self.tmp / 'review.diff'
+        self.diff_path.write_text(_diff(10))
+        self.orchestrator = self.module.ReviewOrchestrator(
+            None, 'context', diff_path=self.diff_path, cache_dir=self.cache_dir,
+            backend=StubBackend(), route=False
+        )
+        self.orchestrator.plan_cached_review(self.diff_path, scan_diff(self.diff_path))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def complete(self, result):
+        self.orchestrator.on_shard_completed({'aspect': 'security', 'shard': 0, 'result': result})
+
+    def entries(self):
+        return list(self.cache_dir.rglob('*.json'))
+
+    def test_successful_result_is_stored(self):
+        self.complete({'aspect': 'security', 'findings': [_finding(11)]})
+
+        self.assertEqual(len(self.entries()), 1)
+
+    def test_result_with_error_is_not_stored(self):
+        self.complete({'aspect': 'security', 'error': 'Review failed', 'findings': []})
+        self.complete({'aspect': 'security', 'error': 'Truncated JSON (kept 1 findings)',
+                       'findings': [_finding(11)]})
+
+        self.assertEqual(self.entries(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
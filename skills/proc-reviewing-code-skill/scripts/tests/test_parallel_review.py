@@ -0,0 +1,78 @@
+"""parallel-review.sh の失敗の集計と終了コードのテスト
+
+PATH の先頭に偽の gemini を置いてスクリプトを実行する (jq が必要)。
+
+Usage:
+    python3 -m pytest skills/proc-reviewing-code-skill/scripts/tests
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent.parent / 'parallel-review.sh'
+
+DIFF = """\
+diff --git a/app.py b/app.py
+--- a/app.py
++++ b/app.py
+@@ -1,1 +1,2 @@
+ import os
++print(os.environ)
+"""
+
+FAILING_GEMINI = """\
+#!/bin/sh
+cat > /dev/null
+echo "backend unavailable" >&2
+exit 3
+"""
+
+PASSING_GEMINI = """\
+#!/bin/sh
+cat > /dev/null
+echo '{"response": "{\\"findings\\": []}"}'
+"""
+
+
+@unittest.skipUnless(shutil.which('jq') and shutil.which('bash'), 'jq and bash are required')
+class ParallelReviewExitStatusTest(unittest.TestCase):
+
+    def run_review(self, gemini):
+        with tempfile.TemporaryDirectory() as tmp:
+            fake = Path(tmp) / 'gemini'
+            fake.write_text(gemini)
+            fake.chmod(0o755)
+            diff_path = Path(tmp) / 'review.diff'
+            diff_path.write_text(DIFF)
+            env = dict(os.environ, PATH=f"{tmp}{os.pathsep}{os.environ.get('PATH', '')}")
+            result = subprocess.run(
+                ['bash', str(SCRIPT), '--diff-file', str(diff_path), 'test project'],
+                capture_output=True, text=True, env=env, timeout=60,
+            )
+        return result, json.loads(result.stdout)
+
+    def test_failing_backend_is_counted_as_failed(self):
+        result, output = self.run_review(FAILING_GEMINI)
+
+        self.assertEqual(result.returncode, 4)
+        self.assertEqual(output['review_summary']['successful'], 0)
+        self.assertEqual(output['review_summary']['failed'], 4)
+        self.assertNotIn('review succeeded', result.stderr)
+        self.assertTrue(all(aspect['error'] == 'Review failed' for aspect in output['aspects']))
+
+    def test_passing_backend_is_counted_as_successful(self):
+        result, output = self.run_review(PASSING_GEMINI)
+
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(output['review_summary']['successful'], 4)
+        self.assertEqual(output['review_summary']['failed'], 0)
+        self.assertEqual(output['review_summary']['invalid_json'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
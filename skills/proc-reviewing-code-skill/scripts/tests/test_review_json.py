@@ -0,0 +1,159 @@
+"""review_json の寛容な JSON 抽出 (修復と不正な応答の判定) のテスト
+
+Usage:
+    python3 -m pytest skills/proc-reviewing-code-skill/scripts/tests
+"""
+
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from review_json import JsonScanner, extract_review
+
+SCRIPT = Path(__file__).resolve().parent.parent / 'review_json.py'
+
+
+def _wrap(response):
+    """gemini --output-format json の外側の JSON"""
+    return json.dumps({'response': response})
+
+
+class ExtractReviewTest(unittest.TestCase):
+
+    def extract(self, response):
+        return extract_review(_wrap(response))
+
+    def test_plain_json(self):
+        extraction = self.extract('{"aspect": "backend", "findings": []}')
+
+        self.assertEqual(extraction.result, {'aspect': 'backend', 'findings': []})
+        self.assertFalse(extraction.repaired)
+
+    def test_fenced_code_block(self):
+        extraction = self.extract('```json\n{"findings": [{"issue": "a"}]}\n```')
+
+        self.assertEqual(extraction.result, {'findings': [{'issue': 'a'}]})
+        self.assertFalse(extraction.repaired)
+
+    def test_unclosed_fence(self):
+        extraction = self.extract('```json\n{"findings": [{"issue": "a"}]}')
+
+        self.assertEqual(extraction.result, {'findings': [{'issue': 'a'}]})
+
+    def test_text_before_and_after(self):
+        extraction = self.extract('Here are the findings:\n{"findings": [{"issue": "a"}]}\nDone.')
+
+        self.assertEqual(extraction.result, {'findings': [{'issue': 'a'}]})
+        self.assertEqual(extraction.repairs, ['surrounding_text'])
+
+    def test_trailing_commas(self):
+        extraction = self.extract('{"findings": [{"issue": "a", "line": 3,},],}')
+
+        self.assertEqual(extraction.result, {'findings': [{'issue': 'a', 'line': 3}]})
+        self.assertEqual(extraction.repairs, ['trailing_comma'])
+
+    def test_truncated_inside_string_drops_incomplete_finding(self):
+        extraction = self.extract(
+            '{"findings": [{"issue": "a", "suggestion": "b"}, {"issue": "second is cu'
+        )
+
+        self.assertEqual(extraction.result, {'findings': [{'issue': 'a', 'suggestion': 'b'}]})
+        self.assertTrue(extraction.truncated)
+
+    def test_truncated_inside_array_keeps_finding_with_issue(self):
+        extraction = self.extract('{"findings": [{"issue": "a"}, {"issue": "b", "sugg')
+
+        self.assertEqual(extraction.result, {'findings': [{'issue': 'a'}, {'issue': 'b'}]})
+        self.assertTrue(extraction.truncated)
+
+    def test_truncated_before_any_issue_is_invalid(self):
+        extraction = self.extract('{"findings": [{"severity": "hi')
+
+        self.assertIsNone(extraction.result)
+
+    def test_escaped_quotes_and_brackets_in_strings(self):
+        extraction = self.extract('{"findings": [{"issue": "uses \\"eval\\" on {x}, [y]"}]}')
+
+        self.assertEqual(extraction.result, {'findings': [{'issue': 'uses "eval" on {x}, [y]'}]})
+        self.assertFalse(extraction.repaired)
+
+    def test_truncated_after_escaped_quote(self):
+        extraction = self.extract('{"findings": [{"issue": "a \\"q\\" }", "suggestion": "b \\"')
+
+        self.assertEqual(extraction.result, {'findings': [{'issue': 'a "q" }'}]})
+        self.assertTrue(extraction.truncated)
+
+    def test_empty_response_is_invalid(self):
+        self.assertIsNone(self.extract('').result)
+        self.assertIsNone(self.extract('   \n').result)
+
+    def test_non_json_response_is_invalid(self):
+        self.assertIsNone(self.extract('I could not review this change.').result)
+
+    def test_error_envelope_is_invalid(self):
+        extraction = extract_review('{"response": null, "error": {"message": "quota"}}')
+
+        self.assertIsNone(extraction.result)
+
+    def test_empty_or_non_json_output_without_envelope_is_invalid(self):
+        self.assertIsNone(extract_review('').result)
+        self.assertIsNone(extract_review('garbage').result)
+        self.assertIsNone(extract_review('{"stats": {}}').result)
+
+    def test_review_without_envelope(self):
+        extraction = extract_review('{"aspect": "security", "findings": []}')
+
+        self.assertEqual(extraction.result, {'aspect': 'security', 'findings': []})
+
+
+class JsonScannerTest(unittest.TestCase):
+
+    def test_state_is_kept_across_chunks(self):
+        scanner = JsonScanner()
+        for chunk in ['{"findings": [{"issue": "a \\', '"b\\"", "line": 1,', '}]}']:
+            scanner.feed(chunk)
+
+        self.assertTrue(scanner.complete)
+        repaired, repairs = scanner.close()
+        self.assertEqual(json.loads(repaired), {'findings': [{'issue': 'a "b"', 'line': 1}]})
+        self.assertEqual(repairs, ['trailing_comma'])
+
+    def test_mismatched_brackets(self):
+        scanner = JsonScanner()
+        scanner.feed('{"findings": [}')
+
+        self.assertEqual(scanner.close(), (None, []))
+
+
+class CommandLineTest(unittest.TestCase):
+
+    def run_script(self, raw_output):
+        return subprocess.run([sys.executable, str(SCRIPT)], input=raw_output,
+                              capture_output=True, text=True, timeout=30)
+
+    def test_repaired_review_is_written(self):
+        result = self.run_script(_wrap('```json\n{"findings": [{"issue": "a"},]}\n```'))
+
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(json.loads(result.stdout), {'findings': [{'issue': 'a'}]})
+
+    def test_empty_response_writes_nothing(self):
+        result = self.run_script(_wrap(''))
+
+        self.assertEqual(result.returncode, 1)
+        self.assertEqual(result.stdout, '')
+
+    def test_non_json_response_is_written_as_is(self):
+        # 後段 (parallel-review.sh) の検証で Invalid JSON として数える
+        result = self.run_script(_wrap('I could not review this change.'))
+
+        self.assertEqual(result.returncode, 1)
+        self.assertEqual(result.stdout, 'I could not review this change.')
+
+
+if __name__ == '__main__':
+    unittest.main()
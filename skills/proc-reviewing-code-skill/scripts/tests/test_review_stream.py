@@ -0,0 +1,68 @@
+"""review_stream.FindingStream の重複排除と出力順のテスト
+
+Usage:
+    python3 -m pytest skills/proc-reviewing-code-skill/scripts/tests
+"""
+
+import io
+import json
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from finding_dedup import FindingDeduplicator
+from review_stream import FindingStream
+
+
+def _outcome(aspect, findings):
+    return {'aspect': aspect, 'result': {'aspect': aspect, 'findings': findings},
+            'elapsed': 0.1, 'attempts': 1}
+
+
+def _finding(severity, line):
+    return {'severity': severity, 'category': 'SQL Injection', 'file': 'app.py',
+            'line': line, 'issue': 'User input is concatenated into a SQL query',
+            'suggestion': 'Use a parameterized query'}
+
+
+class FindingStreamDedupTest(unittest.TestCase):
+
+    def stream(self, *outcomes):
+        out = io.StringIO()
+        stream = FindingStream(out, deduplicator=FindingDeduplicator())
+        for outcome in outcomes:
+            stream.aspect_result(outcome)
+        return [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def findings(self, records):
+        return [record for record in records if record['type'] == 'finding']
+
+    def test_later_duplicate_with_higher_severity_replaces_representative(self):
+        records = self.stream(_outcome('backend', [_finding('low', 10)]),
+                              _outcome('security', [_finding('critical', 11)]))
+        findings = self.findings(records)
+
+        self.assertEqual(len(findings), 2)
+        self.assertEqual(findings[0]['finding']['severity'], 'low')
+        upgrade = findings[1]
+        self.assertEqual(upgrade['aspect'], 'security')
+        self.assertEqual(upgrade['finding']['severity'], 'critical')
+        self.assertEqual(upgrade['replaces'], findings[0]['id'])
+        self.assertEqual(upgrade['finding']['aspects'], ['backend', 'security'])
+        self.assertEqual(records[-1]['duplicates'], 1)
+
+    def test_later_duplicate_with_lower_severity_is_not_emitted(self):
+        records = self.stream(_outcome('security', [_finding('critical', 11)]),
+                              _outcome('backend', [_finding('low', 10)]))
+        findings = self.findings(records)
+
+        self.assertEqual(len(findings), 1)
+        self.assertEqual(findings[0]['finding']['severity'], 'critical')
+        self.assertNotIn('replaces', findings[0])
+        self.assertEqual(records[-1]['duplicates'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()